@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+""" Benchmark action dispatch for resources with many actions.
+
+Compares the indexed `RestEndpoint.find_action()` with the previous
+implementation that scanned all resource members on every call.
+
+Run with::
+
+    $ python ops/bench/bench_actions.py
+
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+
+# stdlib imports
+import timeit
+
+# local imports
+from restible import RestEndpoint, RestResource, api_action
+
+
+class Endpoint(RestEndpoint):
+    @classmethod
+    def extract_request_data(cls, request):
+        return None
+
+
+def make_resource(num_actions):
+    """ Create a resource class with the given number of actions. """
+    def make_action(name):
+        @api_action(name=name)
+        def action(self, request, params, payload):
+            return {}
+
+        return action
+
+    attrs = {'name': 'res{}'.format(num_actions)}
+    for i in range(num_actions):
+        name = 'action_{:04}'.format(i)
+        attrs[name] = make_action(name)
+
+    return type(str('Res{}'.format(num_actions)), (RestResource,), attrs)
+
+
+def find_action_linear(resource, name, generic, method='post'):
+    """ find_action() as implemented before the action index. """
+    method = method.lower()
+
+    for action in resource.rest_actions():
+        meta = api_action.get_meta(action)
+        if (
+                meta.name == name and
+                meta.generic == generic and
+                method in meta.methods
+        ):
+            return action
+
+    return None
+
+
+def main(number=2000):
+    print("{} lookups of the last action".format(number))
+
+    for num_actions in (5, 50, 500):
+        endpoint = Endpoint(res_cls=make_resource(num_actions))
+        name = 'action_{:04}'.format(num_actions - 1)
+
+        old = timeit.timeit(
+            lambda: find_action_linear(endpoint.resource, name, False),
+            number=number
+        )
+        new = timeit.timeit(
+            lambda: endpoint.find_action(name, False, 'POST'),
+            number=number
+        )
+
+        print("  {:3} actions: linear {:10.2f} us, indexed {:6.2f} us".format(
+            num_actions, old / number * 1e6, new / number * 1e6,
+        ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+""" Benchmark encoding a large list response with each available codec.
+
+The baseline is what the resources had to do before: format dates, decimals
+and UUIDs as strings and then encode the result with the stdlib ``json``.
+
+Run with::
+
+    $ PYTHONPATH=src python ops/bench/bench_codec.py
+
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+
+# stdlib imports
+import datetime
+import decimal
+import json
+import timeit
+import uuid
+
+# local imports
+from restible import codec
+
+
+ITEMS = [
+    {
+        'id': i,
+        'uuid': uuid.UUID(int=i),
+        'title': 'Post #{}'.format(i),
+        'content': 'Lorem ipsum dolor sit amet ' * 4,
+        'price': decimal.Decimal('10.50'),
+        'created_at': datetime.datetime(2019, 1, 1, 12, 0, i % 60),
+        'tags': ['a', 'b', 'c'],
+    }
+    for i in range(10000)
+]
+
+
+def preformatted_stdlib(items):
+    return json.dumps([
+        dict(
+            item,
+            uuid=str(item['uuid']),
+            price=str(item['price']),
+            created_at=item['created_at'].isoformat(),
+        )
+        for item in items
+    ]).encode('utf-8')
+
+
+def main(number=20):
+    base = timeit.timeit(lambda: preformatted_stdlib(ITEMS), number=number)
+
+    print("{} items x {} runs".format(len(ITEMS), number))
+    print("  {:24} {:8.2f} ms/response".format(
+        'preformatted + json', base / number * 1e3
+    ))
+
+    for codec_cls in codec.JSON_CODECS + [codec.MsgpackCodec, codec.CborCodec]:
+        if not codec_cls.available():
+            print("  {:24} not installed".format(codec_cls.name))
+            continue
+
+        item_codec = codec_cls()
+        took = timeit.timeit(lambda: item_codec.dumps(ITEMS), number=number)
+        print("  {:24} {:8.2f} ms/response ({:.1f}x), {} KB".format(
+            codec_cls.name,
+            took / number * 1e3,
+            base / took,
+            len(item_codec.dumps(ITEMS)) // 1024,
+        ))
+
+
+if __name__ == '__main__':
+    main()
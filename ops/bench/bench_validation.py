@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+""" Benchmark ModelResource.validate() against plain jsonschema.validate().
+
+Run with::
+
+    $ python ops/bench/bench_validation.py
+
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+
+# stdlib imports
+import timeit
+
+# 3rd party imports
+import jsonschema
+
+# local imports
+from restible import ModelResource
+
+
+class PostResource(ModelResource):
+    name = 'post'
+    schema = {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "title": {"type": "string", "maxLength": 100},
+            "content": {"type": "string"},
+            "tags": {"type": "array", "items": {"type": "string"}},
+            "author": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "email": {"type": "string"},
+                },
+                "required": ["name"],
+            },
+        },
+        "required": ["title", "content"],
+        "additionalProperties": False,
+    }
+
+
+PAYLOAD = {
+    'title': 'Hello',
+    'content': 'Lorem ipsum dolor sit amet',
+    'tags': ['a', 'b', 'c'],
+    'author': {'name': 'John', 'email': 'john@example.com'},
+}
+
+
+def main(number=20000):
+    res = PostResource()
+
+    old = timeit.timeit(
+        lambda: jsonschema.validate(PAYLOAD, res.schema),
+        number=number
+    )
+    new = timeit.timeit(lambda: res.validate(PAYLOAD), number=number)
+
+    print("{} validations".format(number))
+    print("  jsonschema.validate()   {:8.2f} us/call".format(old / number * 1e6))
+    print("  ModelResource.validate  {:8.2f} us/call".format(new / number * 1e6))
+    print("  saving                  {:8.2f} us/call ({:.1f}x)".format(
+        (old - new) / number * 1e6, old / new
+    ))
+
+
+if __name__ == '__main__':
+    main()
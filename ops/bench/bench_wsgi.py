@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+""" Benchmark the built-in WSGI endpoint against the Flask based example.
+
+Serves the ``BlogPostResource`` from ``docs/examples/01_basic`` (with an
+in-memory store instead of the database, so only the HTTP layer overhead is
+measured) using both `restible.wsgi.WsgiEndpoint` and
+``restible_flask.Endpoint``. Requests are passed directly to the WSGI app,
+without any network in between.
+
+The Flask part is skipped if ``flask`` and ``restible_flask`` are not
+installed.
+
+Run with::
+
+    $ python ops/bench/bench_wsgi.py
+
+"""
+from __future__ import absolute_import, print_function, unicode_literals
+
+# stdlib imports
+import io
+import json
+import timeit
+from wsgiref.util import setup_testing_defaults
+
+# local imports
+import restible
+from restible.wsgi import WsgiEndpoint
+
+
+POSTS = {
+    i: {'id': i, 'title': 'Post #{}'.format(i), 'content': 'Lorem ipsum ' * 20}
+    for i in range(1, 51)
+}
+
+
+class BlogPostResource(restible.RestResource):
+    """ docs/examples/01_basic BlogPostResource with an in-memory store. """
+    name = 'post'
+    route_params = [{"name": "post_pk"}]
+
+    def rest_query(self, request, params, payload):
+        return 200, list(POSTS.values())
+
+    def rest_get(self, request, params, payload):
+        post_id = int(self.get_pk(request))
+        item = POSTS.get(post_id)
+        if item:
+            return 200, item
+        else:
+            return 404, {'detail': "Blog post #{} not found".format(post_id)}
+
+    def rest_create(self, request, params, payload):
+        return 201, dict(payload, id=len(POSTS) + 1)
+
+
+def make_environ(method, path, body=None):
+    environ = {'REQUEST_METHOD': method, 'PATH_INFO': path}
+    if body is not None:
+        data = json.dumps(body).encode('utf-8')
+        environ['CONTENT_TYPE'] = 'application/json'
+        environ['CONTENT_LENGTH'] = str(len(data))
+        environ['wsgi.input'] = io.BytesIO(data)
+    setup_testing_defaults(environ)
+    return environ
+
+
+def call(app, method, path, body=None):
+    environ = make_environ(method, path, body)
+    return b''.join(app(environ, lambda status, headers: None))
+
+
+def create_flask_app():
+    try:
+        import flask
+        import restible_flask
+    except ImportError:
+        return None
+
+    app = flask.Flask(__name__)
+    with app.app_context():
+        restible_flask.Endpoint.init_app(app, resources=[
+            ['/api/post', BlogPostResource],
+        ])
+    return app
+
+
+def bench(name, app, number):
+    cases = (
+        ('GET list', lambda: call(app, 'GET', '/api/post')),
+        ('GET item', lambda: call(app, 'GET', '/api/post/1')),
+        ('POST', lambda: call(app, 'POST', '/api/post', {'title': 'a'})),
+    )
+
+    print(name)
+    for case, fn in cases:
+        elapsed = timeit.timeit(fn, number=number)
+        print("  {:10} {:8.2f} us/request".format(
+            case, elapsed / number * 1e6
+        ))
+
+
+def main(number=5000):
+    bench('restible.wsgi', WsgiEndpoint.create_app(resources=[
+        ['/api/post', BlogPostResource],
+    ]), number)
+
+    flask_app = create_flask_app()
+    if flask_app is None:
+        print("flask/restible_flask not installed, skipping")
+    else:
+        bench('restible_flask', flask_app, number)
+
+
+if __name__ == '__main__':
+    main()
@@ -57,6 +57,12 @@ setup(
         'serafin>=0.11.0',
         'six>=1.0.0',
     ],
+    extras_require={
+        'orjson': ['orjson>=3.0.0'],
+        'ujson': ['ujson>=5.4.0'],
+        'msgpack': ['msgpack>=1.0.0'],
+        'cbor': ['cbor2>=5.0.0'],
+    },
     classifiers=[
         "Development Status :: 4 - Beta",
         "Topic :: Utilities",
@@ -27,9 +27,11 @@ from __future__ import absolute_import, unicode_literals
 from .endpoint import RestEndpoint, RawResponse
 from .exc import Error
 from .exc import BadRequest
+from .exc import NotAcceptable
 from .exc import NotAllowed
 from .exc import NotAuthorized
 from .exc import NotFound
+from .exc import UnsupportedMediaType
 from .model import ModelResource
 from .resource import RestResource
 from .actions import api_action
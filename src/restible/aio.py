@@ -0,0 +1,782 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" asyncio support.
+
+This module requires python 3.7+ and is not imported by ``restible`` itself.
+
+`AsyncRestEndpoint` awaits coroutine handlers (``async def rest_get()``,
+``async def`` actions, etc.) directly on the event loop. Regular, synchronous
+handlers are executed in a thread pool so they don't block the loop.
+
+`AsyncModelResource` is a `ModelResource` with coroutine ``rest_*`` handlers.
+It allows implementing ``query_items``, ``get_item``, ``create_item``,
+``update_item`` and ``delete_item`` as coroutines.
+
+The async endpoint does not modify the request. The current request and the
+authorized user are available through `current_request` and `current_user`
+context variables instead (defined in `restible.context`). They're also
+visible inside synchronous handlers executed in the thread pool.
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import asyncio
+import contextvars
+import functools
+import inspect
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger
+
+# local imports
+from . import batch
+from . import cache as response_cache
+from . import etag
+from . import exc
+from . import http
+from .actions import api_action
+from .context import current_request, current_user
+from .endpoint import CONDITIONAL_METHODS, RestEndpoint, RestResult
+from .model import BULK_DELETE_SCHEMA, COUNT_PARAM, ModelResource
+from .resource import default_handler
+
+
+L = getLogger(__name__)
+
+#: Thread of the sync transaction of the current atomic batch, if any.
+_transaction_executor = contextvars.ContextVar(
+    'restible_transaction_executor', default=None
+)
+
+
+async def maybe_await(value):
+    """ Await *value* if it's awaitable, otherwise just return it. """
+    if inspect.isawaitable(value):
+        return await value
+    return value
+
+
+async def _take(items, count):
+    """ Read at most *count* items from the async iterable *items*. """
+    result = []
+    if count > 0:
+        async for item in items:
+            result.append(item)
+            if len(result) >= count:
+                break
+    return result
+
+
+class AsyncSingleFlight(object):
+    """ asyncio version of `singleflight.SingleFlight`.
+
+    Use it as `AsyncRestEndpoint.single_flight`. Waiting requests don't
+    block the event loop. If the leader is cancelled, the first waiting
+    request takes over and calls the handler itself.
+    """
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, func, *args):
+        """ Await ``func(*args)`` unless a call with the same *key* is running.
+
+        Same as `singleflight.SingleFlight.do()`, but *func* is a coroutine
+        function.
+        """
+        while key in self._calls:
+            future = self._calls[key]
+            try:
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await func(*args)
+
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+        except BaseException as ex:
+            future.set_exception(ex)
+            future.exception()    # Mark as retrieved if there are no waiters.
+            raise
+
+        else:
+            future.set_result(result)
+            return result, False
+
+        finally:
+            del self._calls[key]
+
+    def __len__(self):
+        """ Number of calls in flight. """
+        return len(self._calls)
+
+
+class AsyncRestEndpoint(RestEndpoint):
+    """ Base class for asyncio based REST endpoints.
+
+    Works exactly like `RestEndpoint` but `call_rest_handler()` and
+    `call_action_handler()` are coroutines. `authorize()` can be either a
+    regular method or a coroutine.
+
+    `RestEndpoint.single_flight` must be an `AsyncSingleFlight` instance.
+
+    :param concurrent.futures.Executor executor:
+        Executor used to run synchronous handlers. If not given, the event
+        loop default executor is used. Can also be set as a class attribute.
+    """
+    executor = None
+
+    def __init__(self, resource=None, res_cls=None, protected=False,
+                 executor=None):
+        super(AsyncRestEndpoint, self).__init__(resource, res_cls, protected)
+
+        if executor is not None:
+            self.executor = executor
+
+    async def run_handler(self, handler, *args):
+        """ Run a resource handler.
+
+        Coroutine functions are awaited directly, everything else is executed
+        in `executor` within a copy of the current context. Inside an atomic
+        batch with a sync transaction, the transaction thread is used instead
+        (see `run_batch_atomic()`).
+        """
+        if inspect.iscoroutinefunction(handler):
+            return await handler(*args)
+
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        result = await loop.run_in_executor(
+            _transaction_executor.get() or self.executor,
+            functools.partial(ctx.run, handler, *args),
+        )
+        return await maybe_await(result)
+
+    async def call_rest_handler(self, method, request):
+        """ Call the resource handler for the given HTTP method.
+
+        Same as `RestEndpoint.call_rest_handler()`, but async.
+        """
+        has_pk = bool(self.resource.get_pk(request))
+
+        entry = self._verb_entry(method, has_pk)
+        if entry is False:
+            return self._not_allowed(has_pk)
+
+        handler_name, ok_status = entry
+        user = await maybe_await(self.authorize(request))
+
+        request_token = current_request.set(request)
+        user_token = current_user.set(user)
+        try:
+            if self.protected and user is None:
+                return RestResult(401, {}, {'detail': "Not Authorized"})
+
+            handler = getattr(self.resource, handler_name)
+            params, payload, error = self._request_args(method, request)
+            if error is not None:
+                return error
+
+            try:
+                validators = None
+                version_hook = self.version_hook(method, has_pk)
+                if version_hook is not None:
+                    validators = etag.version_headers(
+                        await self.run_handler(version_hook, request, params)
+                    )
+                    if self.is_not_modified(request, validators):
+                        return RestResult(304, validators, None)
+
+                async def run():
+                    return self.process_result(
+                        await self.run_handler(
+                            handler, request, params, payload
+                        ),
+                        ok_status,
+                    )
+
+                if (
+                        self.single_flight is not None and
+                        method in CONDITIONAL_METHODS
+                ):
+                    key = self.flight_key(request, handler_name, params, user)
+                    result, shared = await self.single_flight.do(key, run)
+                    if shared:
+                        result = self.shared_copy(result) or await run()
+                else:
+                    result = await run()
+
+                self.invalidate_after(
+                    method, result, handler_name[len('rest_'):], request
+                )
+                return self.conditional_result(
+                    method, request, result, validators
+                )
+
+            except Exception as ex:
+                return self.error_result(ex)
+
+        finally:
+            current_user.reset(user_token)
+            current_request.reset(request_token)
+
+    async def call_action_handler(self, method, request, name, is_generic):
+        """ Call an action on the bound resource.
+
+        Same as `RestEndpoint.call_action_handler()`, but async.
+        """
+        action = self.find_action(name, is_generic, method)
+        if action is None:
+            return self._action_not_found(name)
+
+        meta = api_action.get_meta(action)
+        user = await maybe_await(self.authorize(request))
+
+        error = self._check_action_access(meta, method, user)
+        if error is not None:
+            return error
+
+        request_token = current_request.set(request)
+        user_token = current_user.set(user)
+        try:
+            params, payload, error = self._request_args(method, request)
+            if error is not None:
+                return error
+
+            payload, error = self._validate_action_payload(meta, payload)
+            if error is not None:
+                return error
+
+            try:
+                result = self.process_result(
+                    await self.run_handler(action, request, params, payload),
+                    200,
+                )
+                if not is_generic:
+                    self.invalidate_after(method, result, request=request)
+                return result
+
+            except Exception as ex:
+                return self.error_result(ex, invalid_value_status=None)
+
+        finally:
+            current_user.reset(user_token)
+            current_request.reset(request_token)
+
+    async def call_batch(self, request, payload=None, endpoints=None):
+        """ Execute a batch of operations.
+
+        Same as `RestEndpoint.call_batch()`, but async.
+        """
+        try:
+            if payload is None:
+                payload = self.extract_request_data(request)
+            operations, atomic = batch.parse(payload, self.batch_max_size)
+        except exc.Error as ex:
+            return self.error_result(ex)
+
+        endpoints = endpoints or {self.resource.name: self}
+        call = functools.partial(self.call_operation, request, endpoints)
+
+        if not atomic:
+            results = await run_batch(operations, call, self.batch_workers)
+            return RestResult(200, {}, results)
+
+        transaction = self.batch_transaction(request)
+        if transaction is None:
+            return RestResult(400, {}, {
+                'detail': "Atomic batches are not supported"
+            })
+
+        invalidations = []
+        call = functools.partial(call, deferred_invalidations=invalidations)
+        try:
+            results = await run_batch_atomic(operations, call, transaction)
+        except Exception as ex:
+            self.batch_rolled_back(operations, endpoints)
+            return self.error_result(ex)
+
+        if any(batch.is_error(x) for x in results):
+            self.batch_rolled_back(operations, endpoints)
+        else:
+            self.batch_committed(invalidations)
+
+        return RestResult(200, {}, results)
+
+    async def call_operation(self, request, endpoints, operation,
+                             deferred_invalidations=None):
+        """ Execute a single batch operation.
+
+        Same as `RestEndpoint.call_operation()`, but async. Sync streams are
+        read with `run_handler()`, as they can block.
+        """
+        name = operation.resource or self.resource.name
+        endpoint = endpoints.get(name)
+        if endpoint is None:
+            return batch.make_result(404, {}, {
+                'detail': "Unknown resource: {}".format(name)
+            })
+
+        sub_request = batch.SubRequest(
+            request, operation, deferred_invalidations
+        )
+        if operation.pk is not None:
+            sub_request.rest_keys[http.pk_key(endpoint.resource)] = operation.pk
+
+        if operation.action is not None:
+            result = endpoint.call_action_handler(
+                operation.method,
+                sub_request,
+                operation.action,
+                operation.pk is None,
+            )
+        else:
+            result = endpoint.call_rest_handler(operation.method, sub_request)
+
+        result = await maybe_await(result)
+        if isinstance(result, RestResult) and hasattr(result.data, '__aiter__'):
+            data = [x async for x in result.data]
+            result = RestResult(result.status, result.headers, data)
+        elif isinstance(result, RestResult) and result.is_stream:
+            data = await self.run_handler(list, result.data)
+            result = RestResult(result.status, result.headers, data)
+
+        return self.batch_result(result)
+
+
+async def run_batch(operations, call, workers):
+    """ Same as `batch.run()`, but *call* is a coroutine function.
+
+    Consecutive reads run concurrently, at most *workers* at a time.
+    """
+    results = [None] * len(operations)
+    semaphore = asyncio.Semaphore(max(workers, 1))
+    reads = []
+
+    async def run_read(i):
+        async with semaphore:
+            results[i] = await call(operations[i])
+
+    for i, operation in enumerate(operations):
+        if operation.is_read:
+            reads.append(run_read(i))
+        else:
+            await asyncio.gather(*reads)
+            reads = []
+            results[i] = await call(operation)
+
+    await asyncio.gather(*reads)
+    return results
+
+
+async def run_batch_atomic(operations, call, transaction):
+    """ Same as `batch.run_atomic()`, but *call* is a coroutine function.
+
+    *transaction* can be either a regular or an async context manager. Sync
+    transactions are usually bound to a thread (ie. Django), so the
+    transaction is entered and exited in a dedicated thread and all sync
+    handlers of the batch run in that thread too (see
+    `AsyncRestEndpoint.run_handler()`). Sync hooks called directly by
+    coroutine handlers run on the event loop and are not covered.
+    """
+    results = []
+
+    async def run_all():
+        for operation in operations:
+            results.append(await call(operation))
+            if batch.is_error(results[-1]):
+                raise batch.Rollback()
+
+    try:
+        if hasattr(transaction, '__aenter__'):
+            async with transaction:
+                await run_all()
+        else:
+            await _run_in_sync_transaction(transaction, run_all)
+
+    except batch.Rollback:
+        return batch.rolled_back(results, len(operations))
+
+    return results
+
+
+async def _run_in_sync_transaction(transaction, func):
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(1, thread_name_prefix='restible-batch')
+    token = _transaction_executor.set(executor)
+    try:
+        await loop.run_in_executor(executor, transaction.__enter__)
+        try:
+            await func()
+        except BaseException:
+            exc_info = sys.exc_info()
+            suppress = await loop.run_in_executor(
+                executor, transaction.__exit__, *exc_info
+            )
+            if not suppress:
+                raise
+        else:
+            await loop.run_in_executor(
+                executor, transaction.__exit__, None, None, None
+            )
+
+    finally:
+        _transaction_executor.reset(token)
+        executor.shutdown(wait=False)
+
+
+class AsyncModelResource(ModelResource):
+    """ `ModelResource` with coroutine ``rest_*`` handlers.
+
+    The ``*_item(s)`` hooks can be implemented either as coroutines or
+    regular methods. Regular methods are called directly on the event loop,
+    so they should not block. ``query_items`` can also return an async
+    iterable.
+
+    Use it with `AsyncRestEndpoint`.
+    """
+    _refresh_tasks = set()
+
+    def revalidate_in_background(self, refresh):
+        """ Run the refresh of a stale cache entry in a new task.
+
+        Same as `ModelResource.revalidate_in_background()`, but *refresh* is
+        a coroutine function.
+        """
+        task = asyncio.ensure_future(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _cached_response(self, request, kind, params, load):
+        """ Same as `ModelResource._cached_response()`, but async. """
+        cache = self._response_cache
+        if cache is None or (kind == 'collection' and self.streaming):
+            return await load()
+
+        if kind == 'item':
+            missing_key = self._cache_key(request, 'missing', {})
+            missing_generation = cache.missing_generation
+            if await self._is_missing(request, missing_key, missing_generation):
+                return 404, {'detail': "Not Found"}
+
+        key = self._cache_key(request, kind, params)
+        generation = cache.generation
+        entry = cache.get(key)
+
+        if entry is not response_cache.MISSING:
+            if cache.is_fresh(entry):
+                return 200, cache.headers(entry), entry.data
+
+            if cache.can_revalidate(entry):
+                if cache.start_refresh(key):
+                    self.revalidate_in_background(
+                        functools.partial(self._refresh_cache, key, load)
+                    )
+                return 200, cache.headers(entry), entry.data
+
+        try:
+            status, headers, data = self._split_result(await load())
+        except NotImplementedError:
+            raise
+        except Exception:
+            if (
+                    entry is response_cache.MISSING or
+                    not cache.can_serve_on_error(entry)
+            ):
+                raise
+
+            L.exception("Loading %s failed, serving stale data", self.name)
+            return 200, cache.headers(entry), entry.data
+
+        if status == 404 and kind == 'item':
+            cache.set_missing(missing_key, missing_generation)
+
+        if status != 200:
+            return status, headers, data
+
+        cache.set(key, data, generation, headers)
+        return status, dict(cache.headers(), **headers), data
+
+    async def _is_missing(self, request, key, generation):
+        cache = self._response_cache
+        if self._has_known_pks:
+            known = cache.known_keys(generation)
+            if known is None:
+                known = cache.set_known_keys(
+                    generation, await maybe_await(self.known_pks())
+                )
+            if self.get_pk(request) not in known:
+                return True
+
+        return cache.is_missing(key)
+
+    async def _refresh_cache(self, key, load):
+        cache = self._response_cache
+        try:
+            generation = cache.generation
+            status, headers, data = self._split_result(await load())
+            if status == 200:
+                cache.set(key, data, generation, headers)
+
+        except Exception:   # pylint: disable=broad-except
+            L.exception("Refreshing cached %s failed", self.name)
+
+        finally:
+            cache.end_refresh(key)
+
+    @default_handler('query_items', 'query_page')
+    async def rest_query(self, request, params, payload):
+        """ Query existing records as a list. """
+        async def load():
+            filters = dict(params)
+            fields = filters.pop('_fields', '*')
+            spec = self._fields_spec(fields)
+
+            if filters.pop(COUNT_PARAM, None):
+                count = await maybe_await(self.count_items(
+                    request, self.deserialize(self._count_filters(filters)),
+                    payload
+                ))
+                return 200, self._count_headers(count), {'count': count}
+
+            if self._sort_key:
+                page = self._page(filters)
+                if self._has_query_page:
+                    items = await maybe_await(self.query_page(
+                        request, self.deserialize(filters), payload, page,
+                        **self._fields_kwargs('query_page', spec)
+                    ))
+                else:
+                    items = await maybe_await(self.query_items(
+                        request, self.deserialize(filters), payload,
+                        **self._fields_kwargs('query_items', spec)
+                    ))
+                    if hasattr(items, '__aiter__'):
+                        items = [x async for x in items]
+                    items = page.apply(items)
+
+                if hasattr(items, '__aiter__'):
+                    items = await _take(items, page.limit + 1)
+
+                return self._page_result(params, page, items, spec)
+
+            items = await maybe_await(self.query_items(
+                request, self.deserialize(filters), payload,
+                **self._fields_kwargs('query_items', spec)
+            ))
+            if hasattr(items, '__aiter__'):
+                if self.streaming:
+                    return 200, (self.serialize(x, spec) async for x in items)
+                return 200, [self.serialize(x, spec) async for x in items]
+
+            if self.streaming:
+                return 200, (self.serialize(x, spec) for x in items)
+
+            return 200, [self.serialize(x, spec) for x in items]
+
+        try:
+            return await self._cached_response(
+                request, 'collection', params, load
+            )
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
+
+    @default_handler('query_items')
+    async def count_items(self, request, params, payload):
+        """ Same as `ModelResource.count_items()`, but async. """
+        items = await maybe_await(self.query_items(request, params, payload))
+        if hasattr(items, '__aiter__'):
+            return sum([1 async for _ in items])
+        return sum(1 for _ in items)
+
+    @default_handler('get_item')
+    async def item_exists(self, request, params, payload):
+        """ Same as `ModelResource.item_exists()`, but async. """
+        item = await maybe_await(self.get_item(request, params, payload))
+        return item is not None
+
+    @default_handler('create_item')
+    async def create_items(self, request, params, items):
+        """ Same as `ModelResource.create_items()`, but async. """
+        return [
+            await maybe_await(self.create_item(request, params, values))
+            for values in items
+        ]
+
+    @default_handler('create_item', 'create_items')
+    async def rest_create(self, request, params, payload):
+        """ Create a new record, or multiple records if *payload* is a list. """
+        if isinstance(payload, list):
+            return await self._bulk_create(request, params, payload)
+
+        try:
+            self.validate(payload, self.schema)
+
+            values = self.deserialize(payload)
+            item = await maybe_await(
+                self.create_item(request, params, values)
+            )
+
+            return self.serialize(item)
+
+        except ModelResource.ValidationError as ex:
+            return 400, {'detail': str(ex)}
+
+        except ModelResource.AlreadyExists:
+            return 400, {'detail': 'Already exists'}
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
+
+    @default_handler('get_item')
+    async def rest_get(self, request, params, payload):
+        """ Get one record with the given id. """
+        async def load():
+            spec = self._fields_spec(params.get('_fields', '*'))
+            item = await maybe_await(self.get_item(
+                request, params, payload, **self._fields_kwargs('get_item', spec)
+            ))
+
+            if item is not None:
+                return 200, self.serialize(item, spec)
+            else:
+                return 404, {'detail': "Not Found"}
+
+        try:
+            return await self._cached_response(request, 'item', params, load)
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
+
+    @default_handler('update_item')
+    async def rest_update(self, request, params, payload):
+        """ Update existing item. """
+        try:
+            values = self._update_values(payload)
+            item = await maybe_await(
+                self.update_item(request, params, values)
+            )
+
+            if item is not None:
+                return 200, self.serialize(item)
+            else:
+                return 404, {'detail': "Not Found"}
+
+        except ModelResource.ValidationError as ex:
+            return 400, {'detail': str(ex)}
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
+
+    @default_handler('delete_item')
+    async def rest_delete(self, request, params, payload):
+        """ DELETE detail. """
+        try:
+            await maybe_await(self.delete_item(request, params, payload))
+
+            return 204, {}
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
+
+    @default_handler('count_items', 'item_exists')
+    async def rest_head(self, request, params, payload):
+        """ HEAD list/detail. Only the headers, nothing is serialized. """
+        try:
+            if self.get_pk(request):
+                if await maybe_await(self.item_exists(request, params, payload)):
+                    return 200, {}, None
+                return 404, {}, None
+
+            filters = self._count_filters(params)
+            count = await maybe_await(self.count_items(
+                request, self.deserialize(filters), payload
+            ))
+            return 200, self._count_headers(count), None
+
+        except NotImplementedError:
+            return 404, {}, None
+
+    @default_handler('update_items')
+    async def rest_bulk_update(self, request, params, payload):
+        """ Update multiple existing items. """
+        try:
+            items = self._bulk_update_values(payload)
+            updated = await maybe_await(
+                self.update_items(request, params, items)
+            )
+
+            return self._bulk_update_result(updated)
+
+        except ModelResource.ValidationError as ex:
+            return 400, {'detail': str(ex)}
+
+        except ModelResource.BulkValidationError as ex:
+            return 400, {'detail': str(ex), 'errors': ex.errors}
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
+
+    @default_handler('delete_items')
+    async def rest_bulk_delete(self, request, params, payload):
+        """ DELETE list. The payload is a list of primary keys. """
+        try:
+            self.validate_items(payload, BULK_DELETE_SCHEMA)
+            await maybe_await(self.delete_items(request, params, payload))
+
+            return 204, {}
+
+        except ModelResource.ValidationError as ex:
+            return 400, {'detail': str(ex)}
+
+        except ModelResource.BulkValidationError as ex:
+            return 400, {'detail': str(ex), 'errors': ex.errors}
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
+
+    async def _bulk_create(self, request, params, payload):
+        """ Same as `ModelResource._bulk_create()`, but async. """
+        try:
+            self.validate_items(payload, self._bulk_create_schema)
+
+            values = [self.deserialize(data) for data in payload]
+            try:
+                items = await maybe_await(
+                    self.create_items(request, params, values)
+                )
+            except Exception:
+                # See ModelResource._bulk_create().
+                self.invalidate_cache('create')
+                raise
+
+            return [self.serialize(item) for item in items]
+
+        except ModelResource.BulkValidationError as ex:
+            return 400, {'detail': str(ex), 'errors': ex.errors}
+
+        except ModelResource.AlreadyExists:
+            return 400, {'detail': 'Already exists'}
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
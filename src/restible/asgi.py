@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Framework-free ASGI endpoint.
+
+Allows serving restible resources directly with any ASGI server (uvicorn,
+hypercorn, daphne, ...). Built on top of `restible.aio` so it requires
+python 3.7+.
+
+Example::
+
+    from restible.asgi import AsgiEndpoint
+
+    app = AsgiEndpoint.create_app(resources=[
+        ['/api/post', PostResource],
+        ['/api/user', UserResource],
+    ])
+
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import asyncio
+import functools
+import zlib
+
+# local imports
+from . import codec, exc, http, streaming
+from .aio import AsyncRestEndpoint
+from .endpoint import LAZY_PAYLOAD_METHODS, RawResponse
+
+
+class AsgiEndpoint(http.PrefixMixin, AsyncRestEndpoint):
+    """ ASGI application serving a single resource.
+
+    :param str prefix:
+        URL prefix the resource is served at, ie. ``/api/post``. Can also be
+        defined as a class attribute.
+
+    All other arguments are the same as in `AsyncRestEndpoint`.
+    """
+    def __init__(self, resource=None, res_cls=None, protected=False,
+                 executor=None, prefix=None):
+        super(AsgiEndpoint, self).__init__(
+            resource, res_cls, protected, executor
+        )
+        self.init_prefix(prefix)
+
+    @classmethod
+    def create_app(cls, resources, batch_path=None, **kw):
+        """ Create an ASGI app serving all the given resources.
+
+        :param List[List[str, type]] resources:
+            List of ``[prefix, resource_class]`` pairs.
+        :param str batch_path:
+            Path for batch requests, see `AsgiApp`.
+        :param kw:
+            Extra keyword arguments passed to every endpoint constructor.
+        :return AsgiApp:
+            ASGI application.
+        """
+        return AsgiApp([
+            cls(res_cls=res_cls, prefix=prefix, **kw)
+            for prefix, res_cls in resources
+        ], batch_path=batch_path)
+
+    @classmethod
+    def extract_request_data(cls, request):
+        """ Decode the request body based on its ``Content-Type``. """
+        return cls.decode_request_data(request, request.body)
+
+    @classmethod
+    async def request_from_scope(cls, scope, receive):
+        """ Create `http.Request` from ASGI scope.
+
+        The body is read only if the request can have one.
+        """
+        headers = {
+            name.decode('latin-1').lower(): value.decode('latin-1')
+            for name, value in scope.get('headers', [])
+        }
+        method = scope['method'].upper()
+
+        body = b''
+        if (
+                method not in LAZY_PAYLOAD_METHODS or
+                'content-length' in headers or
+                'transfer-encoding' in headers
+        ):
+            body = await read_body(receive)
+
+        return http.Request(
+            method=method,
+            path=scope['path'],
+            query_string=scope.get('query_string', b'').decode('latin-1'),
+            headers=headers,
+            body=body,
+        )
+
+    async def __call__(self, scope, receive, send):
+        """ ASGI entry point. """
+        if scope['type'] == 'lifespan':
+            await lifespan(receive, send)
+            return
+
+        request = await self.request_from_scope(scope, receive)
+        route = self.match_route(request.path)
+
+        if route is None:
+            await respond(send, *http.error_response(404, "Not Found"))
+            return
+
+        await self.handle(
+            scope, receive, send, request,
+            functools.partial(http.dispatch, self, request, route),
+        )
+
+    async def handle(self, scope, receive, send, request, call):
+        """ Negotiate the response format, call the handler and respond.
+
+        :param http.Request request:
+            The request being handled.
+        :param Callable call:
+            Called with no arguments to get the `RestResult` coroutine.
+        """
+        try:
+            negotiated = self.negotiate_response(request)
+        except exc.NotAcceptable as ex:
+            await respond(send, *http.error_response(ex.status, ex.detail))
+            return
+
+        result = await call()
+
+        if isinstance(result, RawResponse):
+            await result.response(scope, receive, send)
+            return
+
+        status, headers, body = http.render_result(
+            result, request, negotiated, stream_encoder=encode_stream
+        )
+        if self.compression is not None:
+            headers, body = compress(
+                self.compression, headers, body,
+                request.headers.get('accept-encoding'),
+            )
+        await respond(send, status, headers, body, self.executor)
+
+
+class AsgiApp(object):
+    """ ASGI application serving multiple `AsgiEndpoint` instances.
+
+    :param List[AsgiEndpoint] endpoints:
+        Endpoints served by the app. Requests are routed based on the
+        endpoint prefix, the longest matching prefix wins.
+    :param str batch_path:
+        If given, POST requests to this path are batch requests that can
+        call any of the *endpoints* (see `restible.batch`). The batch request
+        itself is decoded and encoded by the first endpoint.
+    """
+    def __init__(self, endpoints, batch_path=None):
+        self.endpoints = http.sorted_by_prefix(endpoints)
+        self.batch_path = batch_path
+        self.by_name = {e.resource.name: e for e in endpoints}
+
+    async def __call__(self, scope, receive, send):
+        """ ASGI entry point. """
+        if scope['type'] == 'lifespan':
+            await lifespan(receive, send)
+            return
+
+        if self.batch_path is not None and scope['path'] == self.batch_path:
+            await self.call_batch(scope, receive, send)
+            return
+
+        endpoint = http.find_endpoint(self.endpoints, scope['path'])
+        if endpoint is None:
+            await respond(send, *http.error_response(404, "Not Found"))
+            return
+
+        await endpoint(scope, receive, send)
+
+    async def call_batch(self, scope, receive, send):
+        """ Handle the batch request. """
+        endpoint = self.endpoints[0]
+        request = await endpoint.request_from_scope(scope, receive)
+
+        if request.method != 'POST':
+            await respond(send, *http.error_response(
+                405, "Batch requests must use POST"
+            ))
+            return
+
+        await endpoint.handle(
+            scope, receive, send, request,
+            functools.partial(endpoint.call_batch, request, None, self.by_name),
+        )
+
+
+async def read_body(receive):
+    """ Read the whole request body. """
+    chunks = []
+    more_body = True
+
+    while more_body:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        more_body = message.get('more_body', False)
+
+    return b''.join(chunks)
+
+
+async def respond(send, status, headers, body, executor=None):
+    """ Send the ASGI response.
+
+    *body* can be bytes, an async iterator of chunks or a sync iterator of
+    chunks. Sync iterators can block (ie. DB cursors) so each chunk is
+    produced in the *executor*.
+
+    The first chunk of a streamed body is produced before the response is
+    started, so if that fails the client gets 500. Errors raised later are
+    propagated and the server aborts the response.
+    """
+    if not isinstance(body, bytes):
+        chunks = aiter_chunks(body, executor)
+        try:
+            first = await chunks.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except Exception:   # pylint: disable=broad-except
+            await respond(send, *http.error_response(
+                500, "Error while streaming the response"
+            ))
+            return
+
+        body = aiter_prepend(first, chunks)
+
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (name.lower().encode('latin-1'), str(value).encode('latin-1'))
+            for name, value in headers
+        ],
+    })
+
+    if isinstance(body, bytes):
+        await send({'type': 'http.response.body', 'body': body})
+        return
+
+    async for chunk in body:
+        await send_chunk(send, chunk)
+
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def aiter_chunks(body, executor=None):
+    """ Iterate over *body* chunks, sync iterators are read in *executor*. """
+    if hasattr(body, '__aiter__'):
+        async for chunk in body:
+            yield chunk
+        return
+
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(executor, next, body, None)
+        if chunk is None:
+            break
+        yield chunk
+
+
+async def aiter_prepend(first, chunks):
+    """ Yield *first* (unless it's **None**) and then the rest of *chunks*. """
+    if first is not None:
+        yield first
+    async for chunk in chunks:
+        yield chunk
+
+
+async def send_chunk(send, chunk):
+    """ Send a single chunk of a streamed response body. """
+    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+
+
+def encode_stream(data, ndjson, response_codec):
+    """ Encode streamed data. Supports both sync and async iterables.
+
+    See `http.encode_stream()`.
+    """
+    if not hasattr(data, '__aiter__'):
+        return http.encode_stream(data, ndjson, response_codec)
+
+    if isinstance(response_codec, codec.JsonCodec):
+        return aiter_encoded(data, ndjson, response_codec.dumps)
+
+    return aiter_whole(data, response_codec)
+
+
+async def aiter_whole(items, response_codec):
+    """ Encode all *items* at once, for codecs that can't encode streams. """
+    yield response_codec.dumps([item async for item in items])
+
+
+def compress(compression, headers, body, accept_encoding):
+    """ Same as `Compression.apply()` but supports async iterators. """
+    if not hasattr(body, '__aiter__'):
+        return compression.apply(headers, body, accept_encoding)
+
+    headers, encoding = compression.prepare(headers, body, accept_encoding)
+    if encoding is not None:
+        body = aiter_compress(compression.compressor(encoding), body)
+
+    return headers, body
+
+
+async def aiter_compress(compressor, chunks):
+    """ Async version of `Compression.iter_compress()`. """
+    async for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+async def aiter_encoded(items, ndjson=False, dumps=streaming.dump_json,
+                        chunk_size=streaming.CHUNK_SIZE):
+    """ Async version of `streaming.iter_encoded()`.
+
+    :param AsyncIterable items:
+        Items to encode. Consumed lazily.
+    """
+    buff = [] if ndjson else [b'[']
+    size = len(buff)
+    first = True
+
+    try:
+        async for item in items:
+            if not ndjson and not first:
+                buff.append(b',')
+            first = False
+
+            encoded = dumps(item)
+            buff.append(encoded)
+            if ndjson:
+                buff.append(b'\n')
+            size += len(encoded) + 1
+
+            if size >= chunk_size:
+                yield b''.join(buff)
+                buff = []
+                size = 0
+
+    except Exception:
+        streaming.L.exception("Error while streaming the response")
+        raise
+
+    if not ndjson:
+        buff.append(b']')
+
+    if buff:
+        yield b''.join(buff)
+
+
+async def lifespan(receive, send):
+    """ Handle ASGI lifespan protocol. There is nothing to set up. """
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Batch requests: many REST calls in a single HTTP request.
+
+The batch payload is a list of operations::
+
+    [
+        {"method": "GET", "resource": "post", "pk": 1},
+        {"method": "GET", "resource": "user", "params": {"_fields": "id"}},
+        {"method": "POST", "resource": "post", "body": {"title": "Hello"}},
+        {"method": "POST", "resource": "post", "pk": 1, "action": "publish"}
+    ]
+
+or an object with the operations and options::
+
+    {"atomic": true, "operations": [...]}
+
+Every operation is executed through the regular
+`RestEndpoint.call_rest_handler()` or `RestEndpoint.call_action_handler()`
+and the response is the list of ``{status, headers, body}`` results, in the
+same order.
+
+Consecutive reads (GET and HEAD) are executed in parallel, writes are
+executed one by one, in order. Atomic batches are executed sequentially
+within `RestEndpoint.batch_transaction()`. If any operation fails, the
+transaction is rolled back and all other operations get 424 Failed
+Dependency.
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import threading
+from multiprocessing.pool import ThreadPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# 3rd party imports
+import attr
+import jsonschema
+import six
+
+# local imports
+from . import exc
+from . import validation
+
+
+READ_METHODS = frozenset(['GET', 'HEAD'])
+
+OPERATION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'method': {'type': 'string'},
+        'resource': {'type': 'string'},
+        'pk': {'type': ['string', 'integer']},
+        'action': {'type': 'string'},
+        'params': {'type': 'object'},
+        'body': {},
+    },
+    'required': ['method'],
+    'additionalProperties': False,
+}
+
+SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'operations': {'type': 'array', 'items': OPERATION_SCHEMA},
+        'atomic': {'type': 'boolean'},
+    },
+    'required': ['operations'],
+    'additionalProperties': False,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class Rollback(Exception):
+    """ Raised inside the transaction to roll back an atomic batch. """
+    pass
+
+
+@attr.s(frozen=True)
+class Operation(object):
+    """ A single operation in a batch request.
+
+    :param str method:
+        Uppercase HTTP method.
+    :param str resource:
+        Resource name. **None** means the resource of the endpoint handling
+        the batch.
+    :param str pk:
+        Primary key for item routes.
+    :param str action:
+        Action name. Actions with no *pk* are generic.
+    :param Dict[str, Any] params:
+        Query string params.
+    :param body:
+        Already decoded request body.
+    """
+    method = attr.ib(type=str)
+    resource = attr.ib(type=Optional[str], default=None)
+    pk = attr.ib(type=Optional[str], default=None)
+    action = attr.ib(type=Optional[str], default=None)
+    params = attr.ib(type=dict, default=attr.Factory(dict))
+    body = attr.ib(default=None)
+
+    @classmethod
+    def from_dict(cls, data):
+        # type: (Dict[str, Any]) -> Operation
+        """ Create operation from its (validated) JSON representation. """
+        pk = data.get('pk')
+        return cls(
+            method=data['method'].upper(),
+            resource=data.get('resource'),
+            pk=None if pk is None else six.text_type(pk),
+            action=data.get('action'),
+            params=data.get('params') or {},
+            body=data.get('body'),
+        )
+
+    @property
+    def is_read(self):
+        # type: () -> bool
+        """ **True** for operations that don't modify any data. """
+        return self.method in READ_METHODS
+
+
+class SubRequest(object):
+    """ The request passed to the endpoint for a single batch operation.
+
+    It has everything `RestEndpoint` needs: ``method``, ``headers``, ``GET``,
+    ``rest_keys`` and ``user``. Other attributes are taken from the batch
+    request, so the framework specific ones (ie. session) are available.
+
+    :param parent:
+        The batch HTTP request.
+    :param Operation operation:
+        The operation executed with this request.
+    :param List deferred_invalidations:
+        Inside an atomic batch, the list that collects the cache
+        invalidations of successful writes (see
+        `RestEndpoint.invalidate_after()`). They're only done after the
+        transaction commits. **None** outside of atomic batches.
+    """
+    def __init__(self, parent, operation, deferred_invalidations=None):
+        self.parent = parent
+        self.operation = operation
+        self.deferred_invalidations = deferred_invalidations
+        self.method = operation.method
+        self.headers = getattr(parent, 'headers', {})
+        self.GET = operation.params     # pylint: disable=invalid-name
+        self.data = operation.body
+        self.rest_keys = {}
+        self.user = None
+
+    def __getattr__(self, name):
+        return getattr(self.parent, name)
+
+
+def parse(payload, max_size):
+    # type: (Any, int) -> Tuple[List[Operation], bool]
+    """ Parse the batch request payload.
+
+    :param payload:
+        Decoded request body.
+    :param int max_size:
+        Max number of operations.
+    :return tuple(List[Operation], bool):
+        The operations and the *atomic* flag.
+    :raises exc.BadRequest:
+        If the payload is not valid.
+    """
+    if isinstance(payload, list):
+        payload = {'operations': payload}
+
+    try:
+        validation.validate(payload, SCHEMA)
+    except jsonschema.ValidationError as ex:
+        raise exc.BadRequest(str(ex))
+
+    operations = payload['operations']
+    if len(operations) > max_size:
+        raise exc.BadRequest("Too many operations in a batch: {} > {}".format(
+            len(operations), max_size
+        ))
+
+    return (
+        [Operation.from_dict(x) for x in operations],
+        payload.get('atomic', False),
+    )
+
+
+def run(operations, call, workers):
+    # type: (List[Operation], Callable, int) -> List[Dict[str, Any]]
+    """ Execute batch *operations*.
+
+    Consecutive reads are executed in parallel, using at most *workers*
+    threads. Writes are executed in order, each one after all operations
+    before it are finished.
+
+    :param List[Operation] operations:
+        The operations to execute.
+    :param Callable call:
+        Called with each operation, returns the result dict.
+    :param int workers:
+        Max number of threads used to execute the reads.
+    :return List[Dict[str, Any]]:
+        Results, in the same order as *operations*.
+    """
+    results = [None] * len(operations)
+    reads = []
+
+    def run_reads():
+        if len(reads) == 1 or workers <= 1:
+            for i in reads:
+                results[i] = call(operations[i])
+        elif reads:
+            pool = get_pool(workers)
+            batch = pool.map(call, [operations[i] for i in reads])
+            for i, result in zip(reads, batch):
+                results[i] = result
+        del reads[:]
+
+    for i, operation in enumerate(operations):
+        if operation.is_read:
+            reads.append(i)
+        else:
+            run_reads()
+            results[i] = call(operation)
+
+    run_reads()
+    return results
+
+
+def run_atomic(operations, call, transaction):
+    # type: (List[Operation], Callable, Any) -> List[Dict[str, Any]]
+    """ Execute *operations* one by one inside *transaction*.
+
+    :param transaction:
+        Context manager that commits the transaction on exit and rolls it
+        back if an exception is raised.
+    :return List[Dict[str, Any]]:
+        Results, in the same order as *operations*. If any operation fails,
+        its result is returned as is and all others are replaced with 424
+        Failed Dependency.
+    """
+    results = []
+    try:
+        with transaction:
+            for operation in operations:
+                results.append(call(operation))
+                if is_error(results[-1]):
+                    raise Rollback()
+
+    except Rollback:
+        return rolled_back(results, len(operations))
+
+    return results
+
+
+def rolled_back(results, count):
+    # type: (List[Dict[str, Any]], int) -> List[Dict[str, Any]]
+    """ Return results of an atomic batch that was rolled back.
+
+    :param List[Dict[str, Any]] results:
+        Results of all executed operations. The last one failed.
+    :param int count:
+        Number of operations in the batch.
+    """
+    failed = len(results) - 1
+    dependency_failed = make_result(424, {}, {
+        'detail': "Failed Dependency: operation {} failed".format(failed)
+    })
+    return [
+        results[i] if i == failed else dependency_failed
+        for i in range(count)
+    ]
+
+
+def make_result(status, headers, body):
+    # type: (int, Dict[str, str], Any) -> Dict[str, Any]
+    """ Create the result of a single operation. """
+    return {'status': status, 'headers': headers, 'body': body}
+
+
+def is_error(result):
+    # type: (Dict[str, Any]) -> bool
+    """ Check if the operation failed. """
+    return result['status'] >= 400
+
+
+def get_pool(workers):
+    # type: (int) -> ThreadPool
+    """ Return the shared thread pool with the given number of *workers*. """
+    pool = _pools.get(workers)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(workers)
+            if pool is None:
+                pool = _pools[workers] = ThreadPool(workers)
+    return pool
+
+
+# Used only in type hint comments
+del Any, Callable, Dict, List, Optional, Tuple
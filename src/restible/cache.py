@@ -0,0 +1,718 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Response cache for model resources.
+
+The cache is declared on the resource class::
+
+    class PostResource(ModelResource):
+        cache = CachePolicy(ttl=30, max_entries=10000)
+
+With that, `ModelResource.rest_get` and `ModelResource.rest_query` store the
+serialized results and reuse them until they expire. The cache is cleared
+whenever the resource data is modified through the API (successful create,
+update, delete or a non-generic action).
+
+By default the cache lives in the process memory. With multiple worker
+processes, use `SqliteCacheBackend` so all workers share the entries and
+see each others invalidations::
+
+    SHARED_CACHE = SqliteCacheBackend('/run/myapp/cache.sqlite')
+
+    class PostResource(ModelResource):
+        cache = CachePolicy(ttl=30, backend=SHARED_CACHE)
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import hashlib
+import math
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from typing import (
+    Any, Callable, Dict, Hashable, Iterable, Optional, Text, Tuple
+)
+
+# 3rd party imports
+import attr
+import six
+from six.moves import cPickle as pickle
+
+# local imports
+from . import codec
+from . import url_params
+
+
+#: Monotonic clock if available.
+now = getattr(time, 'monotonic', time.time)     # pylint: disable=invalid-name
+
+#: Returned by `ResponseCache.get()` on cache miss.
+MISSING = object()
+
+
+@attr.s(frozen=True)
+class CachePolicy(object):
+    """ Cache configuration for a resource.
+
+    :param float ttl:
+        How long (in seconds) the entries are valid.
+    :param int max_entries:
+        Max number of entries. Least recently used ones are evicted first.
+        Ignored if *backend* is given, the backend has its own limit.
+    :param bool vary_user:
+        If **True**, each user gets separate cache entries. Use this if the
+        results depend on who is asking.
+    :param CacheBackend backend:
+        Where the entries are stored. By default each resource class gets
+        its own in-process `LocalCacheBackend`. Use `SqliteCacheBackend` to
+        share the cache between worker processes.
+    :param float stale_while_revalidate:
+        For how long (in seconds) after *ttl* the expired entry can still be
+        returned while it's refreshed in the background.
+    :param float stale_if_error:
+        For how long (in seconds) after *ttl* the expired entry can still be
+        returned if loading the fresh data fails.
+    :param float negative_ttl:
+        If set, ``rest_get`` 404 responses are cached for that long (in
+        seconds). The missing items are forgotten after any successful write
+        other than delete. Also limits how long the filter of known keys
+        (see `ResponseCache.known_keys()`) is used, *ttl* is used if not set.
+    """
+    ttl = attr.ib(type=float, default=30)
+    max_entries = attr.ib(type=int, default=10000)
+    vary_user = attr.ib(type=bool, default=False)
+    backend = attr.ib(default=None)
+    stale_while_revalidate = attr.ib(type=float, default=0)
+    stale_if_error = attr.ib(type=float, default=0)
+    negative_ttl = attr.ib(type=float, default=0)
+
+    @property
+    def retention(self):
+        # type: () -> float
+        """ How long the entries are kept, including the stale windows. """
+        return self.ttl + max(self.stale_while_revalidate, self.stale_if_error)
+
+    @property
+    def cache_control(self):
+        # type: () -> Text
+        """ The ``Cache-Control`` header for the cached responses. """
+        directives = ['max-age={}'.format(int(self.ttl))]
+        if self.vary_user:
+            directives.insert(0, 'private')
+
+        if self.stale_while_revalidate:
+            directives.append('stale-while-revalidate={}'.format(
+                int(self.stale_while_revalidate)
+            ))
+        if self.stale_if_error:
+            directives.append('stale-if-error={}'.format(
+                int(self.stale_if_error)
+            ))
+
+        return ', '.join(directives)
+
+
+@attr.s(frozen=True)
+class CacheEntry(object):
+    """ Cached response data.
+
+    :param data:
+        The serialized response data.
+    :param float stored_at:
+        When the entry was stored (unix timestamp, so it's comparable
+        between processes).
+    :param Dict[str, str] headers:
+        Response headers returned by the handler along with the data.
+    """
+    data = attr.ib()
+    stored_at = attr.ib(type=float)
+    headers = attr.ib(default=attr.Factory(dict))
+
+
+class LruCache(object):
+    """ Thread safe LRU cache with optional per entry expiration time.
+
+    :param int max_entries:
+        Max number of entries. Least recently used ones are evicted first.
+    """
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        # type: (Hashable, Any) -> Any
+        """ Return the cached value or *default* if missing or expired. """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                value, expires = entry
+                if expires is None or expires > now():
+                    self._move_to_end(key)
+                    self.hits += 1
+                    return value
+
+                del self._entries[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None):
+        # type: (Hashable, Any, Optional[float]) -> None
+        """ Store *value* under *key*.
+
+        :param float ttl:
+            Time to live in seconds. **None** means no expiration.
+        """
+        expires = None if ttl is None else now() + ttl
+
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        # type: (Hashable) -> None
+        """ Remove the entry for *key*, if it exists. """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        # type: () -> None
+        """ Remove all entries. """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self.get(key, MISSING) is not MISSING
+
+    def _move_to_end(self, key):
+        # OrderedDict.move_to_end() is python 3 only.
+        move_to_end = getattr(self._entries, 'move_to_end', None)
+        if move_to_end is not None:
+            move_to_end(key)
+        else:
+            self._entries[key] = self._entries.pop(key)
+
+
+class BloomFilter(object):
+    """ Set membership test with no false negatives.
+
+    ``key in bloom`` is **False** only if *key* was never added. It can be
+    **True** for keys that were not added, with *error_rate* probability.
+    Keys are compared as text, so ``1`` and ``'1'`` are the same key.
+
+    :param int capacity:
+        Expected number of keys.
+    :param float error_rate:
+        Target false positive probability.
+    """
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        size = -capacity * math.log(error_rate) / (math.log(2) ** 2)
+
+        self.size = max(int(math.ceil(size)), 64)
+        self.hashes = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def from_keys(cls, keys, error_rate=0.01):
+        # type: (Iterable[Any], float) -> BloomFilter
+        """ Create a filter containing all *keys*. """
+        keys = list(keys)
+        bloom = cls(len(keys), error_rate)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    def add(self, key):
+        # type: (Any) -> None
+        """ Add *key* to the filter. """
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(key)
+        )
+
+    def _positions(self, key):
+        if isinstance(key, (list, tuple)):
+            text = '\x1f'.join(six.text_type(x) for x in key)
+        else:
+            text = six.text_type(key)
+
+        digest = hashlib.sha1(text.encode('utf-8')).digest()
+        first, second = struct.unpack('>QQ', digest[:16])
+        second |= 1
+
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+
+class CacheBackend(object):
+    """ Interface for the response cache storage.
+
+    A single backend can be shared by many resources, each one uses its own
+    *namespace*. Every namespace has a generation number that is bumped by
+    `invalidate()`. Data loaded before the invalidation is not stored (see
+    `set()`), so a slow read racing with a write can't put stale data back
+    into the cache.
+    """
+    def get(self, namespace, key):
+        # type: (Text, Tuple) -> Any
+        """ Return the cached value or `MISSING`. """
+        raise NotImplementedError("{}.get() is not implemented".format(
+            self.__class__.__name__
+        ))
+
+    def set(self, namespace, key, value, ttl, generation):
+        # type: (Text, Tuple, Any, float, int) -> None
+        """ Store *value* unless *namespace* was invalidated.
+
+        :param float ttl:
+            Time to live in seconds.
+        :param int generation:
+            The namespace `generation()` from before the value was loaded. If
+            it changed since, the value is not stored.
+        """
+        raise NotImplementedError("{}.set() is not implemented".format(
+            self.__class__.__name__
+        ))
+
+    def generation(self, namespace):
+        # type: (Text) -> int
+        """ Return the current generation of *namespace*. """
+        raise NotImplementedError("{}.generation() is not implemented".format(
+            self.__class__.__name__
+        ))
+
+    def invalidate(self, namespace):
+        # type: (Text) -> None
+        """ Drop all entries in *namespace* and bump its generation. """
+        raise NotImplementedError("{}.invalidate() is not implemented".format(
+            self.__class__.__name__
+        ))
+
+
+class LocalCacheBackend(CacheBackend):
+    """ In-process backend, every namespace is a separate `LruCache`.
+
+    :param int max_entries:
+        Max number of entries per namespace.
+    """
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._stores = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def store(self, namespace):
+        # type: (Text) -> LruCache
+        """ Return the `LruCache` for the given namespace. """
+        store = self._stores.get(namespace)
+        if store is None:
+            store = self._stores.setdefault(
+                namespace, LruCache(self.max_entries)
+            )
+        return store
+
+    def get(self, namespace, key):
+        # type: (Text, Tuple) -> Any
+        return self.store(namespace).get(key, MISSING)
+
+    def set(self, namespace, key, value, ttl, generation):
+        # type: (Text, Tuple, Any, float, int) -> None
+        with self._lock:
+            if generation == self.generation(namespace):
+                self.store(namespace).set(key, value, ttl)
+
+    def generation(self, namespace):
+        # type: (Text) -> int
+        return self._generations.get(namespace, 0)
+
+    def invalidate(self, namespace):
+        # type: (Text) -> None
+        with self._lock:
+            self._generations[namespace] = self.generation(namespace) + 1
+            self.store(namespace).clear()
+
+
+class SqliteCacheBackend(CacheBackend):
+    """ Cache stored in a SQLite database file.
+
+    All processes using the same *path* share the cache, including the
+    invalidations. This is meant for multiple workers on a single host
+    (ie. prefork servers) and doesn't need any external service.
+
+    Values are stored with `pickle`, so only use it with a file that is not
+    writable by anyone else. Keys are stored as their ``repr()``.
+
+    Each process (and thread) opens its own connection, so the backend can
+    be created before the server forks its workers.
+
+    :param str path:
+        Path to the database file. It's created if it does not exist.
+    :param int max_entries:
+        Max number of entries per namespace. Oldest entries are evicted
+        first.
+    :param float timeout:
+        How long to wait (in seconds) for a lock held by another process.
+    """
+    def __init__(self, path, max_entries=10000, timeout=5.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._local = threading.local()
+
+        with closing(self._connect()) as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS restible_cache ('
+                '  namespace TEXT NOT NULL,'
+                '  key TEXT NOT NULL,'
+                '  value BLOB NOT NULL,'
+                '  expires REAL NOT NULL,'
+                '  PRIMARY KEY (namespace, key)'
+                ')'
+            )
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS restible_cache_expires'
+                ' ON restible_cache (namespace, expires)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS restible_cache_generation ('
+                '  namespace TEXT PRIMARY KEY,'
+                '  generation INTEGER NOT NULL'
+                ')'
+            )
+
+    @property
+    def conn(self):
+        # type: () -> sqlite3.Connection
+        """ Connection for the current process and thread. """
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            self._local.conn = self._connect()
+            self._local.pid = pid
+        return self._local.conn
+
+    def get(self, namespace, key):
+        # type: (Text, Tuple) -> Any
+        row = self.conn.execute(
+            'SELECT value FROM restible_cache'
+            ' WHERE namespace = ? AND key = ? AND expires > ?',
+            (namespace, repr(key), time.time())
+        ).fetchone()
+
+        if row is None:
+            return MISSING
+        return pickle.loads(bytes(row[0]))
+
+    def set(self, namespace, key, value, ttl, generation):
+        # type: (Text, Tuple, Any, float, int) -> None
+        data = sqlite3.Binary(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        conn = self.conn
+
+        with conn:
+            cursor = conn.execute(
+                'INSERT OR REPLACE INTO restible_cache'
+                ' SELECT ?, ?, ?, ? WHERE ? = ('
+                '  SELECT COALESCE(MAX(generation), 0)'
+                '  FROM restible_cache_generation WHERE namespace = ?'
+                ' )',
+                (
+                    namespace, repr(key), data, time.time() + ttl,
+                    generation, namespace,
+                )
+            )
+            if cursor.rowcount > 0:
+                self._evict(conn, namespace)
+
+    def generation(self, namespace):
+        # type: (Text) -> int
+        row = self.conn.execute(
+            'SELECT generation FROM restible_cache_generation'
+            ' WHERE namespace = ?',
+            (namespace,)
+        ).fetchone()
+        return 0 if row is None else row[0]
+
+    def invalidate(self, namespace):
+        # type: (Text) -> None
+        conn = self.conn
+
+        with conn:
+            conn.execute(
+                'INSERT OR IGNORE INTO restible_cache_generation'
+                ' VALUES (?, 0)',
+                (namespace,)
+            )
+            conn.execute(
+                'UPDATE restible_cache_generation'
+                ' SET generation = generation + 1 WHERE namespace = ?',
+                (namespace,)
+            )
+            conn.execute(
+                'DELETE FROM restible_cache WHERE namespace = ?', (namespace,)
+            )
+
+    def _evict(self, conn, namespace):
+        conn.execute(
+            'DELETE FROM restible_cache WHERE namespace = ? AND expires <= ?',
+            (namespace, time.time())
+        )
+        conn.execute(
+            'DELETE FROM restible_cache WHERE namespace = ? AND key IN ('
+            '  SELECT key FROM restible_cache WHERE namespace = ?'
+            '  ORDER BY expires DESC LIMIT -1 OFFSET ?'
+            ')',
+            (namespace, namespace, self.max_entries)
+        )
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path, timeout=self.timeout, check_same_thread=False
+        )
+        conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+
+class ResponseCache(object):
+    """ Cache of serialized responses for a single resource class.
+
+    :param CachePolicy policy:
+        The cache configuration.
+    :param str namespace:
+        Separates the entries of different resources sharing the same
+        backend.
+    """
+    def __init__(self, policy, namespace='default'):
+        self.policy = policy
+        self.namespace = namespace
+        self.backend = policy.backend or LocalCacheBackend(policy.max_entries)
+        self._refreshing = set()
+        self._known_keys = None
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self):
+        # type: () -> int
+        """ Current generation, pass it to `set()` when storing data. """
+        return self.backend.generation(self.namespace)
+
+    def make_key(self, kind, pk, params, user=None):
+        # type: (str, Any, Any, Any) -> Tuple
+        """ Build the cache key for the request.
+
+        :param str kind:
+            ``item`` or ``collection``.
+        :param pk:
+            Requested item primary key (**None** for collections).
+        :param params:
+            Request params (filters and ``_fields``). They're normalized so
+            the order in the query string and of the selected fields doesn't
+            matter.
+        :param user:
+            The user key, only used if the policy has *vary_user* set.
+        """
+        if isinstance(pk, list):
+            pk = tuple(pk)
+
+        return (
+            kind,
+            pk,
+            codec.canonical_dumps(url_params.canonical_params(params)),
+            user if self.policy.vary_user else None,
+        )
+
+    def get(self, key):
+        # type: (Tuple) -> Any
+        """ Return the `CacheEntry` or `MISSING`.
+
+        The entry might be stale, check it with `is_fresh()`.
+        """
+        return self.backend.get(self.namespace, key)
+
+    def set(self, key, data, generation, headers=None):
+        # type: (Tuple, Any, int, Optional[Dict[Text, Text]]) -> None
+        """ Cache the serialized *data*.
+
+        :param int generation:
+            The value of `generation` from before the data was loaded. If the
+            cache was invalidated in the meantime, the data might be stale and
+            is not stored.
+        :param Dict[str, str] headers:
+            Response headers to store along with the data.
+        """
+        self.backend.set(
+            self.namespace,
+            key,
+            CacheEntry(data, time.time(), headers or {}),
+            self.policy.retention,
+            generation,
+        )
+
+    @property
+    def missing_namespace(self):
+        # type: () -> Text
+        """ Backend namespace for the negative cache entries. """
+        return self.namespace + '#missing'
+
+    @property
+    def missing_generation(self):
+        # type: () -> int
+        """ Current generation of the negative cache. """
+        return self.backend.generation(self.missing_namespace)
+
+    def is_missing(self, key):
+        # type: (Tuple) -> bool
+        """ Check if the item for *key* is known to not exist. """
+        return self.backend.get(self.missing_namespace, key) is not MISSING
+
+    def set_missing(self, key, generation):
+        # type: (Tuple, int) -> None
+        """ Remember that the item for *key* does not exist.
+
+        Does nothing unless the policy has *negative_ttl* set.
+
+        :param int generation:
+            `missing_generation` from before the item was looked up.
+        """
+        if self.policy.negative_ttl:
+            self.backend.set(
+                self.missing_namespace,
+                key,
+                True,
+                self.policy.negative_ttl,
+                generation,
+            )
+
+    def known_keys(self, generation):
+        # type: (int) -> Optional[BloomFilter]
+        """ Return the `BloomFilter` of existing item keys.
+
+        The filter is kept per process and negative cache generation, so
+        it's rebuilt after items might have been created. Items created by
+        other processes with a separate backend don't change the generation,
+        so the filter also expires after *negative_ttl* (or *ttl* if not
+        set). That is the longest time such items can be reported missing.
+
+        :param int generation:
+            Current `missing_generation`.
+        :return BloomFilter:
+            The filter or **None** if it must be (re)built with
+            `set_known_keys()`.
+        """
+        current = self._known_keys
+        if current is None:
+            return None
+
+        known_generation, bloom, expires_at = current
+        if known_generation != generation or now() >= expires_at:
+            return None
+        return bloom
+
+    def set_known_keys(self, generation, keys):
+        # type: (int, Iterable[Any]) -> BloomFilter
+        """ Build the `BloomFilter` of existing item *keys*. """
+        bloom = BloomFilter.from_keys(keys)
+        ttl = self.policy.negative_ttl or self.policy.ttl
+        self._known_keys = (generation, bloom, now() + ttl)
+        return bloom
+
+    def age(self, entry):
+        # type: (CacheEntry) -> float
+        """ Return the *entry* age in seconds. """
+        return max(0.0, time.time() - entry.stored_at)
+
+    def is_fresh(self, entry):
+        # type: (CacheEntry) -> bool
+        """ Check whether *entry* is still within its ttl. """
+        return self.age(entry) < self.policy.ttl
+
+    def can_revalidate(self, entry):
+        # type: (CacheEntry) -> bool
+        """ Check if *entry* can be served while it's being refreshed. """
+        limit = self.policy.ttl + self.policy.stale_while_revalidate
+        return self.age(entry) < limit
+
+    def can_serve_on_error(self, entry):
+        # type: (CacheEntry) -> bool
+        """ Check if *entry* can be served if loading fresh data failed. """
+        return self.age(entry) < self.policy.ttl + self.policy.stale_if_error
+
+    def headers(self, entry=None):
+        # type: (Optional[CacheEntry]) -> Dict[Text, Text]
+        """ Return the response headers.
+
+        :param CacheEntry entry:
+            The entry the response is served from. **None** if the data was
+            just loaded.
+        """
+        headers = {'Cache-Control': self.policy.cache_control}
+        if entry is not None:
+            headers.update(entry.headers)
+            headers['Age'] = str(int(self.age(entry)))
+        return headers
+
+    def start_refresh(self, key):
+        # type: (Tuple) -> bool
+        """ Mark *key* as being refreshed in the background.
+
+        :return bool:
+            **False** if *key* is already being refreshed in this process.
+        """
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def end_refresh(self, key):
+        # type: (Tuple) -> None
+        """ Called after the background refresh of *key* has finished. """
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def invalidate(self, missing=True):
+        # type: (bool) -> None
+        """ Drop all cached responses.
+
+        :param bool missing:
+            Also drop the negative cache (the known missing items).
+        """
+        self.backend.invalidate(self.namespace)
+        if missing:
+            self.backend.invalidate(self.missing_namespace)
+
+        with self._lock:
+            self._refreshing.clear()
+
+
+# Used only in type hint comments
+del Any, Callable, Dict, Hashable, Iterable, Optional, Text, Tuple
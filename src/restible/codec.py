@@ -0,0 +1,527 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Request and response encodings used by the endpoints.
+
+The fastest available JSON library is picked at import time: orjson, then
+ujson, with the stdlib `json` module as the fallback. All codecs encode
+`datetime`, `date`, `time`, `Decimal` and `UUID` values, so resources can
+return them as is instead of formatting them as strings by hand::
+
+    >>> from restible import codec
+    >>> codec.dumps({'id': UUID(int=1), 'price': Decimal('1.50')})
+    b'{"id":"00000000-0000-0000-0000-000000000001","price":"1.50"}'
+
+The JSON codec used by restible can be changed with `use_json_codec()`.
+
+Apart from JSON, MessagePack and CBOR are supported if the ``msgpack`` or
+``cbor2`` package is installed. `registry` maps media types to codecs and is
+used by the endpoints to negotiate the request and response encoding based
+on the ``Content-Type`` and ``Accept`` headers. New codecs can be added with
+`CodecRegistry.register()`.
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import datetime
+import decimal
+import json
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Text, Tuple, Type, Union
+
+# 3rd party imports
+import six
+
+try:
+    import orjson
+except ImportError:     # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:     # pragma: no cover
+    ujson = None
+
+try:
+    import msgpack
+except ImportError:     # pragma: no cover
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:     # pragma: no cover
+    cbor2 = None
+
+
+JSON = 'application/json'
+NDJSON = 'application/x-ndjson'
+MSGPACK = 'application/msgpack'
+CBOR = 'application/cbor'
+
+
+def default(value):
+    # type: (Any) -> Any
+    """ Encode types not supported by JSON.
+
+    Dates and times are encoded in ISO 8601 format. Decimals are encoded as
+    strings so no precision is lost.
+
+    :raises TypeError:
+        If the type is not supported.
+    """
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    elif isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+
+    raise TypeError("{} is not JSON serializable".format(type(value).__name__))
+
+
+class Codec(object):
+    """ Base class for all codecs.
+
+    :var str name:
+        Codec name.
+    :var str media_type:
+        The media type of the encoded data.
+    """
+    name = None             # type: Text
+    media_type = None       # type: Text
+
+    @classmethod
+    def available(cls):
+        # type: () -> bool
+        """ Return **True** if the codec library is installed. """
+        return True
+
+    def dumps(self, value):
+        # type: (Any) -> bytes
+        """ Encode *value* as bytes. """
+        raise NotImplementedError("{}.dumps() not implemented".format(
+            self.__class__.__name__
+        ))
+
+    def loads(self, data):
+        # type: (bytes) -> Any
+        """ Decode *data*.
+
+        :raises ValueError:
+            If *data* is not valid.
+        """
+        raise NotImplementedError("{}.loads() not implemented".format(
+            self.__class__.__name__
+        ))
+
+
+class JsonCodec(Codec):
+    """ Base class for JSON codecs.
+
+    Codecs work on bytes, encoded as UTF-8. JSON codecs can also encode
+    streamed results item by item (see `restible.streaming`).
+    """
+    media_type = JSON
+
+
+class StdlibJsonCodec(JsonCodec):
+    """ Codec based on the stdlib `json` module. Always available. """
+    name = 'json'
+
+    def dumps(self, value):
+        # type: (Any) -> bytes
+        result = json.dumps(
+            value,
+            default=default,
+            ensure_ascii=False,
+            separators=(',', ':'),
+        )
+        if isinstance(result, six.text_type):
+            result = result.encode('utf-8')
+        return result
+
+    def loads(self, data):
+        # type: (bytes) -> Any
+        if isinstance(data, bytes):
+            data = data.decode('utf-8')
+        return json.loads(data)
+
+
+class OrjsonCodec(JsonCodec):
+    """ Codec based on `orjson <https://github.com/ijl/orjson>`_.
+
+    orjson is a lot stricter than the stdlib `json` (ie. integers must fit in
+    64 bits). Values it can't encode are passed to the stdlib codec.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        self._fallback = StdlibJsonCodec()
+
+    @classmethod
+    def available(cls):
+        # type: () -> bool
+        return orjson is not None
+
+    def dumps(self, value):
+        # type: (Any) -> bytes
+        try:
+            return orjson.dumps(
+                value, default=default, option=orjson.OPT_NON_STR_KEYS
+            )
+        except orjson.JSONEncodeError:
+            return self._fallback.dumps(value)
+
+    def loads(self, data):
+        # type: (bytes) -> Any
+        return orjson.loads(data)
+
+
+class UjsonCodec(JsonCodec):
+    """ Codec based on `ujson <https://github.com/ultrajson/ultrajson>`_.
+
+    Requires ujson 5.4+ (support for the *default* argument).
+    """
+    name = 'ujson'
+
+    @classmethod
+    def available(cls):
+        # type: () -> bool
+        return ujson is not None and hasattr(ujson, '__version__') and (
+            tuple(int(x) for x in ujson.__version__.split('.')[:2]) >= (5, 4)
+        )
+
+    def dumps(self, value):
+        # type: (Any) -> bytes
+        return ujson.dumps(value, default=default, ensure_ascii=False).encode(
+            'utf-8'
+        )
+
+    def loads(self, data):
+        # type: (bytes) -> Any
+        return ujson.loads(data)
+
+
+#: All JSON codecs, fastest first.
+JSON_CODECS = [
+    OrjsonCodec,
+    UjsonCodec,
+    StdlibJsonCodec,
+]   # type: List[Type[JsonCodec]]
+
+
+def best_json_codec():
+    # type: () -> JsonCodec
+    """ Return an instance of the fastest available JSON codec. """
+    for codec_cls in JSON_CODECS:
+        if codec_cls.available():
+            return codec_cls()
+
+    return StdlibJsonCodec()     # pragma: no cover
+
+
+def use_json_codec(codec):
+    # type: (Union[Text, JsonCodec]) -> JsonCodec
+    """ Change the JSON codec used by restible.
+
+    :param str|JsonCodec codec:
+        Codec instance or codec name (``orjson``, ``ujson`` or ``json``).
+    :return JsonCodec:
+        The previously used codec.
+    :raises ValueError:
+        If there is no available codec with the given name.
+    """
+    global json_codec    # pylint: disable=global-statement,invalid-name
+
+    if isinstance(codec, six.string_types):
+        by_name = {c.name: c for c in JSON_CODECS if c.available()}
+        if codec not in by_name:
+            raise ValueError("JSON codec '{}' is not available".format(codec))
+        codec = by_name[codec]()
+
+    prev, json_codec = json_codec, codec
+    return prev
+
+
+def dumps(value):
+    # type: (Any) -> bytes
+    """ Encode *value* as JSON using the current codec. """
+    return json_codec.dumps(value)
+
+
+def loads(data):
+    # type: (bytes) -> Any
+    """ Decode JSON *data* using the current codec. """
+    return json_codec.loads(data)
+
+
+def canonical_dumps(value):
+    # type: (Any) -> bytes
+    """ Encode *value* as JSON with sorted keys.
+
+    The output is the same for equal values, which makes it suitable for
+    hashing (ie. ETags). Uses orjson if available.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                value,
+                default=default,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            pass
+
+    result = json.dumps(
+        value,
+        default=default,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+    if isinstance(result, six.text_type):
+        result = result.encode('utf-8')
+    return result
+
+
+json_codec = best_json_codec()     # pylint: disable=invalid-name
+
+
+class CurrentJsonCodec(JsonCodec):
+    """ Delegates to the codec selected with `use_json_codec()`. """
+    name = 'json'
+
+    def dumps(self, value):
+        # type: (Any) -> bytes
+        return json_codec.dumps(value)
+
+    def loads(self, data):
+        # type: (bytes) -> Any
+        return json_codec.loads(data)
+
+
+class MsgpackCodec(Codec):
+    """ MessagePack codec. Requires the ``msgpack`` package. """
+    name = 'msgpack'
+    media_type = MSGPACK
+
+    @classmethod
+    def available(cls):
+        # type: () -> bool
+        return msgpack is not None
+
+    def dumps(self, value):
+        # type: (Any) -> bytes
+        return msgpack.packb(value, default=default, use_bin_type=True)
+
+    def loads(self, data):
+        # type: (bytes) -> Any
+        try:
+            return msgpack.unpackb(data, raw=False, strict_map_key=False)
+        except (msgpack.UnpackException, msgpack.ExtraData) as ex:
+            raise ValueError(str(ex))
+
+
+class CborCodec(Codec):
+    """ CBOR codec. Requires the ``cbor2`` package.
+
+    Datetimes, decimals and UUIDs are encoded with CBOR semantic tags, so they
+    are decoded back into the same types. CBOR timestamps always have a
+    timezone, naive datetimes are treated as UTC.
+    """
+    name = 'cbor'
+    media_type = CBOR
+
+    @classmethod
+    def available(cls):
+        # type: () -> bool
+        return cbor2 is not None
+
+    def dumps(self, value):
+        # type: (Any) -> bytes
+        return cbor2.dumps(value, default=_cbor_default, timezone=_UTC)
+
+    def loads(self, data):
+        # type: (bytes) -> Any
+        try:
+            return cbor2.loads(data)
+        except cbor2.CBORDecodeError as ex:
+            raise ValueError(str(ex))
+
+
+_UTC = getattr(datetime, 'timezone', None) and datetime.timezone.utc
+
+
+def _cbor_default(encoder, value):
+    # type: (Any, Any) -> None
+    encoder.encode(default(value))
+
+
+class CodecRegistry(object):
+    """ Maps media types to codecs.
+
+    :param str default_type:
+        Media type used when the client doesn't specify one.
+    """
+    #: Max number of parsed ``Accept`` headers kept in memory.
+    ACCEPT_CACHE_SIZE = 256
+
+    def __init__(self, default_type=JSON):
+        self.default_type = default_type
+        self._codecs = OrderedDict()    # type: Dict[Text, Codec]
+        self._accept_cache = {}         # type: Dict[Text, Tuple]
+
+    def register(self, codec, media_types=None):
+        # type: (Codec, Optional[List[Text]]) -> None
+        """ Register *codec* for the given media types.
+
+        :param Codec codec:
+            Codec instance.
+        :param List[str] media_types:
+            Media types handled by the codec. Defaults to
+            ``[codec.media_type]``.
+        """
+        for media_type in media_types or [codec.media_type]:
+            self._codecs[media_type.lower()] = codec
+        self._accept_cache.clear()
+
+    def unregister(self, media_type):
+        # type: (Text) -> None
+        """ Remove the codec registered for *media_type*. """
+        self._codecs.pop(media_type.lower(), None)
+        self._accept_cache.clear()
+
+    @property
+    def media_types(self):
+        # type: () -> List[Text]
+        """ All registered media types. """
+        return list(self._codecs)
+
+    @property
+    def default(self):
+        # type: () -> Codec
+        """ Codec for the default media type. """
+        return self._codecs[self.default_type]
+
+    def get(self, media_type):
+        # type: (Text) -> Optional[Codec]
+        """ Return the codec for *media_type* or **None**.
+
+        Media type parameters (ie. ``; charset=utf-8``) are ignored.
+        """
+        return self._codecs.get(media_type.split(';')[0].strip().lower())
+
+    def for_content_type(self, content_type):
+        # type: (Optional[Text]) -> Optional[Codec]
+        """ Return the codec for the request ``Content-Type``.
+
+        Returns the default codec if *content_type* is empty and **None** if
+        it's not supported.
+        """
+        if not content_type:
+            return self.default
+        return self.get(content_type)
+
+    def negotiate(self, accept):
+        # type: (Optional[Text]) -> Optional[Tuple[Text, Codec]]
+        """ Pick the response encoding based on the ``Accept`` header.
+
+        :param str accept:
+            The ``Accept`` header value.
+        :return tuple(str, Codec):
+            The response media type and codec. **None** if none of the
+            accepted media types is supported.
+        """
+        if not accept:
+            return self.default_type, self.default
+
+        result = self._accept_cache.get(accept)
+        if result is None:
+            if len(self._accept_cache) >= self.ACCEPT_CACHE_SIZE:
+                self._accept_cache.clear()
+
+            result = self._accept_cache[accept] = (self._negotiate(accept),)
+
+        return result[0]
+
+    def _negotiate(self, accept):
+        # type: (Text) -> Optional[Tuple[Text, Codec]]
+        for media_type in _parse_accept(accept):
+            if media_type == '*/*':
+                return self.default_type, self.default
+
+            elif media_type.endswith('/*'):
+                if self.default_type.startswith(media_type[:-1]):
+                    return self.default_type, self.default
+
+                for name, codec in self._codecs.items():
+                    if name.startswith(media_type[:-1]):
+                        return name, codec
+
+            elif media_type in self._codecs:
+                return media_type, self._codecs[media_type]
+
+        return None
+
+
+def _parse_accept(accept):
+    # type: (Text) -> List[Text]
+    """ Return media types from the ``Accept`` header, most preferred first.
+
+    Media types with ``q=0`` are not acceptable and are skipped.
+    """
+    entries = []
+    for pos, item in enumerate(accept.split(',')):
+        parts = item.split(';')
+        media_type = parts[0].strip().lower()
+        quality = 1.0
+
+        for param in parts[1:]:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if media_type and quality > 0:
+            entries.append((-quality, pos, media_type))
+
+    return [media_type for _, _, media_type in sorted(entries)]
+
+
+def default_registry():
+    # type: () -> CodecRegistry
+    """ Create a registry with all available codecs. """
+    result = CodecRegistry()
+    result.register(
+        CurrentJsonCodec(),
+        [JSON, NDJSON, 'application/ndjson'],
+    )
+
+    if MsgpackCodec.available():
+        result.register(MsgpackCodec(), [MSGPACK, 'application/x-msgpack'])
+
+    if CborCodec.available():
+        result.register(CborCodec())
+
+    return result
+
+
+#: Codecs used by the endpoints by default.
+registry = default_registry()     # pylint: disable=invalid-name
+
+
+# Used only in type hint comments
+del Any, Dict, List, Optional, Text, Tuple, Type, Union
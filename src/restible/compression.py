@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" gzip/deflate compression of requests and responses.
+
+Responses are compressed by the built-in WSGI and ASGI endpoints if the client
+accepts it (``Accept-Encoding``) and the body is at least
+`Compression.min_size` bytes long. Streamed responses are compressed chunk
+by chunk. Request bodies with ``Content-Encoding: gzip`` or ``deflate`` are
+decompressed by `RestEndpoint.decode_request_data()`.
+
+Compression is configured per endpoint::
+
+    class PostEndpoint(WsgiEndpoint):
+        compression = Compression(min_size=4096, level=5)
+
+Setting `RestEndpoint.compression` to **None** disables it.
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import zlib
+from typing import Any, Iterable, Iterator, List, Optional, Text, Tuple
+
+# 3rd party imports
+import attr
+
+# local imports
+from . import etag
+
+
+GZIP = 'gzip'
+DEFLATE = 'deflate'
+
+#: *wbits* argument for zlib for each encoding. HTTP deflate is zlib format.
+WBITS = {
+    GZIP: 16 + zlib.MAX_WBITS,
+    DEFLATE: zlib.MAX_WBITS,
+}
+
+
+@attr.s(frozen=True)
+class Compression(object):
+    """ Compression settings.
+
+    :param int min_size:
+        Responses smaller than that (in bytes) are not compressed. Streamed
+        responses have unknown size and are always compressed.
+    :param int level:
+        zlib compression level, 1 (fastest) to 9 (smallest).
+    :param tuple encodings:
+        Supported encodings, most preferred first.
+    :param int max_request_size:
+        Max size of the decompressed request body, in bytes.
+    """
+    min_size = attr.ib(type=int, default=1024)
+    level = attr.ib(type=int, default=6)
+    encodings = attr.ib(type=tuple, default=(GZIP, DEFLATE))
+    max_request_size = attr.ib(type=int, default=64 * 1024 * 1024)
+
+    def negotiate(self, accept_encoding):
+        # type: (Optional[Text]) -> Optional[Text]
+        """ Pick the response encoding based on the ``Accept-Encoding`` header.
+
+        :return str:
+            The encoding or **None** if the response should not be
+            compressed.
+        """
+        if not accept_encoding:
+            return None
+
+        accepted = parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+
+        for encoding in self.encodings:
+            quality = accepted.get(encoding, accepted.get('*', 0.0))
+            if quality > best_q:
+                best, best_q = encoding, quality
+
+        return best
+
+    def compress(self, data, encoding):
+        # type: (bytes, Text) -> bytes
+        """ Compress *data* with the given *encoding*. """
+        compressor = self.compressor(encoding)
+        return compressor.compress(data) + compressor.flush()
+
+    def iter_compress(self, chunks, encoding):
+        # type: (Iterable[bytes], Text) -> Iterator[bytes]
+        """ Compress a stream of chunks.
+
+        Every chunk is flushed, so the client gets the data as soon as it's
+        produced instead of waiting for the compressor to fill its buffers.
+        """
+        compressor = self.compressor(encoding)
+        try:
+            for chunk in chunks:
+                yield (
+                    compressor.compress(chunk) +
+                    compressor.flush(zlib.Z_SYNC_FLUSH)
+                )
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+
+        yield compressor.flush()
+
+    def decompress(self, data, encoding):
+        # type: (bytes, Text) -> bytes
+        """ Decompress the request body.
+
+        :raises ValueError:
+            If *data* is not valid or it's bigger than `max_request_size`
+            once decompressed.
+        :raises KeyError:
+            If *encoding* is not supported.
+        """
+        wbits = WBITS[encoding.strip().lower()]
+        decompressor = zlib.decompressobj(wbits)
+
+        try:
+            result = decompressor.decompress(data, self.max_request_size)
+        except zlib.error as ex:
+            raise ValueError("Invalid {} data: {}".format(encoding, ex))
+
+        if decompressor.unconsumed_tail:
+            raise ValueError("Request body too large")
+
+        return result
+
+    def apply(self, headers, body, accept_encoding):
+        # type: (List[Tuple[Text, Text]], Any, Optional[Text]) -> Tuple
+        """ Compress the rendered response if possible.
+
+        :param List[tuple] headers:
+            The response headers.
+        :param bytes|Iterator[bytes] body:
+            The response body. Iterators are compressed incrementally.
+        :param str accept_encoding:
+            The request ``Accept-Encoding`` header.
+        :return tuple(list, bytes|Iterator[bytes]):
+            Updated response headers and body.
+        """
+        headers, encoding = self.prepare(headers, body, accept_encoding)
+        if encoding is None:
+            return headers, body
+
+        if isinstance(body, bytes):
+            body = self.compress(body, encoding)
+            headers.append(('Content-Length', str(len(body))))
+        else:
+            body = self.iter_compress(body, encoding)
+
+        return headers, body
+
+    def prepare(self, headers, body, accept_encoding):
+        # type: (List[Tuple[Text, Text]], Any, Optional[Text]) -> Tuple
+        """ Decide whether the response should be compressed.
+
+        Arguments are the same as in `apply()`. *headers* is not modified in
+        place.
+
+        :return tuple(list, str):
+            Response headers and the encoding that should be used to compress
+            the body (or **None**). If the body will be compressed, the headers
+            have ``Content-Encoding`` set, no ``Content-Length`` and the
+            ``ETag`` is weak, as it's shared with the uncompressed body.
+        """
+        if isinstance(body, bytes):
+            if not body or len(body) < self.min_size:
+                return headers, None
+        elif body is None:
+            return headers, None
+
+        if any(name.lower() == 'content-encoding' for name, _ in headers):
+            return headers, None
+
+        headers = add_vary(headers, 'Accept-Encoding')
+
+        encoding = self.negotiate(accept_encoding)
+        if encoding is None:
+            return headers, None
+
+        headers = [
+            (name, value) for name, value in etag.weaken_headers(headers)
+            if name.lower() != 'content-length'
+        ]
+        headers.append(('Content-Encoding', encoding))
+
+        return headers, encoding
+
+    def compressor(self, encoding):
+        # type: (Text) -> Any
+        """ Create zlib compressor for the given *encoding*. """
+        return zlib.compressobj(self.level, zlib.DEFLATED, WBITS[encoding])
+
+
+def parse_accept_encoding(accept_encoding):
+    # type: (Text) -> dict
+    """ Parse ``Accept-Encoding`` header into ``{encoding: quality}`` dict. """
+    result = {}
+    for item in accept_encoding.split(','):
+        parts = item.split(';')
+        encoding = parts[0].strip().lower()
+        quality = 1.0
+
+        for param in parts[1:]:
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if encoding:
+            result[encoding] = quality
+
+    return result
+
+
+def add_vary(headers, name):
+    # type: (List[Tuple[Text, Text]], Text) -> List[Tuple[Text, Text]]
+    """ Return *headers* with *name* added to the ``Vary`` header. """
+    result = []
+    found = False
+
+    for header, value in headers:
+        if header.lower() == 'vary':
+            found = True
+            values = [v.strip() for v in value.split(',')]
+            if name.lower() not in (v.lower() for v in values):
+                value = ', '.join(values + [name])
+        result.append((header, value))
+
+    if not found:
+        result.append(('Vary', name))
+
+    return result
+
+
+# Used only in type hint comments
+del Any, Iterable, Iterator, List, Optional, Text, Tuple
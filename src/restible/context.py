@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Context of the request handled by `aio.AsyncRestEndpoint`.
+
+The async endpoint does not modify the request, the current request and the
+authorized user are stored in `current_request` and `current_user` context
+variables instead. They're defined here and not in `aio`, so the sync code
+(ie. `ModelResource.cache_user_key()`) can read them on any python version.
+Without ``contextvars`` (python < 3.7) they're **None**.
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+from typing import Any
+
+try:
+    import contextvars
+except ImportError:     # pragma: no cover
+    contextvars = None
+
+
+if contextvars is not None:
+    #: The request currently handled by `aio.AsyncRestEndpoint`.
+    current_request = contextvars.ContextVar('restible_request', default=None)
+
+    #: The user returned by `aio.AsyncRestEndpoint.authorize()` for the
+    #: current request.
+    current_user = contextvars.ContextVar('restible_user', default=None)
+else:     # pragma: no cover
+    current_request = None
+    current_user = None
+
+
+def get_current_user():
+    # type: () -> Any
+    """ Return `current_user` or **None** if there is no async request. """
+    if current_user is None:    # pragma: no cover
+        return None
+    return current_user.get()
+
+
+# Used only in type hint comments
+del Any
@@ -27,6 +27,7 @@ code is left for the subclasses.
 from __future__ import absolute_import, unicode_literals
 
 # stdlib imports
+from functools import partial
 from logging import getLogger
 from typing import Any, Dict, List, Text
 
@@ -35,13 +36,27 @@ import attr
 import jsonschema
 
 # local imports
-from .resource import RestResource
+from .resource import RestResource, default_handler
 from .actions import api_action
+from . import batch
 from . import url_params
+from . import codec
+from . import etag
 from . import exc
+from . import http
+from .compression import Compression
+from . import streaming
+from . import validation
+from .util import LazyDict
 
 
 L = getLogger(__name__)
+HTTP_METHODS = ('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS')
+# Payload for requests made with those methods is decoded only if accessed.
+LAZY_PAYLOAD_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
+CONDITIONAL_METHODS = frozenset(['GET', 'HEAD'])
+# Requests made with those methods do not modify the resource data.
+SAFE_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS'])
 
 
 @attr.s
@@ -49,11 +64,20 @@ class RestResult(object):
     """ Rest API call result.
 
     Kind of like an API response class and might evelove into one with time.
+
+    *data* can also be an iterator (or async iterator) of items, in which
+    case the response should be streamed. See `restible.streaming`.
     """
     status = attr.ib(type=int)
     headers = attr.ib(type=Dict[Text, Text])
     data = attr.ib(type=Dict[Text, Any])
 
+    @property
+    def is_stream(self):
+        # type: () -> bool
+        """ **True** if the data is an iterator and should be streamed. """
+        return streaming.is_stream(self.data)
+
 
 @attr.s
 class RawResponse(object):
@@ -83,6 +107,29 @@ class RestEndpoint(object):
         authorization.
     """
 
+    #: Codecs used to decode requests and encode responses. Can be overridden
+    #: per endpoint with a custom `codec.CodecRegistry`.
+    codecs = codec.registry
+
+    #: Response compression settings, see `compression.Compression`. Set to
+    #: **None** to disable compression of responses and requests.
+    compression = Compression()
+
+    #: If **True**, successful GET and HEAD responses get an ``ETag`` header
+    #: and requests with a matching ``If-None-Match`` get 304 Not Modified.
+    use_etags = False
+
+    #: Set to `singleflight.SingleFlight` to coalesce identical concurrent GET
+    #: and HEAD requests, see `flight_key()`. The instance is shared by all
+    #: endpoints of the class.
+    single_flight = None
+
+    #: Max number of operations in a single batch request, see `call_batch()`.
+    batch_max_size = 50
+
+    #: Max number of threads used to execute reads of a batch in parallel.
+    batch_workers = 8
+
     def __init__(self, resource=None, res_cls=None, protected=False):
         resource = resource or getattr(self, 'resource', None)
         res_cls = res_cls or getattr(self, 'res_cls', None)
@@ -103,6 +150,24 @@ class RestEndpoint(object):
             )
 
         self.protected = protected
+        self._actions = self.resource.action_index()
+        self._allow = {
+            has_pk: ', '.join(self.allowed_methods(has_pk))
+            for has_pk in (False, True)
+        }
+        self._version_hooks = {
+            has_pk: name if default_handler.is_implemented(
+                type(self.resource), name
+            ) else None
+            for has_pk, name in (
+                (False, 'collection_version'),
+                (True, 'item_version'),
+            )
+        }
+        self._verb_table = {}
+        for method in HTTP_METHODS:
+            for has_pk in (False, True):
+                self._verb_entry(method, has_pk)
 
     def is_resource(self, res_cls):
         """ Check if the given object is a resource class.
@@ -115,11 +180,30 @@ class RestEndpoint(object):
         return not (isinstance(res_cls, type) and
                     issubclass(res_cls, RestResource))
 
+    def allowed_methods(self, has_pk):
+        """ Return HTTP methods supported by the resource.
+
+        This is based purely on `RestResource.supported_verbs` so no resource
+        code is called.
+
+        :param bool has_pk:
+            **True** for the detail route, **False** for the collection route.
+        :return List[str]:
+            Uppercase HTTP methods that will be handled by the resource.
+        """
+        pk = True if has_pk else None
+        supported = self.resource.supported_verbs
+
+        return [
+            method for method in HTTP_METHODS
+            if self.determine_rest_verb(method, pk) in supported
+        ]
+
     def get_ok_status(self, verb):
         """ Get a valid ok status code for a given rest verb. """
         if verb == 'create':
             return 201
-        elif verb == 'delete':
+        elif verb in ('delete', 'bulk_delete'):
             return 204
         else:
             return 200
@@ -173,7 +257,11 @@ class RestEndpoint(object):
         return RestResult(status, headers, data)
 
     def call_rest_handler(self, method, request):
-        """
+        """ Call the resource handler for the given HTTP method.
+
+        The handler is looked up in a table built when the endpoint is created.
+        Methods not supported by the resource are rejected with 405 before
+        the request is authorized or its payload is touched.
 
         :param str method:
             HTTP method. Must be uppercase
@@ -186,44 +274,339 @@ class RestEndpoint(object):
             This method will expand those results with default and return a
             unified result tuple.
         """
-        my_pk = self.resource.get_pk(request)
+        has_pk = bool(self.resource.get_pk(request))
+
+        entry = self._verb_entry(method, has_pk)
+        if entry is False:
+            return self._not_allowed(has_pk)
+
+        handler_name, ok_status = entry
 
         request.user = self.authorize(request)
         if self.protected and request.user is None:
             return RestResult(401, {}, {'detail': "Not Authorized"})
 
-        rest_verb = self.determine_rest_verb(method, my_pk)
-        if rest_verb is None:
-            return RestResult(405, {}, None)
+        # Resolved on every call so the resource handlers can still be
+        # replaced at runtime (ie. mocked in tests).
+        handler = getattr(self.resource, handler_name)
+        params, payload, error = self._request_args(method, request)
+        if error is not None:
+            return error
 
-        handler = getattr(self.resource, 'rest_' + rest_verb, None)
-        if handler is None or not callable(handler):
-            return RestResult(405, {}, None)
+        try:
+            validators = None
+            version_hook = self.version_hook(method, has_pk)
+            if version_hook is not None:
+                validators = etag.version_headers(version_hook(request, params))
+                if self.is_not_modified(request, validators):
+                    return RestResult(304, validators, None)
+
+            def run():
+                return self.process_result(
+                    handler(request, params, payload), ok_status
+                )
 
-        qs = self.extract_request_query_string(request)
-        params = url_params.parse(qs)
-        payload = self.extract_request_data(request)
+            if self.single_flight is not None and method in CONDITIONAL_METHODS:
+                key = self.flight_key(
+                    request, handler_name, params, request.user
+                )
+                result, shared = self.single_flight.do(key, run)
+                if shared:
+                    result = self.shared_copy(result) or run()
+            else:
+                result = run()
 
-        try:
-            result = handler(request, params, payload)
-            return self.process_result(result, self.get_ok_status(rest_verb))
+            self.invalidate_after(
+                method, result, handler_name[len('rest_'):], request
+            )
+            return self.conditional_result(method, request, result, validators)
 
-        except exc.Error as ex:
+        except Exception as ex:
+            return self.error_result(ex)
+
+    def flight_key(self, request, handler_name, params, user):
+        """ Return the `single_flight` key for a read request.
+
+        Requests with equal keys are considered identical: they're for the
+        same resource, handler, pk, params (including normalized ``_fields``)
+        and have the same `auth_scope()`.
+
+        :return tuple:
+            Hashable key.
+        """
+        pk = self.resource.get_pk(request)
+        if isinstance(pk, list):
+            pk = tuple(pk)
+
+        return (
+            type(self.resource),
+            handler_name,
+            pk,
+            codec.canonical_dumps(url_params.canonical_params(params)),
+            self.auth_scope(request, user),
+        )
+
+    def auth_scope(self, request, user):
+        """ Return what defines the access rights of *user*.
+
+        Used to make sure `single_flight` never shares results between
+        requests that might see different data. By default every user has a
+        separate scope. Override to share results between users with the
+        same permissions (ie. return the user role).
+
+        :param request:
+            HTTP request.
+        :param user:
+            The user returned by `authorize()`.
+        :return Hashable:
+            The scope key.
+        """
+        if user is None:
+            return None
+        return getattr(user, 'pk', getattr(user, 'id', user))
+
+    def shared_copy(self, result):
+        """ Return a copy of the `single_flight` *result* for another request.
+
+        Streams and raw responses can only be consumed once, so they're not
+        shared. The data is not copied and must not be modified.
+
+        :param RestResult|RawResponse result:
+            The result produced for the first of the identical requests.
+        :return RestResult:
+            Result with its own headers or **None** if *result* can't be
+            shared and the handler must be called again.
+        """
+        if not isinstance(result, RestResult) or result.is_stream:
+            return None
+        return RestResult(result.status, dict(result.headers), result.data)
+
+    def invalidate_after(self, method, result, verb=None, request=None):
+        """ Invalidate resource caches after a successful write.
+
+        :param str method:
+            Uppercase HTTP method. Nothing is done for GET, HEAD and OPTIONS.
+        :param RestResult|RawResponse result:
+            The processed handler result. Error results (status >= 400) do
+            not invalidate anything.
+        :param str verb:
+            The REST verb or **None** for actions. Passed to
+            `RestResource.invalidate_cache()`.
+        :param request:
+            The handled request. For operations of an atomic batch, the
+            invalidation is deferred until the transaction commits (see
+            `batch.SubRequest`), so concurrent reads can't cache the data
+            from before the commit.
+        """
+        if method.upper() in SAFE_METHODS:
+            return
+
+        if isinstance(result, RawResponse) or result.status < 400:
+            deferred = getattr(request, 'deferred_invalidations', None)
+            if deferred is not None:
+                deferred.append((self.resource, verb))
+            else:
+                self.resource.invalidate_cache(verb)
+
+    def version_hook(self, method, has_pk):
+        """ Return the resource version hook for the request, if any.
+
+        The hooks are ``item_version`` and ``collection_version`` (see
+        `ModelResource.item_version()`). They're only used for GET and HEAD
+        requests and only if the resource implements them.
+
+        :param str method:
+            Uppercase HTTP method.
+        :param bool has_pk:
+            **True** for detail route, **False** for collection route.
+        :return Callable:
+            The bound hook or **None**.
+        """
+        name = self._version_hooks[has_pk]
+        if name is None or method not in CONDITIONAL_METHODS:
+            return None
+        return getattr(self.resource, name)
+
+    def is_not_modified(self, request, validators):
+        """ Check the request conditional headers against *validators*.
+
+        :param request:
+            HTTP request.
+        :param Dict[str, str] validators:
+            ``ETag`` and/or ``Last-Modified`` headers for the current data.
+        :return bool:
+            **True** if the client already has the current version.
+        """
+        if not validators:
+            return False
+
+        return etag.is_not_modified(
+            validators,
+            self.get_request_header(request, 'if-none-match'),
+            self.get_request_header(request, 'if-modified-since'),
+        )
+
+    def conditional_result(self, method, request, result, validators=None):
+        """ Add ``ETag`` to the result and handle ``If-None-Match``.
+
+        Only applies to successful GET and HEAD requests. If *validators*
+        were computed from the resource version they're just added to the
+        result. Otherwise, if `use_etags` is enabled, the ETag is computed
+        from the result data. Streamed results are never hashed as that would
+        require reading the whole stream. If the handler already set the
+        ``ETag`` header, it's used as is.
+
+        :param str method:
+            Uppercase HTTP method.
+        :param request:
+            HTTP request.
+        :param RestResult result:
+            The handler result.
+        :param Dict[str, str] validators:
+            Validator headers from the resource version (see `version_hook()`).
+        :return RestResult:
+            The result with ``ETag`` header or a 304 result with no data.
+        """
+        if (
+                method not in CONDITIONAL_METHODS or
+                not isinstance(result, RestResult) or
+                result.status != 200
+        ):
+            return result
+
+        if validators:
+            headers = dict(validators)
+            headers.update(result.headers)
+            return RestResult(result.status, headers, result.data)
+
+        if not self.use_etags or result.is_stream or result.data is None:
+            return result
+
+        tag = result.headers.get('ETag')
+        if tag is None:
+            tag = etag.compute(result.data)
+            headers = dict(result.headers)
+            headers['ETag'] = tag
+            result = RestResult(result.status, headers, result.data)
+
+        if_none_match = self.get_request_header(request, 'if-none-match')
+        if etag.not_modified(tag, if_none_match):
+            return RestResult(304, result.headers, None)
+
+        return result
+
+    def error_result(self, ex, invalid_value_status=400):
+        """ Convert an exception raised by a handler into `RestResult`.
+
+        :param Exception ex:
+            The exception raised by the handler.
+        :param int invalid_value_status:
+            HTTP status used for `ValueError`. If **None**, `ValueError` is
+            treated like any other unhandled exception.
+        :return RestResult:
+            The error result.
+        """
+        if isinstance(ex, exc.Error):
             return RestResult(ex.status, {}, {'detail': ex.detail})
 
-        except ValueError as ex:
+        elif isinstance(ex, ValueError) and invalid_value_status is not None:
             L.exception('Invalid REST invocation')
             L.error(ex)
-            return RestResult(400, {}, {'detail': str(ex)})
+            return RestResult(invalid_value_status, {}, {'detail': str(ex)})
 
-        except NotImplementedError as ex:
+        elif isinstance(ex, NotImplementedError):
             return RestResult(405, {}, {'detail': str(ex)})
 
-        except Exception as ex:
+        else:
             L.exception('Unhandled resource exception')
             L.error(ex)
             return RestResult(500, {}, {'detail': str(ex)})
 
+    def lazy_request_args(self, method, request):
+        """ Return *params* and *payload* that will be passed to the handler.
+
+        The params are always a `url_params.LazyParams` instance so the query
+        string is parsed only when the handler reads it. The payload for GET,
+        HEAD and OPTIONS requests is a `util.LazyDict` and is decoded only if
+        accessed. For all other methods it's decoded right away.
+
+        :param str method:
+            Uppercase HTTP method.
+        :param request:
+            HTTP request.
+        :return tuple(LazyParams, Any):
+            ``(params, payload)`` tuple.
+        """
+        extract_query_string = partial(self.extract_request_query_string, request)
+        extract_data = partial(self.extract_request_data, request)
+
+        if isinstance(request, batch.SubRequest):
+            # Batch operations carry already decoded params and body.
+            extract_query_string = partial(getattr, request, 'GET')
+            extract_data = partial(getattr, request, 'data')
+
+        params = url_params.LazyParams(extract_query_string)
+
+        if method.upper() in LAZY_PAYLOAD_METHODS:
+            payload = LazyDict(extract_data)
+        else:
+            payload = extract_data()
+
+        return params, payload
+
+    def _request_args(self, method, request):
+        """ Same as `lazy_request_args()` but handles payload decoding errors.
+
+        :return tuple(LazyParams, Any, RestResult):
+            ``(params, payload, error)`` tuple. *error* is **None** if the
+            payload was decoded successfully.
+        """
+        try:
+            params, payload = self.lazy_request_args(method, request)
+            return params, payload, None
+        except exc.Error as ex:
+            return None, None, self.error_result(ex)
+
+    def _verb_entry(self, method, has_pk):
+        """ Get the verb table entry, see `_build_verb_entry()`.
+
+        Only methods that map to a REST verb are stored in the table. The
+        method comes straight from the client, so storing every one of them
+        would let the table grow without bound.
+        """
+        entry = self._verb_table.get((method, has_pk))
+        if entry is None:
+            entry = self._build_verb_entry(method, has_pk)
+            if entry is None:
+                return False
+
+            entry = self._verb_table.setdefault((method, has_pk), entry)
+        return entry
+
+    def _not_allowed(self, has_pk):
+        return RestResult(405, {'Allow': self._allow[has_pk]}, None)
+
+    def _build_verb_entry(self, method, has_pk):
+        """ Build the verb table entry for the given HTTP method.
+
+        :param str method:
+            Uppercase HTTP method.
+        :param bool has_pk:
+            **True** for detail route, **False** for collection route.
+        :return tuple(str, int)|bool|None:
+            Tuple ``(handler_name, ok_status)``, **False** if the given
+            method is not supported by the resource or **None** if it doesn't
+            map to any REST verb.
+        """
+        rest_verb = self.determine_rest_verb(method, True if has_pk else None)
+        if rest_verb is None:
+            return None
+
+        if rest_verb not in self.resource.supported_verbs:
+            return False
+
+        return 'rest_' + rest_verb, self.get_ok_status(rest_verb)
+
     def call_action_handler(self, method, request, name, is_generic):
         """ Call an action on the bound resource.
 
@@ -242,13 +625,189 @@ class RestEndpoint(object):
         """
         action = self.find_action(name, is_generic, method)
         if action is None:
-            return RestResult(404, {}, {'detail': "{} has no action: {}".format(
-                self.resource.name, name
-            )})
+            return self._action_not_found(name)
 
         meta = api_action.get_meta(action)
         user = self.authorize(request)
 
+        error = self._check_action_access(meta, method, user)
+        if error is not None:
+            return error
+
+        request.user = user
+        params, payload, error = self._request_args(method, request)
+        if error is not None:
+            return error
+
+        payload, error = self._validate_action_payload(meta, payload)
+        if error is not None:
+            return error
+
+        try:
+            result = self.process_result(action(request, params, payload), 200)
+            if not is_generic:
+                self.invalidate_after(method, result, request=request)
+            return result
+
+        except Exception as ex:
+            return self.error_result(ex, invalid_value_status=None)
+
+    def call_batch(self, request, payload=None, endpoints=None):
+        """ Execute a batch of operations, see `restible.batch`.
+
+        :param request:
+            The batch HTTP request. Its headers are used by all operations.
+        :param payload:
+            Decoded batch payload. If not given, it's extracted from
+            *request*.
+        :param Dict[str, RestEndpoint] endpoints:
+            Endpoints by resource name. Operations can only target these
+            resources. Defaults to just this endpoint.
+        :return RestResult:
+            Result with the list of ``{status, headers, body}`` dicts, one for
+            each operation.
+        """
+        try:
+            if payload is None:
+                payload = self.extract_request_data(request)
+            operations, atomic = batch.parse(payload, self.batch_max_size)
+        except exc.Error as ex:
+            return self.error_result(ex)
+
+        endpoints = endpoints or {self.resource.name: self}
+        call = partial(self.call_operation, request, endpoints)
+
+        if not atomic:
+            results = batch.run(operations, call, self.batch_workers)
+            return RestResult(200, {}, results)
+
+        transaction = self.batch_transaction(request)
+        if transaction is None:
+            return RestResult(400, {}, {
+                'detail': "Atomic batches are not supported"
+            })
+
+        invalidations = []
+        call = partial(call, deferred_invalidations=invalidations)
+        try:
+            results = batch.run_atomic(operations, call, transaction)
+        except Exception as ex:
+            self.batch_rolled_back(operations, endpoints)
+            return self.error_result(ex)
+
+        if any(batch.is_error(x) for x in results):
+            self.batch_rolled_back(operations, endpoints)
+        else:
+            self.batch_committed(invalidations)
+
+        return RestResult(200, {}, results)
+
+    def call_operation(self, request, endpoints, operation,
+                       deferred_invalidations=None):
+        """ Execute a single batch operation.
+
+        :param request:
+            The batch HTTP request.
+        :param Dict[str, RestEndpoint] endpoints:
+            Endpoints by resource name.
+        :param batch.Operation operation:
+            The operation to execute.
+        :param List deferred_invalidations:
+            Collects cache invalidations inside an atomic batch, see
+            `batch.SubRequest`.
+        :return Dict[str, Any]:
+            The operation result, see `batch.make_result()`.
+        """
+        name = operation.resource or self.resource.name
+        endpoint = endpoints.get(name)
+        if endpoint is None:
+            return batch.make_result(404, {}, {
+                'detail': "Unknown resource: {}".format(name)
+            })
+
+        sub_request = batch.SubRequest(
+            request, operation, deferred_invalidations
+        )
+        if operation.pk is not None:
+            sub_request.rest_keys[http.pk_key(endpoint.resource)] = operation.pk
+
+        if operation.action is not None:
+            result = endpoint.call_action_handler(
+                operation.method,
+                sub_request,
+                operation.action,
+                operation.pk is None,
+            )
+        else:
+            result = endpoint.call_rest_handler(operation.method, sub_request)
+
+        return self.batch_result(result)
+
+    def batch_result(self, result):
+        """ Convert the operation *result* into `batch.make_result()` dict.
+
+        Streamed data is read into a list. Raw responses can't be included
+        in the batch response and are reported as errors.
+        """
+        if not isinstance(result, RestResult):
+            return batch.make_result(500, {}, {
+                'detail': "Raw responses are not supported in batches"
+            })
+
+        data = list(result.data) if result.is_stream else result.data
+        return batch.make_result(result.status, dict(result.headers), data)
+
+    def batch_transaction(self, request):
+        """ Return the transaction used for atomic batches.
+
+        Override to support ``"atomic": true`` batches. Atomic batches are
+        rejected if this returns **None** (the default).
+
+        :param request:
+            The batch HTTP request.
+        :return:
+            Context manager that commits on exit or rolls back if an
+            exception is raised, ie. ``django.db.transaction.atomic()``.
+        """
+        return None
+
+    def batch_committed(self, invalidations):
+        """ Called after an atomic batch was committed.
+
+        Does the cache invalidations deferred by `invalidate_after()` while
+        the transaction was open.
+
+        :param List[Tuple[RestResource, str]] invalidations:
+            ``(resource, verb)`` for every successful write in the batch.
+        """
+        for resource, verb in invalidations:
+            resource.invalidate_cache(verb)
+
+    def batch_rolled_back(self, operations, endpoints):
+        """ Called after an atomic batch was rolled back.
+
+        Reads executed inside the transaction could have stored uncommitted
+        data in the response cache, so the cache of every resource touched
+        by the batch is dropped.
+
+        :param List[batch.Operation] operations:
+            The operations of the batch.
+        :param Dict[str, RestEndpoint] endpoints:
+            Endpoints by resource name.
+        """
+        names = set(op.resource or self.resource.name for op in operations)
+        for name in names:
+            endpoint = endpoints.get(name)
+            if endpoint is not None:
+                endpoint.resource.invalidate_cache()
+
+    def _action_not_found(self, name):
+        return RestResult(404, {}, {'detail': "{} has no action: {}".format(
+            self.resource.name, name
+        )})
+
+    def _check_action_access(self, meta, method, user):
+        """ Return an error result if the action can't be called. """
         if meta.protected and user is None:
             return RestResult(401, {}, {'detail': "Not Authorized"})
 
@@ -259,35 +818,32 @@ class RestEndpoint(object):
                 )
             })
 
-        request.user = user
-        qs = self.extract_request_query_string(request)
-        params = url_params.parse(qs)
-        payload = self.extract_request_data(request)
-
-        if meta.schema is not None:
-            try:
-                jsonschema.validate(payload, meta.schema)
-            except jsonschema.ValidationError as ex:
-                return RestResult(400, {}, {'detail': str(ex)})
+        return None
 
-        try:
-            result = action(request, params, payload)
-            return self.process_result(result, 200)
+    def _validate_action_payload(self, meta, payload):
+        """ Validate action payload against the action schema (if defined).
 
-        except exc.Error as ex:
-            return RestResult(ex.status, {}, {'detail': ex.detail})
+        :return tuple(Any, RestResult):
+            The payload (decoded if it was lazy) and error result or **None**.
+        """
+        if meta.schema is None:
+            return payload, None
 
-        except NotImplementedError as ex:
-            return RestResult(405, {}, {'detail': str(ex)})
+        if isinstance(payload, LazyDict):
+            payload = payload.value
 
-        except Exception as ex:
-            L.exception('Unhandled resource exception')
-            L.error(ex)
-            return RestResult(500, {}, {'detail': str(ex)})
+        try:
+            validation.validate(payload, meta.schema)
+            return payload, None
+        except jsonschema.ValidationError as ex:
+            return payload, RestResult(400, {}, {'detail': str(ex)})
 
     def find_action(self, name, generic, method='post'):
         """ Find API action by name and kind.
 
+        The actions are indexed when the endpoint is created so this is just
+        a dictionary lookup.
+
         :param str name:
             The action name.
         :param bool is_generic:
@@ -298,19 +854,7 @@ class RestEndpoint(object):
             Action handler with it's associated metadata. THe metadata can
             be accessed using ``api_action.get_meta(action)``
         """
-        method = method.lower()
-
-        for action in self.resource.rest_actions():
-            meta = api_action.get_meta(action)
-
-            if (
-                    meta.name == name and
-                    meta.generic == generic and
-                    method in meta.methods
-            ):
-                return action
-
-        return None
+        return self._actions.get((name, generic, method.lower()))
 
     @classmethod
     def determine_rest_verb(cls, http_method, pk):
@@ -331,10 +875,10 @@ class RestEndpoint(object):
             return 'query' if not pk else 'get'
         elif http_method == 'POST' and not pk:
             return 'create'
-        elif http_method == 'PUT' and pk:
-            return 'update'
-        elif http_method == 'DELETE' and pk:
-            return 'delete'
+        elif http_method == 'PUT':
+            return 'update' if pk else 'bulk_update'
+        elif http_method == 'DELETE':
+            return 'delete' if pk else 'bulk_delete'
         elif http_method == 'OPTIONS':
             return 'options'
         elif http_method == 'HEAD':
@@ -378,6 +922,112 @@ class RestEndpoint(object):
         """
         return request.GET
 
+    @classmethod
+    def get_request_header(cls, request, name):
+        """ Return the value of the request header *name* or **None**.
+
+        By default this reads ``request.headers`` which works for most
+        frameworks. Endpoints for frameworks that store headers differently
+        should override this method.
+
+        :param Request request:
+            Underlying framework dependant request.
+        :param str name:
+            Header name, case insensitive.
+        """
+        headers = getattr(request, 'headers', None)
+        if headers is None:
+            return None
+        return headers.get(name.lower())
+
+    @classmethod
+    def decode_request_data(cls, request, body):
+        """ Decode the raw request *body* based on its ``Content-Type``.
+
+        Meant to be used by `extract_request_data()` implementations. The
+        codec is looked up in `codecs`, request without ``Content-Type`` are
+        decoded as JSON. Compressed bodies are decompressed first, see
+        `decompress_request_data()`.
+
+        :param Request request:
+            Underlying framework dependant request.
+        :param bytes body:
+            Raw request body.
+        :return:
+            Decoded request data. **None** if the body is empty.
+        :raises exc.UnsupportedMediaType:
+            If there is no codec for the request ``Content-Type``.
+        :raises exc.BadRequest:
+            If the body can't be decoded.
+        """
+        if not body:
+            return None
+
+        body = cls.decompress_request_data(request, body)
+
+        content_type = cls.get_request_header(request, 'content-type')
+        request_codec = cls.codecs.for_content_type(content_type)
+        if request_codec is None:
+            raise exc.UnsupportedMediaType(
+                "Unsupported content type: {}".format(content_type)
+            )
+
+        try:
+            return request_codec.loads(body)
+        except ValueError as ex:
+            raise exc.BadRequest("Invalid request body: {}".format(ex))
+
+    @classmethod
+    def decompress_request_data(cls, request, body):
+        """ Decompress the request *body* based on its ``Content-Encoding``.
+
+        :param Request request:
+            Underlying framework dependant request.
+        :param bytes body:
+            Raw request body.
+        :return bytes:
+            Decompressed body.
+        :raises exc.UnsupportedMediaType:
+            If the ``Content-Encoding`` is not supported.
+        :raises exc.BadRequest:
+            If the body can't be decompressed.
+        """
+        encoding = cls.get_request_header(request, 'content-encoding')
+        if not encoding or encoding.strip().lower() == 'identity':
+            return body
+
+        if cls.compression is None:
+            raise exc.UnsupportedMediaType(
+                "Unsupported content encoding: {}".format(encoding)
+            )
+
+        try:
+            return cls.compression.decompress(body, encoding)
+        except KeyError:
+            raise exc.UnsupportedMediaType(
+                "Unsupported content encoding: {}".format(encoding)
+            )
+        except ValueError as ex:
+            raise exc.BadRequest(str(ex))
+
+    def negotiate_response(self, request):
+        """ Pick the response encoding based on the ``Accept`` header.
+
+        :param Request request:
+            Underlying framework dependant request.
+        :return tuple(str, Codec):
+            The response media type and the codec used to encode it.
+        :raises exc.NotAcceptable:
+            If none of the media types accepted by the client is supported.
+        """
+        accept = self.get_request_header(request, 'accept')
+        result = self.codecs.negotiate(accept)
+        if result is None:
+            raise exc.NotAcceptable("Supported media types: {}".format(
+                ', '.join(self.codecs.media_types)
+            ))
+        return result
+
 
 # Used only in type hint comments
 del List, Text
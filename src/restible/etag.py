@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" ETags and conditional requests.
+
+The ETag is a hash of the canonical JSON encoding of the response data, so
+equal data always gets the same ETag, no matter what encoding is negotiated
+for the response. That makes it a weak validator (RFC 7232): the bytes of the
+JSON, MessagePack or gzipped representations differ. The built-in WSGI and
+ASGI endpoints send it as ``W/"..."`` (see `weaken_headers()`), so it's only
+used for ``If-None-Match`` and never pairs the wrong bytes in ``If-Range``.
+
+Resources can also provide a version of the data cheaply, without loading it
+(see `ModelResource.item_version()`). `version_headers()` turns such version
+into ``ETag`` or ``Last-Modified`` header and `is_not_modified()` checks it
+against the request conditional headers.
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import calendar
+import datetime
+import hashlib
+from email.utils import formatdate, mktime_tz, parsedate_tz
+from typing import Any, Dict, List, Optional, Text, Tuple
+
+# local imports
+from . import codec
+
+
+def compute(data):
+    # type: (Any) -> Text
+    """ Compute a strong ETag for the given response data.
+
+    :param Any data:
+        The response data, as returned by the handler.
+    :return str:
+        Quoted ETag value, ready to be used as the ``ETag`` header.
+    """
+    digest = hashlib.sha1(codec.canonical_dumps(data)).hexdigest()
+    return '"{}"'.format(digest)
+
+
+def parse_list(header):
+    # type: (Text) -> List[Text]
+    """ Parse ``If-None-Match``/``If-Match`` header into a list of ETags.
+
+    Weak ETags (``W/"..."``) are returned without the ``W/`` prefix.
+    """
+    result = []
+    for etag in header.split(','):
+        etag = etag.strip()
+        if etag.startswith('W/'):
+            etag = etag[2:]
+        if etag:
+            result.append(etag)
+    return result
+
+
+def not_modified(etag, if_none_match):
+    # type: (Text, Optional[Text]) -> bool
+    """ Return **True** if *etag* matches the ``If-None-Match`` header.
+
+    This means the client already has the current version and the server
+    should respond with 304 Not Modified. Uses the weak comparison, as
+    required by RFC 7232 for ``If-None-Match``.
+    """
+    if not if_none_match:
+        return False
+
+    etags = parse_list(if_none_match)
+    if '*' in etags:
+        return True
+
+    if etag.startswith('W/'):
+        etag = etag[2:]
+
+    return etag in etags
+
+
+def weaken_headers(headers):
+    # type: (List[Tuple[Text, Text]]) -> List[Tuple[Text, Text]]
+    """ Return *headers* with the ``ETag`` turned into a weak one. """
+    return [
+        (name, weaken(value) if name.lower() == 'etag' else value)
+        for name, value in headers
+    ]
+
+
+def weaken(etag):
+    # type: (Text) -> Text
+    """ Return the weak version of *etag*, ie. ``W/"abc"`` for ``"abc"``. """
+    if etag.startswith('W/'):
+        return etag
+    return 'W/' + etag
+
+
+def version_headers(version):
+    # type: (Any) -> Dict[Text, Text]
+    """ Return validator headers for the given data *version*.
+
+    :param str|int|datetime version:
+        Version token (ie. version column or a counter) or the last
+        modification time. Naive datetimes are treated as UTC.
+    :return Dict[str, str]:
+        ``ETag`` header for version tokens, ``Last-Modified`` for datetimes.
+        Empty dict if *version* is **None**.
+    """
+    if version is None:
+        return {}
+    elif isinstance(version, datetime.datetime):
+        return {'Last-Modified': format_http_date(version)}
+
+    return {'ETag': '"{}"'.format(version)}
+
+
+def is_not_modified(headers, if_none_match, if_modified_since):
+    # type: (Dict[Text, Text], Optional[Text], Optional[Text]) -> bool
+    """ Check the request conditional headers against the validators.
+
+    ``If-None-Match`` takes precedence over ``If-Modified-Since``, as
+    required by RFC 7232.
+
+    :param Dict[str, str] headers:
+        Validator headers, as returned by `version_headers()`.
+    :param str if_none_match:
+        The request ``If-None-Match`` header.
+    :param str if_modified_since:
+        The request ``If-Modified-Since`` header.
+    :return bool:
+        **True** if the server should respond with 304 Not Modified.
+    """
+    if if_none_match:
+        tag = headers.get('ETag')
+        return tag is not None and not_modified(tag, if_none_match)
+
+    last_modified = headers.get('Last-Modified')
+    if if_modified_since and last_modified:
+        since = parse_http_date(if_modified_since)
+        return since is not None and parse_http_date(last_modified) <= since
+
+    return False
+
+
+def format_http_date(value):
+    # type: (datetime.datetime) -> Text
+    """ Format datetime as HTTP date. Naive datetimes are treated as UTC. """
+    return formatdate(calendar.timegm(value.utctimetuple()), usegmt=True)
+
+
+def parse_http_date(value):
+    # type: (Text) -> Optional[int]
+    """ Parse HTTP date into a UTC timestamp. Returns **None** if invalid. """
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+
+    try:
+        return mktime_tz(parsed)
+    except (OverflowError, ValueError):
+        return None
+
+
+# Used only in type hint comments
+del Any, Dict, List, Optional, Text, Tuple
@@ -36,3 +36,15 @@ class NotFound(Error):
     """ Will be converted to HTTP 404 Not Found. """
     status = 404
     detail = "Not Found"
+
+
+class NotAcceptable(Error):
+    """ Will be converted to HTTP 406 Not Acceptable. """
+    status = 406
+    detail = "Not Acceptable"
+
+
+class UnsupportedMediaType(Error):
+    """ Will be converted to HTTP 415 Unsupported Media Type. """
+    status = 415
+    detail = "Unsupported Media Type"
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Minimal HTTP layer shared by the built-in WSGI and ASGI endpoints.
+
+Those endpoints do not depend on any web framework. The code here takes care
+of the very little they need: a lightweight request object, mapping URL paths
+to resource routes and rendering `RestResult` into an HTTP response.
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+from typing import Any, Callable, Dict, Iterator, List, Optional, Text, Tuple
+
+# 3rd party imports
+import attr
+from six.moves.http_client import responses
+from six.moves.urllib.parse import parse_qsl
+
+# local imports
+from . import codec, etag, streaming
+from .compression import add_vary
+
+
+#: Statuses that never have a response body.
+NO_BODY_STATUSES = frozenset([204, 304])
+
+
+class Request(object):
+    """ Lightweight request object used by the built-in endpoints.
+
+    It provides everything `RestEndpoint` needs: ``rest_keys``, ``GET`` and
+    ``user``. The query string is parsed only when ``GET`` is first accessed.
+
+    :param str method:
+        Uppercase HTTP method.
+    :param str path:
+        Request path.
+    :param str query_string:
+        Raw query string (without the leading ``?``).
+    :param Dict[str, str] headers:
+        Request headers. Names are lowercase.
+    :param bytes body:
+        Raw request body.
+    """
+    __slots__ = (
+        'method', 'path', 'query_string', 'headers', 'body', 'rest_keys',
+        'user', '_get',
+    )
+
+    def __init__(self, method, path, query_string='', headers=None, body=b''):
+        self.method = method
+        self.path = path
+        self.query_string = query_string
+        self.headers = headers or {}
+        self.body = body
+        self.rest_keys = {}
+        self.user = None
+        self._get = None
+
+    @property
+    def GET(self):     # pylint: disable=invalid-name
+        # type: () -> Dict[Text, Text]
+        """ Query string params as a dict. """
+        if self._get is None:
+            self._get = dict(
+                parse_qsl(self.query_string, keep_blank_values=True)
+            )
+        return self._get
+
+
+@attr.s(frozen=True)
+class Route(object):
+    """ The resource route matched by the request path.
+
+    :param str kind:
+        One of ``list``, ``item``, ``generic_action`` or ``action``.
+    :param str pk:
+        Primary key for ``item`` and ``action`` routes.
+    :param str action:
+        Action name for action routes.
+    """
+    kind = attr.ib(type=str)
+    pk = attr.ib(type=Optional[str], default=None)
+    action = attr.ib(type=Optional[str], default=None)
+
+
+def match_route(subpath, generic_actions):
+    # type: (Text, frozenset) -> Optional[Route]
+    """ Match the path below the endpoint prefix to a resource route.
+
+    Supported routes::
+
+        ''                  list
+        '/<pk>'             item
+        '/<name>'           generic_action (if it's a generic action name)
+        '/<pk>/<name>'      action
+
+    :param str subpath:
+        Path below the endpoint prefix.
+    :param frozenset generic_actions:
+        Names of all generic actions defined on the resource.
+    :return Route:
+        The matched route or **None** if the path doesn't match any.
+    """
+    parts = [p for p in subpath.split('/') if p]
+
+    if not parts:
+        return Route('list')
+    elif len(parts) == 1:
+        if parts[0] in generic_actions:
+            return Route('generic_action', action=parts[0])
+        return Route('item', pk=parts[0])
+    elif len(parts) == 2:
+        return Route('action', pk=parts[0], action=parts[1])
+    else:
+        return None
+
+
+def find_endpoint(endpoints, path):
+    # type: (List[Any], Text) -> Any
+    """ Find the first endpoint with the prefix matching *path*.
+
+    :param List[PrefixMixin] endpoints:
+        Endpoints, sorted with `sorted_by_prefix()`.
+    :param str path:
+        Request path.
+    :return PrefixMixin:
+        The matching endpoint or **None**.
+    """
+    for endpoint in endpoints:
+        if endpoint.match_prefix(path) is not None:
+            return endpoint
+
+    return None
+
+
+def dispatch(endpoint, request, route):
+    """ Call the endpoint handler for the matched route.
+
+    Works for both sync and async endpoints. For async endpoints the returned
+    value is a coroutine.
+    """
+    if route.pk is not None:
+        request.rest_keys[pk_key(endpoint.resource)] = route.pk
+
+    if route.kind in ('list', 'item'):
+        return endpoint.call_rest_handler(request.method, request)
+
+    return endpoint.call_action_handler(
+        request.method,
+        request,
+        route.action,
+        route.kind == 'generic_action',
+    )
+
+
+class PrefixMixin(object):
+    """ Mounting endpoints under a URL prefix.
+
+    Used by the built-in WSGI and ASGI endpoints.
+    """
+    prefix = ''
+
+    def init_prefix(self, prefix):
+        # type: (Optional[Text]) -> None
+        """ Initialize prefix and routing data. Call from the constructor. """
+        if prefix is not None:
+            self.prefix = prefix
+        self.prefix = self.prefix.rstrip('/')
+        self.generic_actions = frozenset(
+            name for name, generic, _ in self.resource.action_index()
+            if generic
+        )
+
+    def match_prefix(self, path):
+        # type: (Text) -> Optional[Text]
+        """ Return path below the endpoint prefix or **None** if no match. """
+        if not path.startswith(self.prefix):
+            return None
+
+        subpath = path[len(self.prefix):]
+        if subpath and not subpath.startswith('/'):
+            return None
+
+        return subpath
+
+    def match_route(self, path):
+        # type: (Text) -> Optional[Route]
+        """ Match request path to the resource route. """
+        subpath = self.match_prefix(path)
+        if subpath is None:
+            return None
+
+        return match_route(subpath, self.generic_actions)
+
+
+def sorted_by_prefix(endpoints):
+    # type: (List[Any]) -> List[Any]
+    """ Sort endpoints so the longest prefixes are matched first. """
+    return sorted(endpoints, key=lambda e: len(e.prefix), reverse=True)
+
+
+def pk_key(resource):
+    # type: (Any) -> Text
+    """ Return the ``rest_keys`` name used for the resource primary key.
+
+    This mirrors `RestResource.get_pk()`.
+    """
+    route_params = getattr(resource, 'route_params', None)
+    if route_params:
+        return route_params[0]['name']
+    return '{}_pk'.format(resource.name)
+
+
+def header_name(name):
+    # type: (Text) -> Text
+    """ Normalize header name (lowercase with dashes). """
+    return name.lower().replace('_', '-')
+
+
+def status_line(status):
+    # type: (int) -> Text
+    """ Return the full HTTP status line, ie. ``200 OK``. """
+    return '{} {}'.format(status, responses.get(status, 'Unknown'))
+
+
+def render_result(result, request, negotiated=None, stream_encoder=None):
+    # type: (Any, Request, Optional[Tuple], Callable) -> Tuple[int, List, Any]
+    """ Render `RestResult` into ``(status, headers, body)``.
+
+    If the result data is an iterator, the body is an iterator of encoded
+    chunks and the response has no ``Content-Length``. Lists and iterators are
+    encoded as NDJSON if that's the negotiated media type.
+
+    :param RestResult result:
+        The result returned by the endpoint.
+    :param Request request:
+        The request being handled. HEAD responses have no body. If they have
+        no data either, the ``Content-Length`` is left out.
+    :param tuple(str, Codec) negotiated:
+        Response media type and codec, as returned by
+        `RestEndpoint.negotiate_response()`. Defaults to JSON. If given, the
+        response gets ``Vary: Accept`` and a weak ``ETag``.
+    :param Callable stream_encoder:
+        Function used to encode streamed data. Same signature as
+        `encode_stream()`, which is used by default.
+    :return tuple(int, list, bytes|Iterator[bytes]):
+        The HTTP status, list of headers and the response body.
+    """
+    media_type, response_codec = negotiated or (
+        codec.JSON, codec.registry.default
+    )
+    headers = list(result.headers.items())
+    if negotiated is not None:
+        # The body depends on the Accept header, shared caches must know and
+        # the ETag is the same for all media types.
+        headers = etag.weaken_headers(add_vary(headers, 'Accept'))
+
+    data = result.data
+    stream = streaming.is_stream(data)
+    ndjson = media_type in streaming.NDJSON_TYPES and (
+        stream or isinstance(data, list)
+    )
+    if media_type in streaming.NDJSON_TYPES and not ndjson:
+        media_type = codec.JSON
+
+    if result.status in NO_BODY_STATUSES or data is None:
+        body = b''
+        # For HEAD, the GET body length is not known without rendering it.
+        if request.method != 'HEAD':
+            headers.append(('Content-Length', '0'))
+
+    elif ndjson or stream:
+        headers.append(('Content-Type', media_type))
+
+        if request.method == 'HEAD':
+            close = getattr(data, 'close', None)
+            if close is not None:
+                close()
+            return result.status, headers, b''
+
+        body = (stream_encoder or encode_stream)(data, ndjson, response_codec)
+
+    else:
+        body = response_codec.dumps(data)
+        headers.append(('Content-Type', media_type))
+        headers.append(('Content-Length', str(len(body))))
+
+    if request.method == 'HEAD':
+        body = b''
+
+    return result.status, headers, body
+
+
+def encode_stream(data, ndjson, response_codec):
+    # type: (Any, bool, Any) -> Iterator[bytes]
+    """ Encode streamed *data* into an iterator of chunks.
+
+    JSON codecs encode items one by one, as a JSON array or NDJSON. Other
+    codecs can only encode the whole response at once, so the items are
+    collected into a list first (lazily, when the first chunk is requested).
+    """
+    if isinstance(response_codec, codec.JsonCodec):
+        return streaming.iter_encoded(data, ndjson, response_codec.dumps)
+
+    return _iter_whole(data, response_codec)
+
+
+def _iter_whole(data, response_codec):
+    # type: (Any, Any) -> Iterator[bytes]
+    yield response_codec.dumps(list(data))
+
+
+def error_response(status, detail):
+    # type: (int, Text) -> Tuple[int, List[Tuple[Text, Text]], bytes]
+    """ Build a JSON error response outside of the resource handlers. """
+    body = codec.dumps({'detail': detail})
+    return status, [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(body))),
+    ], body
+
+
+# Used only in type hint comments
+del Any, Callable, Dict, Iterator, List, Optional, Text, Tuple
@@ -17,28 +17,113 @@
 from __future__ import absolute_import, unicode_literals
 
 # stdlib imports
+import threading
+from functools import partial
 from logging import getLogger
-from typing import Text
 
 # 3rd party imports
 import jsonschema
+import six
 from serafin import Fieldspec, serialize
 
 # local imports
-from .resource import RestResource
-from .util import iter_public_props
+from . import cache as response_cache
+from . import context
+from . import pagination
+from . import validation
+from .resource import RestResource, default_handler
+from .url_params import normalize_fields
+from .util import accepts_arg, iter_public_props
 
 
 L = getLogger(__name__)
 
+#: Query string param that makes ``GET`` on the collection return the count.
+COUNT_PARAM = '_count'
+
+#: Query string params that control the response and are not used as filters.
+NON_FILTER_PARAMS = (
+    '_fields', COUNT_PARAM, pagination.LIMIT_PARAM, pagination.CURSOR_PARAM
+)
+
+#: Parsed and restricted ``_fields`` specs, see `ModelResource._fields_spec()`.
+#: Keyed by ``(resource class, normalized _fields)``.
+fieldspec_cache = response_cache.LruCache(max_entries=1024)
+
+#: Schema of the bulk delete payload, a list of primary keys.
+BULK_DELETE_SCHEMA = {
+    'type': 'array',
+    'items': {'type': ['string', 'integer']},
+}
+
+
+def _with_required(schema, name):
+    """ Return a copy of the object *schema* with *name* field required. """
+    schema = dict(schema, required=[name])
+    if 'properties' in schema:
+        schema['properties'] = dict(schema['properties'])
+        schema['properties'].setdefault(name, {})
+
+    return schema
+
 
 class ModelResource(RestResource):
-    """ Base class for resources based on DB models. """
+    """ Base class for resources based on DB models.
+
+    The *schema*, *spec*, *read_only* and *model* class attributes are compiled
+    once, when the class is created (see `_compile_class()`). The request
+    handlers only use the compiled versions so those attributes should be
+    defined on the class and not modified at runtime.
+
+    If *streaming* is set to **True**, `rest_query` returns a generator instead
+    of a list. Items are then serialized one by one, as the response is being
+    sent, so ``query_items()`` can yield rows without ever loading the whole
+    result set into memory. The endpoint must support streamed results (the
+    built-in WSGI and ASGI endpoints do).
+
+    If *cache* is set to a `cache.CachePolicy`, the serialized results of
+    `rest_get` and `rest_query` are cached. The cache is shared by all
+    instances of the class and cleared by `invalidate_cache()`. The cached
+    data is returned as is, handlers must not modify it. Streamed results are
+    not cached. The policy can also allow serving expired entries while they
+    are refreshed (see `revalidate_in_background()`) or when loading the
+    data fails. Responses get ``Age`` and ``Cache-Control`` headers.
+
+    Bulk operations are supported as well: a list payload POSTed to the
+    collection is passed to ``create_items()``, and PUT and DELETE on the
+    collection call ``update_items()`` and ``delete_items()``. Updated items
+    are identified by their *pk_field* value. The whole list is validated in
+    one pass and the errors are reported per item.
+
+    If *sort_key* is set, `rest_query` results are paginated. The collection
+    is ordered by the given field (or tuple of fields, which together must be
+    unique) and the clients page through it with the ``_limit`` and
+    ``_cursor`` query params. Pages have *page_size* items by default and
+    never more than *max_page_size*. If there is a next page, the response
+    has a ``Link: <?...>; rel="next"`` header. Implement ``query_page()`` so
+    the backend can seek to the cursor instead of scanning the collection.
+
+    HEAD requests are answered without loading or serializing the data:
+    ``count_items()`` is used for the collection (the count is returned in
+    the ``X-Total-Count`` header) and ``item_exists()`` for a single item.
+    ``GET ?_count=1`` returns just the count of the queried collection.
+
+    If ``query_items()``, ``query_page()`` or ``get_item()`` has a *fields*
+    argument, it gets the `serafin.Fieldspec` the results will be serialized
+    with (the resource *spec* restricted by ``_fields``). The backend can use
+    it to load only the columns and relationships that will be returned.
+    """
 
     model = None
     spec = Fieldspec('*')
     schema = {}
     read_only = []
+    streaming = False
+    cache = None
+    pk_field = 'id'
+    sort_key = None
+    page_size = 50
+    max_page_size = 100
 
     class AlreadyExists(RuntimeError):
         """ Raised when an object already exists. """
@@ -52,6 +137,51 @@ class ModelResource(RestResource):
                 str(jsonschema_error)
             )
 
+    class BulkValidationError(RuntimeError):
+        """ Raised by .validate_items() if any of the items is invalid. """
+        def __init__(self, errors):
+            self.errors = errors
+            super(ModelResource.BulkValidationError, self).__init__(
+                "{} invalid items".format(len(errors))
+            )
+
+    @classmethod
+    def _compile_class(cls):
+        """ Precompute schemas, field specs and field sets for the class. """
+        # PUT is a partial update, all fields are optional.
+        update_schema = dict(cls.schema or {})
+        update_schema.pop('required', None)
+
+        cls._update_schema = update_schema
+        cls._bulk_create_schema = {'type': 'array', 'items': cls.schema or {}}
+        cls._bulk_update_schema = {
+            'type': 'array',
+            'items': _with_required(update_schema, cls.pk_field),
+        }
+        cls._base_spec = Fieldspec(cls.spec)
+        cls._public_props = tuple(
+            name for name, _ in iter_public_props(cls.model)
+        )
+        cls._read_only_fields = (
+            frozenset(cls.read_only or []) | frozenset(cls._public_props)
+        )
+        cls._response_cache = (
+            response_cache.ResponseCache(
+                cls.cache, '{}.{}'.format(cls.__module__, cls.__name__)
+            )
+            if cls.cache is not None else None
+        )
+        cls._has_known_pks = default_handler.is_implemented(cls, 'known_pks')
+        cls._has_query_page = default_handler.is_implemented(cls, 'query_page')
+        cls._fields_hooks = frozenset(
+            name for name in ('query_items', 'query_page', 'get_item')
+            if accepts_arg(getattr(cls, name), 'fields')
+        )
+        cls._sort_key = (
+            (cls.sort_key,) if isinstance(cls.sort_key, six.string_types)
+            else tuple(cls.sort_key or ())
+        )
+
     def validate(self, data, schema=None):
         """ Validate the *data* according to the given *schema*.
 
@@ -63,10 +193,31 @@ class ModelResource(RestResource):
             If the validation fails. No value is returned.
         """
         try:
-            jsonschema.validate(data, schema or self.schema)
+            validation.validate(data, schema or self.schema)
         except jsonschema.ValidationError as ex:
             raise ModelResource.ValidationError(ex)
 
+    def validate_items(self, items, schema):
+        """ Validate a list of items with one validator pass.
+
+        :param List[Dict[str, Any]] items:
+            The items to validate.
+        :param Dict[str, Any] schema:
+            JSONSchema describing the whole list.
+        :raises ModelResource.BulkValidationError:
+            If any of the items is not valid. The exception *errors* contain
+            the ``index`` and ``detail`` of every invalid item.
+        """
+        errors = validation.item_errors(items, schema)
+        if None in errors:
+            raise ModelResource.ValidationError(errors[None])
+
+        if errors:
+            raise ModelResource.BulkValidationError([
+                {'index': index, 'detail': errors[index].message}
+                for index in sorted(errors)
+            ])
+
     def serialize(self, item, spec=None):
         """ Serialize an item or items into a dict.
 
@@ -79,7 +230,7 @@ class ModelResource(RestResource):
             format like JSON or YAML.
         """
         if spec is None:
-            spec = self.spec
+            spec = self._base_spec
 
         return serialize(item, spec)
 
@@ -91,38 +242,6 @@ class ModelResource(RestResource):
         """
         return data
 
-    def implements(self, rest_verb):
-        # type: (Text) -> bool
-        """ Check whether this model resource implements a given REST verb.
-
-        Args:
-            rest_verb (str):
-                The REST verb you want to check. Possible values are *create*,
-                *query*, *get*, *update* and *delete*.
-
-        Returns:
-            bool: **True** if the given REST verb is implemented, **False**
-                otherwise.
-        """
-        test = {
-            'create': lambda: self.create_item(None, {}, {}),
-            'query': lambda: self.query_items(None, {}, {}),
-            'get': lambda: self.get_item(None, {}, {}),
-            'update': lambda: self.update_item(None, {}, {}),
-            'delete': lambda: self.delete_item(None, {}, {}),
-        }.get(rest_verb)
-
-        if test:
-            try:
-                test()
-                return True
-            except NotImplementedError:
-                return False
-            except:
-                return True
-        else:
-            return False
-
     def item_for_request(self, request):
         """ Create new model item. """
         del request     # Unused here
@@ -130,27 +249,93 @@ class ModelResource(RestResource):
             "All resources must  implement .item_for_request()"
         )
 
+    def cache_user_key(self, request):
+        """ Return the key identifying the user in the response cache.
+
+        Only used if the resource `cache` policy has *vary_user* set. By
+        default it's the ``pk`` or ``id`` of the authorized user: the
+        `context.current_user` with the async endpoints (they don't set
+        ``request.user``) or ``request.user`` otherwise.
+
+        :return Hashable:
+            The user key. **None** for anonymous requests.
+        """
+        user = context.get_current_user()
+        if user is None:
+            user = getattr(request, 'user', None)
+        if user is None:
+            return None
+        return getattr(user, 'pk', getattr(user, 'id', user))
+
+    def invalidate_cache(self, verb=None):
+        """ Drop all cached responses for this resource class.
+
+        The negative cache (known missing items) is kept after deletes as
+        those can't make a missing item appear.
+        """
+        if self._response_cache is not None:
+            self._response_cache.invalidate(
+                missing=verb not in ('delete', 'bulk_delete')
+            )
+
     @property
     def public_props(self):
         """ All public properties on the resource model. """
-        if not hasattr(self, '_public_props'):
-            self._public_props = [
-                name for name, _ in iter_public_props(self.model)
-            ]
         return self._public_props
 
+    @default_handler()
     def create_item(self, request, params, payload):
         """ Create new model item. """
         raise NotImplementedError("Must implement .create_item()")
 
+    @default_handler()
     def update_item(self, request, params, payload):
         """ Update existing model item. """
         raise NotImplementedError("Must implement .update_item()")
 
+    @default_handler()
     def delete_item(self, request, params, payload):
         """ Delete model instance. """
         raise NotImplementedError("Must implement .delete_item()")
 
+    @default_handler('create_item')
+    def create_items(self, request, params, items):
+        """ Create multiple model items.
+
+        The default implementation calls ``create_item()`` for every item.
+        Override it to insert all items with a single statement. If it raises,
+        the resource cache is invalidated anyway, as some items might have
+        been created.
+
+        :param List[Dict[str, Any]] items:
+            Deserialized values for every new item.
+        :return List:
+            The created items, in the same order.
+        """
+        return [self.create_item(request, params, values) for values in items]
+
+    @default_handler()
+    def update_items(self, request, params, items):
+        """ Update multiple existing model items.
+
+        :param List[Tuple[Any, Dict[str, Any]]] items:
+            ``(pk, values)`` tuple for every updated item.
+        :return List:
+            The updated items, in the same order. **None** for items that do
+            not exist.
+        """
+        raise NotImplementedError("Must implement .update_items()")
+
+    @default_handler()
+    def delete_items(self, request, params, pks):
+        """ Delete multiple model instances.
+
+        :param List pks:
+            Primary keys of the items to delete.
+        """
+        raise NotImplementedError("Must implement .delete_items()")
+
+    @default_handler()
     def query_items(self, request, params, payload):
         """ Return a model query with the given filters.
 
@@ -161,6 +346,53 @@ class ModelResource(RestResource):
         """
         raise NotImplementedError("Must implement .query_items()")
 
+    @default_handler('query_items')
+    def count_items(self, request, params, payload):
+        """ Return the number of items matching the given filters.
+
+        Used by HEAD and ``GET ?_count=1`` requests on the collection. The
+        default implementation counts the items returned by
+        ``query_items()``, without serializing them. Override it to count
+        in the database instead.
+
+        :return int:
+            The number of items.
+        """
+        return sum(1 for _ in self.query_items(request, params, payload))
+
+    @default_handler('get_item')
+    def item_exists(self, request, params, payload):
+        """ Check whether the requested item exists.
+
+        Used by HEAD requests on the item. The default implementation calls
+        ``get_item()``, override it with a cheaper existence check.
+
+        :return bool:
+            **True** if the item exists.
+        """
+        return self.get_item(request, params, payload) is not None
+
+    @default_handler()
+    def query_page(self, request, params, payload, page):
+        """ Return one page of the collection.
+
+        Optional, only used if *sort_key* is set. If not implemented, the page
+        is selected from all items returned by ``query_items()``, which
+        works but still reads the whole collection.
+
+        :param Dict[str, Any] params:
+            The filters, same as for ``query_items()``.
+        :param pagination.Page page:
+            The requested page. The items should be ordered by
+            ``page.sort_key`` (ascending) and start right after the
+            ``page.after`` values (all items if it's **None**).
+        :return Iterable:
+            Up to ``page.limit + 1`` items. Only the first ``page.limit`` are
+            returned to the client, the extra one tells there is a next page.
+        """
+        raise NotImplementedError("Must implement .query_page()")
+
+    @default_handler()
     def get_item(self, request, params, payload):
         """ Get an item associated with the request.
 
@@ -178,22 +410,100 @@ class ModelResource(RestResource):
             self.__class__.__name__
         ))
 
+    @default_handler()
+    def item_version(self, request, params):
+        """ Return the current version of the requested item.
+
+        Optional. If implemented, it's called by the endpoint before
+        ``get_item()``. If the client already has this version (checked with
+        ``If-None-Match`` or ``If-Modified-Since``), the endpoint responds with
+        304 without loading or serializing the item. Should be cheap, ie.
+        read a version column or a counter.
+
+        :return str|int|datetime:
+            Version token or the last modification time. **None** if unknown,
+            in which case the request is handled as usual.
+        """
+        return None
+
+    @default_handler()
+    def known_pks(self):
+        """ Return primary keys of all existing items.
+
+        Optional, only used if the resource `cache` is enabled. If
+        implemented, the keys are loaded into a `cache.BloomFilter` and
+        ``rest_get`` responds with 404 for keys that are not in the filter,
+        without calling ``get_item()``. The filter is rebuilt after items
+        might have been created and at least every ``negative_ttl`` (or
+        ``ttl``) seconds, so this is best suited for resources that are read
+        much more often than created.
+
+        :return Iterable:
+            All existing primary keys. For multiple keys (nested routes),
+            tuples of keys.
+        """
+        raise NotImplementedError("known_pks() is not implemented")
+
+    @default_handler()
+    def collection_version(self, request, params):
+        """ Return the current version of the queried collection.
+
+        Same as `item_version()` but for ``rest_query``. The version should
+        change whenever any item matching the query changes.
+        """
+        return None
+
+    @default_handler('query_items', 'query_page')
     def rest_query(self, request, params, payload):
         """ Query existing records as a list. """
-        try:
-            fields = params.pop('_fields', '*')
-
-            filters = self.deserialize(params)
-            items = self.query_items(request, filters, payload)
+        def load():
+            filters = dict(params)
+            fields = filters.pop('_fields', '*')
+            spec = self._fields_spec(fields)
+
+            if filters.pop(COUNT_PARAM, None):
+                count = self.count_items(
+                    request, self.deserialize(self._count_filters(filters)),
+                    payload
+                )
+                return 200, self._count_headers(count), {'count': count}
+
+            if self._sort_key:
+                page = self._page(filters)
+                if self._has_query_page:
+                    items = self.query_page(
+                        request, self.deserialize(filters), payload, page,
+                        **self._fields_kwargs('query_page', spec)
+                    )
+                else:
+                    items = page.apply(self.query_items(
+                        request, self.deserialize(filters), payload,
+                        **self._fields_kwargs('query_items', spec)
+                    ))
+
+                return self._page_result(params, page, items, spec)
+
+            items = self.query_items(
+                request, self.deserialize(filters), payload,
+                **self._fields_kwargs('query_items', spec)
+            )
+            if self.streaming:
+                return 200, (self.serialize(x, spec) for x in items)
 
-            spec = Fieldspec(self.spec).restrict(Fieldspec(fields))
             return 200, [self.serialize(x, spec) for x in items]
 
+        try:
+            return self._cached_response(request, 'collection', params, load)
+
         except NotImplementedError:
             return 404, {'detail': 'Not Found'}
 
+    @default_handler('create_item', 'create_items')
     def rest_create(self, request, params, payload):
-        """ Create a new record. """
+        """ Create a new record, or multiple records if *payload* is a list. """
+        if isinstance(payload, list):
+            return self._bulk_create(request, params, payload)
+
         try:
             self.validate(payload, self.schema)
 
@@ -211,40 +521,31 @@ class ModelResource(RestResource):
         except NotImplementedError:
             return 404, {'detail': 'Not Found'}
 
+    @default_handler('get_item')
     def rest_get(self, request, params, payload):
         """ Get one record with the given id. """
-        try:
-            fields = Fieldspec(params.get('_fields', '*'))
-
-            spec = Fieldspec(self.spec).restrict(fields)
-            item = self.get_item(request, params, payload)
+        def load():
+            spec = self._fields_spec(params.get('_fields', '*'))
+            item = self.get_item(
+                request, params, payload, **self._fields_kwargs('get_item', spec)
+            )
 
             if item is not None:
                 return 200, self.serialize(item, spec)
             else:
                 return 404, {'detail': "Not Found"}
 
+        try:
+            return self._cached_response(request, 'item', params, load)
+
         except NotImplementedError:
             return 404, {'detail': 'Not Found'}
 
+    @default_handler('update_item')
     def rest_update(self, request, params, payload):
         """ Update existing item. """
-        schema = {}
-        schema.update(self.schema)
-
-        if 'required' in schema:
-            del schema['required']
-
         try:
-            self.validate(payload, schema)
-
-            values = self.deserialize(payload)
-            read_only = (
-                frozenset(self.read_only or []) | frozenset(self.public_props or [])
-            )
-            for name in read_only:
-                values.pop(name, None)
-
+            values = self._update_values(payload)
             item = self.update_item(request, params, values)
 
             if item is not None:
@@ -258,6 +559,7 @@ class ModelResource(RestResource):
         except NotImplementedError:
             return 404, {'detail': 'Not Found'}
 
+    @default_handler('delete_item')
     def rest_delete(self, request, params, payload):
         """ DELETE detail. """
         try:
@@ -268,6 +570,311 @@ class ModelResource(RestResource):
         except NotImplementedError:
             return 404, {'detail': 'Not Found'}
 
+    @default_handler('count_items', 'item_exists')
+    def rest_head(self, request, params, payload):
+        """ HEAD list/detail. Only the headers, nothing is serialized. """
+        try:
+            if self.get_pk(request):
+                if self.item_exists(request, params, payload):
+                    return 200, {}, None
+                return 404, {}, None
+
+            filters = self._count_filters(params)
+            count = self.count_items(
+                request, self.deserialize(filters), payload
+            )
+            return 200, self._count_headers(count), None
+
+        except NotImplementedError:
+            return 404, {}, None
+
+    @default_handler('update_items')
+    def rest_bulk_update(self, request, params, payload):
+        """ Update multiple existing items.
+
+        See `_bulk_update_result()` for how missing items are reported.
+        """
+        try:
+            items = self._bulk_update_values(payload)
+            updated = self.update_items(request, params, items)
+
+            return self._bulk_update_result(updated)
+
+        except ModelResource.ValidationError as ex:
+            return 400, {'detail': str(ex)}
+
+        except ModelResource.BulkValidationError as ex:
+            return 400, {'detail': str(ex), 'errors': ex.errors}
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
+
+    @default_handler('delete_items')
+    def rest_bulk_delete(self, request, params, payload):
+        """ DELETE list. The payload is a list of primary keys. """
+        try:
+            self.validate_items(payload, BULK_DELETE_SCHEMA)
+            self.delete_items(request, params, payload)
+
+            return 204, {}
+
+        except ModelResource.ValidationError as ex:
+            return 400, {'detail': str(ex)}
+
+        except ModelResource.BulkValidationError as ex:
+            return 400, {'detail': str(ex), 'errors': ex.errors}
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
+
+    def _bulk_create(self, request, params, payload):
+        try:
+            self.validate_items(payload, self._bulk_create_schema)
+
+            values = [self.deserialize(data) for data in payload]
+            try:
+                items = self.create_items(request, params, values)
+            except Exception:
+                # Items created before the error are already stored, even
+                # though the response is an error.
+                self.invalidate_cache('create')
+                raise
+
+            return [self.serialize(item) for item in items]
+
+        except ModelResource.BulkValidationError as ex:
+            return 400, {'detail': str(ex), 'errors': ex.errors}
+
+        except ModelResource.AlreadyExists:
+            return 400, {'detail': 'Already exists'}
+
+        except NotImplementedError:
+            return 404, {'detail': 'Not Found'}
+
+    def _bulk_update_values(self, payload):
+        """ Validate bulk update *payload* and return ``update_items`` values.
+
+        :return List[Tuple[Any, Dict[str, Any]]]:
+            ``(pk, values)`` tuple for every item.
+        """
+        self.validate_items(payload, self._bulk_update_schema)
+
+        items = []
+        for data in payload:
+            values = self.deserialize(data)
+            pk = values.pop(self.pk_field)
+            for name in self._read_only_fields:
+                values.pop(name, None)
+
+            items.append((pk, values))
+
+        return items
+
+    def _bulk_update_result(self, updated):
+        """ Build the bulk update response from ``update_items`` result.
+
+        If only some items were found, the others are already updated so the
+        response is ``207 Multi-Status`` (a success, so the cache is
+        invalidated) with **None** in place of the missing items and their
+        indexes in ``errors``. 404 is only returned if nothing was updated.
+        """
+        updated = list(updated)
+        missing = [
+            {'index': index, 'detail': 'Not Found'}
+            for index, item in enumerate(updated) if item is None
+        ]
+        if len(missing) == len(updated):
+            return 404, {'detail': 'Not Found', 'errors': missing}
+
+        items = [
+            None if item is None else self.serialize(item) for item in updated
+        ]
+        if missing:
+            return 207, {
+                'detail': 'Some items were not found',
+                'items': items,
+                'errors': missing,
+            }
+
+        return 200, items
+
+    def _update_values(self, payload):
+        """ Validate update *payload* and return values for ``update_item``.
+
+        :raises ModelResource.ValidationError:
+            If the payload is not valid.
+        """
+        self.validate(payload, self._update_schema)
+
+        values = self.deserialize(payload)
+        for name in self._read_only_fields:
+            values.pop(name, None)
+
+        return values
+
+    @staticmethod
+    def _count_filters(params):
+        """ Return the query *params* without the ones that are not filters. """
+        filters = dict(params)
+        for name in NON_FILTER_PARAMS:
+            filters.pop(name, None)
+        return filters
+
+    @staticmethod
+    def _count_headers(count):
+        return {'X-Total-Count': str(count)}
+
+    def _page(self, filters):
+        """ Pop the pagination params from *filters* and return the `Page`. """
+        return pagination.from_params(
+            filters, self._sort_key, self.page_size, self.max_page_size
+        )
+
+    def _page_result(self, params, page, items, spec):
+        """ Return the ``(status, headers, data)`` result for the *page*. """
+        items, cursor = page.split(items)
+
+        headers = {}
+        if cursor is not None:
+            headers['Link'] = pagination.next_link(params, cursor, page.limit)
+
+        return 200, headers, [self.serialize(x, spec) for x in items]
+
+    def revalidate_in_background(self, refresh):
+        """ Run the refresh of a stale cache entry in the background.
+
+        Used by the ``stale_while_revalidate`` cache policy. The default
+        implementation starts a daemon thread. Override it to use an existing
+        worker pool.
+
+        :param Callable refresh:
+            Function that loads the fresh data and stores it in the cache.
+        """
+        thread = threading.Thread(target=refresh)
+        thread.daemon = True
+        thread.start()
+
+    def _cached_response(self, request, kind, params, load):
+        """ Call *load* through the response cache.
+
+        :param str kind:
+            ``item`` or ``collection``.
+        :param Callable load:
+            Function returning the ``(status, data)`` or ``(status, headers,
+            data)`` result. Only results with status 200 are cached.
+        :return tuple:
+            The handler result.
+        """
+        cache = self._response_cache
+        if cache is None or (kind == 'collection' and self.streaming):
+            return load()
+
+        if kind == 'item':
+            missing_key = self._cache_key(request, 'missing', {})
+            missing_generation = cache.missing_generation
+            if self._is_missing(request, missing_key, missing_generation):
+                return 404, {'detail': "Not Found"}
+
+        key = self._cache_key(request, kind, params)
+        generation = cache.generation
+        entry = cache.get(key)
+
+        if entry is not response_cache.MISSING:
+            if cache.is_fresh(entry):
+                return 200, cache.headers(entry), entry.data
+
+            if cache.can_revalidate(entry):
+                if cache.start_refresh(key):
+                    self.revalidate_in_background(
+                        partial(self._refresh_cache, key, load)
+                    )
+                return 200, cache.headers(entry), entry.data
+
+        try:
+            status, headers, data = self._split_result(load())
+        except NotImplementedError:
+            raise
+        except Exception:
+            if (
+                    entry is response_cache.MISSING or
+                    not cache.can_serve_on_error(entry)
+            ):
+                raise
+
+            L.exception("Loading %s failed, serving stale data", self.name)
+            return 200, cache.headers(entry), entry.data
+
+        if status == 404 and kind == 'item':
+            cache.set_missing(missing_key, missing_generation)
+
+        if status != 200:
+            return status, headers, data
+
+        cache.set(key, data, generation, headers)
+        return status, dict(cache.headers(), **headers), data
+
+    @staticmethod
+    def _split_result(result):
+        """ Unpack ``(status, data)`` or ``(status, headers, data)`` result. """
+        if len(result) == 2:
+            return result[0], {}, result[1]
+        return result
+
+    def _is_missing(self, request, key, generation):
+        cache = self._response_cache
+        if self._has_known_pks:
+            known = cache.known_keys(generation)
+            if known is None:
+                known = cache.set_known_keys(generation, self.known_pks())
+            if self.get_pk(request) not in known:
+                return True
+
+        return cache.is_missing(key)
+
+    def _refresh_cache(self, key, load):
+        cache = self._response_cache
+        try:
+            generation = cache.generation
+            status, headers, data = self._split_result(load())
+            if status == 200:
+                cache.set(key, data, generation, headers)
+
+        except Exception:   # pylint: disable=broad-except
+            L.exception("Refreshing cached %s failed", self.name)
+
+        finally:
+            cache.end_refresh(key)
+
+    def _cache_key(self, request, kind, params):
+        cache = self._response_cache
+        pk = self.get_pk(request) if kind != 'collection' else None
+        user = self.cache_user_key(request) if cache.policy.vary_user else None
+        return cache.make_key(kind, pk, params, user)
+
+    def _fields_kwargs(self, hook, spec):
+        """ Return the *fields* keyword argument for *hook*, if it takes it. """
+        return {'fields': spec} if hook in self._fields_hooks else {}
+
+    def _fields_spec(self, fields):
+        """ Return the serialization spec for the given ``_fields`` value.
+
+        :param str fields:
+            The fields requested by the client (``_fields`` query param).
+        :return Fieldspec:
+            The resource spec restricted to the requested fields. The specs
+            are cached in `fieldspec_cache` and must not be modified.
+        """
+        if fields == '*':
+            return self._base_spec
+
+        if not isinstance(fields, six.string_types):
+            fields = '{}'.format(fields)
+
+        key = (self.__class__, normalize_fields(fields))
+        spec = fieldspec_cache.get(key)
+        if spec is None:
+            # .restrict() modifies the spec in place, so we need a copy.
+            spec = Fieldspec(self._base_spec).restrict(Fieldspec(key[1]))
+            fieldspec_cache.set(key, spec)
 
-# Used only in type hint comments
-del Text
+        return spec
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Keyset (cursor) pagination.
+
+The collection is ordered by a sort key (one or more fields that uniquely
+identify an item, ie. ``('created_at', 'id')``). Instead of an offset, the
+client sends an opaque cursor holding the sort key values of the last item it
+has seen and the next page starts right after it. With an index on the sort
+key, the backend can seek directly to that position so every page costs the
+same, no matter how deep it is.
+
+The cursor is the URL safe base64 of the JSON list of the sort key values.
+The values are normalized the same way for the cursor and for the items, so
+they can be compared: dates and UUIDs are stored as strings (see
+`codec.default()`), which compare in the same order. Decimals are stored as
+``{"decimal": "1.50"}`` and restored as `decimal.Decimal`, so no precision is
+lost. **None** values are sorted after all others.
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import base64
+import binascii
+import decimal
+import heapq
+import json
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Text, Tuple
+
+# 3rd party imports
+import attr
+from six.moves.urllib.parse import urlencode
+
+# local imports
+from . import codec, exc
+
+
+#: Query string param with the max number of items on the page.
+LIMIT_PARAM = '_limit'
+
+#: Query string param with the cursor returned with the previous page.
+CURSOR_PARAM = '_cursor'
+
+
+@attr.s(frozen=True)
+class Page(object):
+    """ The requested page of a keyset paginated query.
+
+    :param Tuple[str, ...] sort_key:
+        Names of the fields the collection is ordered by (ascending). The
+        combination must be unique.
+    :param int limit:
+        Max number of items on the page.
+    :param Tuple after:
+        Sort key values of the last item on the previous page. **None** for
+        the first page.
+    """
+    sort_key = attr.ib(type=tuple)
+    limit = attr.ib(type=int)
+    after = attr.ib(default=None)
+
+    def sort_values(self, item):
+        # type: (Any) -> Tuple
+        """ Return the sort key values of the given *item*.
+
+        Works with both dicts and objects. The values are normalized the same
+        as in the cursor.
+        """
+        return tuple(
+            _comparable(_get_field(item, name)) for name in self.sort_key
+        )
+
+    def apply(self, items):
+        # type: (Iterable[Any]) -> List[Any]
+        """ Select the page from all *items* of the collection.
+
+        A fallback for backends that can't seek to the cursor. All items are
+        still read, but only ``limit + 1`` are kept in memory.
+
+        :return List:
+            Up to ``limit + 1`` items following the cursor, ordered by the
+            sort key. The extra item tells there is a next page.
+        :raises exc.BadRequest:
+            If the cursor values can't be compared with the sort key values.
+        """
+        if self.after is not None:
+            after = _sortable(self.after)
+            items = (x for x in items if self._sort_key(x) > after)
+
+        try:
+            return heapq.nsmallest(self.limit + 1, items, key=self._sort_key)
+        except TypeError:
+            raise exc.BadRequest("Invalid cursor")
+
+    def _sort_key(self, item):
+        return _sortable(self.sort_values(item))
+
+    def split(self, items):
+        # type: (Iterable[Any]) -> Tuple[List[Any], Optional[Text]]
+        """ Cut *items* to the page size.
+
+        :param Iterable items:
+            Items following the cursor, ordered by the sort key. Only the
+            first ``limit + 1`` are read.
+        :return Tuple[List, str]:
+            The page items and the cursor for the next page, or **None** if
+            this is the last page.
+        """
+        items = list(islice(items, self.limit + 1))
+        if len(items) <= self.limit:
+            return items, None
+
+        items = items[:self.limit]
+        return items, encode_cursor(self.sort_values(items[-1]))
+
+
+def from_params(params, sort_key, page_size, max_page_size):
+    # type: (Dict[Text, Any], Tuple, int, int) -> Page
+    """ Build the `Page` requested by the client.
+
+    The pagination params are removed from *params*, so the rest can be
+    used as filters.
+
+    :param Dict[str, Any] params:
+        Request query params.
+    :param Tuple[str, ...] sort_key:
+        Names of the fields the collection is ordered by.
+    :param int page_size:
+        Page size used when the client does not specify one.
+    :param int max_page_size:
+        Max page size. Larger ``_limit`` values are capped to it.
+    :raises exc.BadRequest:
+        If ``_limit`` or ``_cursor`` is not valid.
+    """
+    limit = params.pop(LIMIT_PARAM, page_size)
+    cursor = params.pop(CURSOR_PARAM, None)
+
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = 0
+
+    if limit < 1:
+        raise exc.BadRequest("_limit must be a positive integer")
+
+    after = None
+    if cursor is not None:
+        after = decode_cursor(cursor)
+        if len(after) != len(sort_key):
+            raise exc.BadRequest("Invalid cursor")
+
+    return Page(sort_key, min(limit, max_page_size), after)
+
+
+def encode_cursor(values):
+    # type: (Tuple) -> Text
+    """ Encode sort key *values* as an opaque cursor. """
+    data = json.dumps(
+        [_encode_value(_comparable(x)) for x in values],
+        separators=(',', ':'),
+        default=codec.default,
+    ).encode('utf-8')
+    return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    # type: (Text) -> Tuple
+    """ Decode sort key values from the *cursor*.
+
+    :raises exc.BadRequest:
+        If the cursor is malformed.
+    """
+    cursor = '{}'.format(cursor)
+    try:
+        data = base64.urlsafe_b64decode(
+            (cursor + '=' * (-len(cursor) % 4)).encode('ascii')
+        )
+        values = json.loads(data.decode('utf-8'), object_hook=_decode_value)
+    except (binascii.Error, decimal.InvalidOperation, TypeError, ValueError):
+        raise exc.BadRequest("Invalid cursor")
+
+    if not isinstance(values, list):
+        raise exc.BadRequest("Invalid cursor")
+
+    return tuple(values)
+
+
+def next_link(params, cursor, limit):
+    # type: (Dict[Text, Any], Text, int) -> Text
+    """ Return the ``Link`` header value pointing to the next page.
+
+    The link is relative to the current URL, only the query string changes.
+
+    :param Dict[str, Any] params:
+        Query params of the current request.
+    :param str cursor:
+        Cursor of the next page.
+    :param int limit:
+        The page size.
+    """
+    query = {
+        name: _comparable(value) for name, value in params.items()
+        if name not in (LIMIT_PARAM, CURSOR_PARAM)
+    }
+    query[LIMIT_PARAM] = limit
+    query[CURSOR_PARAM] = cursor
+
+    return '<?{}>; rel="next"'.format(urlencode(sorted(query.items())))
+
+
+def _get_field(item, name):
+    if isinstance(item, dict):
+        return item[name]
+    return getattr(item, name)
+
+
+def _comparable(value):
+    if isinstance(value, decimal.Decimal):
+        return value
+
+    try:
+        return codec.default(value)
+    except TypeError:
+        return value
+
+
+def _sortable(values):
+    # None can't be compared with other values on python 3.
+    return tuple((value is None, value) for value in values)
+
+
+def _encode_value(value):
+    if isinstance(value, decimal.Decimal):
+        return {'decimal': str(value)}
+    return value
+
+
+def _decode_value(obj):
+    if set(obj) == {'decimal'}:
+        return decimal.Decimal(obj['decimal'])
+    return obj
+
+
+# Used only in type hint comments
+del Any, Dict, Iterable, List, Optional, Text, Tuple
@@ -21,9 +21,85 @@ import inspect
 import re
 from typing import Text
 
+# 3rd party imports
+import six
+
+# local imports
 from .actions import api_action
 
 
+#: All REST verbs a resource can implement.
+REST_VERBS = (
+    'query', 'get', 'create', 'update', 'delete', 'bulk_update', 'bulk_delete',
+    'options', 'head',
+)
+
+
+class default_handler(object):
+    """ Mark a method as the library provided default implementation.
+
+    A method marked like that is treated as not implemented when detecting the
+    verbs supported by the resource, unless one of the given *hooks* is
+    implemented. This allows base classes to provide generic handlers built on
+    top of other methods (like `ModelResource.rest_get` which uses
+    ``get_item``).
+
+    :param str hooks:
+        Names of methods the default implementation depends on.
+    """
+    HOOKS_ATTR = '__rest_default_hooks__'
+
+    def __init__(self, *hooks):
+        self.hooks = hooks
+
+    def __call__(self, fn):
+        """ Decorator. """
+        setattr(fn, self.HOOKS_ATTR, self.hooks)
+        return fn
+
+    @classmethod
+    def is_implemented(cls, res_cls, name):
+        """ Check if the given method is implemented by the resource class.
+
+        :param type res_cls:
+            Resource class.
+        :param str name:
+            The method name.
+        :return bool:
+            **True** if the method is overridden by the resource class or it's
+            a default implementation and at least one of its hooks is
+            implemented.
+        """
+        method = getattr(res_cls, name, None)
+        if method is None or not callable(method):
+            return False
+
+        hooks = getattr(method, cls.HOOKS_ATTR, None)
+        if hooks is None:
+            return True
+
+        return any(cls.is_implemented(res_cls, hook) for hook in hooks)
+
+
+class RestResourceMeta(type):
+    """ Metaclass for all resources.
+
+    It gives each resource class a chance to precompute everything that
+    depends only on the class definition. This happens once, when the class is
+    created, so the request handlers don't have to do it over and over again.
+    See `RestResource._compile_class()`.
+    """
+    def __init__(cls, name, bases, attrs):
+        super(RestResourceMeta, cls).__init__(name, bases, attrs)
+
+        # Call every implementation along the MRO, starting with the base.
+        for base in reversed(cls.__mro__):
+            compile_class = base.__dict__.get('_compile_class')
+            if compile_class is not None:
+                compile_class.__func__(cls)
+
+
+@six.add_metaclass(RestResourceMeta)
 class RestResource(object):
     """ Represents the operations available on the given resource.
 
@@ -34,6 +110,12 @@ class RestResource(object):
 
     If the given `RestResource` subclass doesn't have one of the REST methods
     implemented, the endpoint should return 405 Method not allowed (or 404?)
+
+    The implemented verbs are detected once, when the class is created, by
+    checking which ``rest_*`` methods are overridden. They're available as
+    `supported_verbs`. You can also declare them explicitly by setting
+    `supported_verbs` in the class body, ie.
+    ``supported_verbs = frozenset(['get', 'query'])``.
     """
 
     _NAME_RE = re.compile(r'^[a-zA-Z_][\w\d_]*$')
@@ -43,6 +125,42 @@ class RestResource(object):
     def __init__(self):
         self._validate_name(self.name)
 
+    @classmethod
+    def _compile_class(cls):
+        """ Precompute class level metadata.
+
+        Called by `RestResourceMeta` once for every resource class, right after
+        it's created. Subclasses can override it to store anything that can be
+        derived from the class definition alone. The metaclass calls every
+        implementation found in the MRO (base classes first), so overrides
+        should not call the base class implementation themselves.
+        """
+        action_attrs = []
+        action_index = {}
+
+        # Only look at the class, so no property is evaluated here.
+        for attr_name, member in inspect.getmembers(cls, callable):
+            if not api_action.is_action(member):
+                continue
+
+            meta = api_action.get_meta(member)
+            action_attrs.append(attr_name)
+            for method in meta.methods:
+                key = (meta.name, meta.generic, method)
+                action_index.setdefault(key, attr_name)
+
+        cls._action_attrs = tuple(action_attrs)
+        cls._action_index = action_index
+
+        if 'supported_verbs' in cls.__dict__:
+            cls._verbs_declared = True
+            cls.supported_verbs = frozenset(cls.supported_verbs)
+        elif not getattr(cls, '_verbs_declared', False):
+            cls.supported_verbs = frozenset(
+                verb for verb in REST_VERBS
+                if default_handler.is_implemented(cls, 'rest_' + verb)
+            )
+
     def rest_actions(self):
         """ Return all actions defined on the current resource.
 
@@ -53,15 +171,27 @@ class RestResource(object):
         ATTR = '_actions'
 
         if not hasattr(self, ATTR):
-            actions = []
-            for _, method in inspect.getmembers(self, inspect.ismethod):
-                if api_action.is_action(method):
-                    actions.append(method)
-
-            setattr(self, ATTR, actions)
+            setattr(self, ATTR, [
+                getattr(self, name) for name in self._action_attrs
+            ])
 
         return getattr(self, ATTR)
 
+    def action_index(self):
+        """ Return all actions defined on the resource indexed for lookup.
+
+        The index is built once per resource class, this method only binds
+        the actions to the current resource instance.
+
+        :return Dict[Tuple[str, bool, str], function]:
+            A dictionary mapping ``(name, generic, method)`` to the action
+            handler. *method* is the lowercase HTTP method.
+        """
+        return {
+            key: getattr(self, attr_name)
+            for key, attr_name in self._action_index.items()
+        }
+
     def get_pk(self, request):
         """ Read the current resource type PK from the request.
 
@@ -98,70 +228,90 @@ class RestResource(object):
         # type: (Text) -> bool
         """ Check whether this resource implements a given REST verb.
 
+        This does not call any handlers, it only checks `supported_verbs`.
+
         Args:
             rest_verb (str):
                 The REST verb you want to check. Possible values are *create*,
-                *query*, *get*, *update* and *delete*.
+                *query*, *get*, *update*, *delete*, *bulk_update*,
+                *bulk_delete*, *options* and *head*.
 
         Returns:
             bool: **True** if the given REST verb is implemented, **False**
                 otherwise.
         """
-        test = {
-            'create': lambda: self.rest_create(None, {}),
-            'query': lambda: self.rest_query(None, {}),
-            'get': lambda: self.rest_get(None, {}),
-            'update': lambda: self.rest_update(None, {}),
-            'delete': lambda: self.rest_delete(None),
-        }.get(rest_verb)
-
-        if test:
-            try:
-                test()
-                return True
-            except NotImplementedError:
-                return False
-            except:
-                return True
-        else:
-            return False
+        return rest_verb in self.supported_verbs
+
+    def invalidate_cache(self, verb=None):
+        """ Called by the endpoint after the resource data was modified.
+
+        That is after successful create, update and delete requests and
+        non-generic actions called with methods other than GET, HEAD or
+        OPTIONS. Does nothing by default, see `ModelResource.cache`.
 
+        :param str verb:
+            The REST verb (``create``, ``update``, ``delete``,
+            ``bulk_update`` or ``bulk_delete``) or **None** for actions.
+        """
+        pass
+
+    @default_handler()
     def rest_query(self, request, params, payload):
         """ GET list. """
         raise NotImplementedError(".rest_query() not implemented".format(
             self.__class__.__name__
         ))
 
+    @default_handler()
     def rest_get(self, request, params, payload):
         """ GET detail. """
         raise NotImplementedError("{}.rest_get() not implemented".format(
             self.__class__.__name__
         ))
 
+    @default_handler()
     def rest_create(self, request, params, payload):
         """ POST list. """
         raise NotImplementedError("{}.rest_create() not implemented".format(
             self.__class__.__name__
         ))
 
+    @default_handler()
     def rest_update(self, request, params, payload):
         """ PUT detail. """
         raise NotImplementedError("{}.rest_update() not implemented".format(
             self.__class__.__name__
         ))
 
+    @default_handler()
     def rest_delete(self, request, params, payload):
         """ DELETE detail. """
         raise NotImplementedError("{}.rest_delete() not implemented".format(
             self.__class__.__name__
         ))
 
+    @default_handler()
+    def rest_bulk_update(self, request, params, payload):
+        """ PUT list. """
+        raise NotImplementedError("{}.rest_bulk_update() not implemented".format(
+            self.__class__.__name__
+        ))
+
+    @default_handler()
+    def rest_bulk_delete(self, request, params, payload):
+        """ DELETE list. """
+        raise NotImplementedError("{}.rest_bulk_delete() not implemented".format(
+            self.__class__.__name__
+        ))
+
+    @default_handler()
     def rest_options(self, request, params, payload):
         """ OPTIONS list/detail. """
         raise NotImplementedError("{}.rest_options() not implemented".format(
             self.__class__.__name__
         ))
 
+    @default_handler()
     def rest_head(self, request, params, payload):
         """ OPTIONS list/detail. """
         raise NotImplementedError("{}.rest_head() not implemented".format(
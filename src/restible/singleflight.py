@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Coalescing of identical concurrent requests (single-flight).
+
+If many identical requests arrive at the same time, only the first one
+(the *leader*) is executed. The others wait for it to finish and get the
+same result. This is opt-in for read requests, see
+`RestEndpoint.single_flight`::
+
+    class PostEndpoint(WsgiEndpoint):
+        single_flight = SingleFlight()
+
+Use `aio.AsyncSingleFlight` with the async endpoints.
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import threading
+from typing import Any, Callable, Hashable, Tuple
+
+
+class _Call(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """ Thread based single-flight.
+
+    Calls with the same key, made while the first one is still running, wait
+    for it and share its result (or exception).
+    """
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args):
+        # type: (Hashable, Callable, *Any) -> Tuple[Any, bool]
+        """ Call ``func(*args)`` unless a call with the same *key* is running.
+
+        :param Hashable key:
+            Identifies the call. Equal keys mean the calls can share results.
+        :param Callable func:
+            The function to call.
+        :return tuple(Any, bool):
+            The result and a flag telling whether the result is shared, ie.
+            was produced by another caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if not is_leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args)
+            return call.result, False
+
+        except BaseException as ex:
+            call.error = ex
+            raise
+
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def __len__(self):
+        """ Number of calls in flight. """
+        return len(self._calls)
+
+
+# Used only in type hint comments
+del Any, Callable, Hashable, Tuple
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Streaming list responses.
+
+When `RestResult.data` is an iterator (ie. a generator returned by
+``ModelResource.rest_query`` with ``streaming = True``) the response is
+encoded chunk by chunk, either as a JSON array or as NDJSON (one JSON document
+per line). This way the whole result set never has to be held in memory.
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+from logging import getLogger
+from typing import Any, Callable, Iterable, Iterator, List
+try:
+    from collections.abc import Iterator as IteratorABC
+except ImportError:     # python 2
+    from collections import Iterator as IteratorABC
+
+# local imports
+from . import codec
+
+
+L = getLogger(__name__)
+
+#: Chunks are emitted once they reach that many bytes.
+CHUNK_SIZE = 64 * 1024
+
+JSON = codec.JSON
+NDJSON = codec.NDJSON
+NDJSON_TYPES = frozenset([NDJSON, 'application/ndjson'])
+
+
+def is_stream(data):
+    # type: (Any) -> bool
+    """ Return **True** if *data* should be streamed.
+
+    Only iterators (generators, etc.) are streamed. Lists and dicts are
+    already in memory so they're encoded in one go.
+    """
+    return isinstance(data, IteratorABC) or hasattr(data, '__aiter__')
+
+
+def dump_json(item):
+    # type: (Any) -> bytes
+    """ Encode a single item as JSON. """
+    return codec.dumps(item)
+
+
+def iter_json_array(items, dumps=dump_json, chunk_size=CHUNK_SIZE):
+    # type: (Iterable[Any], Callable[[Any], bytes], int) -> Iterator[bytes]
+    """ Encode *items* as a JSON array, yielding chunks of bytes.
+
+    :param Iterable items:
+        Items to encode. Consumed lazily.
+    :param Callable dumps:
+        Function encoding a single item to bytes.
+    :param int chunk_size:
+        Minimal chunk size in bytes (except for the last chunk).
+    """
+    return _chunked(_json_array_parts(items, dumps), chunk_size)
+
+
+def iter_ndjson(items, dumps=dump_json, chunk_size=CHUNK_SIZE):
+    # type: (Iterable[Any], Callable[[Any], bytes], int) -> Iterator[bytes]
+    """ Encode *items* as NDJSON, yielding chunks of bytes.
+
+    Arguments are the same as in `iter_json_array()`.
+    """
+    return _chunked(_ndjson_parts(items, dumps), chunk_size)
+
+
+def iter_encoded(items, ndjson=False, dumps=dump_json, chunk_size=CHUNK_SIZE):
+    # type: (Iterable[Any], bool, Callable[[Any], bytes], int) -> Iterator[bytes]
+    """ Encode *items* either as JSON array or NDJSON. """
+    if ndjson:
+        return iter_ndjson(items, dumps, chunk_size)
+    return iter_json_array(items, dumps, chunk_size)
+
+
+def _json_array_parts(items, dumps):
+    # type: (Iterable[Any], Callable[[Any], bytes]) -> Iterator[bytes]
+    yield b'['
+    first = True
+    for item in items:
+        if not first:
+            yield b','
+        first = False
+        yield dumps(item)
+    yield b']'
+
+
+def _ndjson_parts(items, dumps):
+    # type: (Iterable[Any], Callable[[Any], bytes]) -> Iterator[bytes]
+    for item in items:
+        yield dumps(item)
+        yield b'\n'
+
+
+def _chunked(parts, chunk_size):
+    # type: (Iterable[bytes], int) -> Iterator[bytes]
+    buff = []   # type: List[bytes]
+    size = 0
+
+    try:
+        for part in parts:
+            buff.append(part)
+            size += len(part)
+
+            if size >= chunk_size:
+                yield b''.join(buff)
+                buff = []
+                size = 0
+
+    except Exception:
+        # Re-raised so the server aborts the connection (or responds with 500
+        # if nothing was sent yet). Ending the response normally would make
+        # the truncated data look complete.
+        L.exception("Error while streaming the response")
+        raise
+
+    if buff:
+        yield b''.join(buff)
+
+
+# Used only in type hint comments
+del Any, Callable, Iterable, Iterator, List
@@ -24,6 +24,13 @@ from __future__ import absolute_import, unicode_literals
 # stdlib imports
 import re
 from datetime import datetime
+try:
+    from collections.abc import MutableMapping
+except ImportError:     # python 2
+    from collections import MutableMapping
+
+# 3rd party imports
+import six
 
 
 # YYYY-mm-dd                    2018-09-25
@@ -45,14 +52,147 @@ def parse(get_params):
     return filters
 
 
+class LazyParams(MutableMapping):
+    """ Request params that are parsed only when accessed.
+
+    Behaves like the dict returned by `parse()`, but the query string is
+    extracted only on first access and each value is converted with
+    `from_string()` only when it's read. Handlers that never look at the
+    params (or only at some of them) don't pay for the type guessing.
+
+    :param Callable[[], Dict[str, str]] loader:
+        A function returning the raw query string params. It will be called
+        at most once.
+    """
+    def __init__(self, loader):
+        self._loader = loader
+        self._raw = None
+        self._values = {}
+
+    def _source(self):
+        if self._raw is None:
+            self._raw = dict(self._loader().items())
+            self._loader = None
+        return self._raw
+
+    def __getitem__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            value = from_string(self._source().pop(name))
+            self._values[name] = value
+            return value
+
+    def __setitem__(self, name, value):
+        self._source().pop(name, None)
+        self._values[name] = value
+
+    def __delitem__(self, name):
+        in_values = self._values.pop(name, _MISSING) is not _MISSING
+        in_raw = self._source().pop(name, _MISSING) is not _MISSING
+
+        if not (in_values or in_raw):
+            raise KeyError(name)
+
+    def __contains__(self, name):
+        return name in self._values or name in self._source()
+
+    def __iter__(self):
+        # Reading values modifies the underlying dicts, so iterate over a copy.
+        return iter(list(self._values) + list(self._source()))
+
+    def __len__(self):
+        return len(self._values) + len(self._source())
+
+    def __repr__(self):
+        return '<LazyParams: {}>'.format(dict(self))
+
+    def copy(self):
+        """ Return a regular dict with all params parsed. """
+        return dict(self)
+
+
+_MISSING = object()
+
+
+def canonical_params(params):
+    """ Return a copy of *params* with ``_fields`` in its canonical form.
+
+    Used to build cache keys, so equivalent field selections (ie.
+    ``id,title`` and ``title, id``) share the same entry.
+    """
+    params = dict(params or {})
+    if '_fields' in params:
+        params['_fields'] = normalize_fields('{}'.format(params['_fields']))
+    return params
+
+
+#: Max number of memoized `normalize_fields()` results.
+NORMALIZED_FIELDS_MAX = 1024
+
+_normalized_fields = {}
+
+
+def normalize_fields(fields):
+    """ Return the canonical form of the ``_fields`` string.
+
+    Whitespace is removed and the fields on every level are sorted, with
+    duplicates dropped, so equivalent selections have the same form. A level
+    listing the same field with different members is kept in its original
+    order, as that order matters for the parsed spec.
+
+    It's called multiple times per request (spec and cache keys) and clients
+    send only a few distinct values, so the results are memoized by the raw
+    string. The memo is simply cleared when it reaches
+    `NORMALIZED_FIELDS_MAX` entries.
+    """
+    result = _normalized_fields.get(fields)
+    if result is None:
+        if len(_normalized_fields) >= NORMALIZED_FIELDS_MAX:
+            _normalized_fields.clear()
+        result = _normalized_fields[fields] = _normalize_fields(fields)
+    return result
+
+
+def _normalize_fields(fields):
+    fields = ''.join(fields.split())
+    parts = []
+    depth = start = 0
+    for i, char in enumerate(fields):
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(fields[start:i])
+            start = i + 1
+    parts.append(fields[start:])
+
+    normalized = {}
+    for part in parts:
+        name, paren, members = part.partition('(')
+        if paren and members.endswith(')'):
+            part = '{}({})'.format(name, _normalize_fields(members[:-1]))
+
+        if normalized.setdefault(name, part) != part:
+            return fields
+
+    return ','.join(sorted(normalized.values()))
+
+
 def from_string(value):
     """ Convert the given string value to the actual type it holds.
 
     If the string is an integer it will return an int, if it's a float, then it
-    will return float otherwise it will just return a string.
+    will return float otherwise it will just return a string. Values that
+    are not strings (ie. already decoded batch operation params) are returned
+    as is.
 
     TODO: Add date and datetime support
     """
+    if not isinstance(value, six.string_types):
+        return value
+
     try:
         if re_date.match(value):
             return datetime.strptime(value, '%Y-%m-%d').date()
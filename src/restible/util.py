@@ -18,7 +18,12 @@ from __future__ import absolute_import, unicode_literals
 
 # stdlib imports
 import inspect
-from typing import Any, Dict, Text
+from typing import Any, Callable, Dict, Text
+
+try:
+    from collections.abc import MutableMapping
+except ImportError:     # python 2
+    from collections import MutableMapping
 
 # 3rd party import
 import attr
@@ -96,6 +101,83 @@ class QsFilter(object):
         return op_method(self.value)
 
 
+class LazyDict(MutableMapping):
+    """ A dict that is loaded only when it's first accessed.
+
+    Used by the endpoints to pass request payload to handlers that are not
+    expected to read it (ie. GET). The payload is decoded only if the handler
+    actually looks at it. A **None** payload is treated like an empty dict.
+
+    Args:
+        loader (Callable[[], dict]):
+            A function returning the actual data. It will be called at most
+            once.
+
+    Example:
+
+        >>> from restible.util import LazyDict
+        >>>
+        >>> data = LazyDict(lambda: {'name': 'John'})
+        >>> data.loaded
+        False
+        >>> data['name']
+        'John'
+        >>> data.loaded
+        True
+
+    """
+    def __init__(self, loader):
+        # type: (Callable[[], Any]) -> None
+        self._loader = loader
+        self._data = None
+
+    @property
+    def loaded(self):
+        # type: () -> bool
+        """ **True** if the data was already loaded. """
+        return self._loader is None
+
+    @property
+    def value(self):
+        # type: () -> Any
+        """ The loaded data as returned by the loader. """
+        if self._loader is not None:
+            self._data = self._loader()
+            self._loader = None
+        return self._data
+
+    def _dict(self):
+        data = self.value
+        if data is None:
+            self._data = data = {}
+        return data
+
+    def __getitem__(self, name):
+        return self._dict()[name]
+
+    def __setitem__(self, name, value):
+        self._dict()[name] = value
+
+    def __delitem__(self, name):
+        del self._dict()[name]
+
+    def __contains__(self, name):
+        return name in self._dict()
+
+    def __iter__(self):
+        return iter(self._dict())
+
+    def __len__(self):
+        return len(self._dict())
+
+    def __repr__(self):
+        return '<LazyDict: {!r}>'.format(self._dict())
+
+    def copy(self):
+        """ Return a regular dict copy of the data. """
+        return dict(self._dict())
+
+
 def iter_public_props(obj, predicate=None):
     """ Iterate over public properties of an object.
 
@@ -133,6 +215,34 @@ def iter_public_props(obj, predicate=None):
                 pass
 
 
+def accepts_arg(func, name):
+    # type: (Callable, Text) -> bool
+    """ Check whether *func* has an argument called *name*.
+
+    Only explicitly named arguments count, ``**kwargs`` does not.
+
+    :param Callable func:
+        The function or method to check.
+    :param str name:
+        The argument name.
+    :return bool:
+        **True** if *func* can be called with the *name* keyword argument.
+    """
+    try:
+        signature = inspect.signature
+    except AttributeError:  # python 2
+        return name in inspect.getargspec(func).args
+
+    try:
+        param = signature(func).parameters.get(name)
+    except (TypeError, ValueError):
+        return False
+
+    return param is not None and param.kind in (
+        param.POSITIONAL_OR_KEYWORD, param.KEYWORD_ONLY
+    )
+
+
 def update_from_values(obj, values):
     # type: (object, dict) -> None
     """ Update object attributes from a dict of values.
@@ -168,4 +278,4 @@ def update_from_values(obj, values):
 
 
 # Used only in type hint comments
-del Dict, Text
+del Callable, Dict, Text
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Compiled JSON Schema validators.
+
+``jsonschema.validate()`` checks the schema against the metaschema and creates
+a brand new validator every time it's called. This is pretty expensive and
+completely unnecessary as resource schemas almost never change at runtime.
+
+This module keeps a registry of compiled validators so every distinct schema is
+checked and compiled only once. Schemas are looked up by identity first (cheap)
+and by their canonical JSON form second, so two equal schemas defined in
+different places will share the same validator.
+
+.. note::
+    Schemas are treated as immutable once they are used for validation. If you
+    have to modify a schema at runtime, call `ValidatorRegistry.clear()`
+    afterwards (or just create a new schema dict).
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import json
+import threading
+from typing import Any, Dict, List, Optional, Text
+
+# 3rd party imports
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+
+
+class ValidatorRegistry(object):
+    """ Registry of compiled JSON Schema validators.
+
+    :param int max_size:
+        Maximum number of schemas kept in the registry. When the limit is
+        reached the registry is cleared. Only matters if the app generates
+        new schemas on the fly, static schemas will never get near it.
+    """
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._by_id = {}
+        self._by_key = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._by_key)
+
+    def get(self, schema):
+        # type: (Dict[Text, Any]) -> Any
+        """ Get a compiled validator for the given schema.
+
+        The schema is checked against the metaschema only the first time it's
+        seen.
+
+        :param Dict[str, Any] schema:
+            JSONSchema describing the required data structure.
+        :return jsonschema.IValidator:
+            Compiled validator instance for the given *schema*.
+        :raises jsonschema.SchemaError:
+            If the *schema* itself is not valid.
+        """
+        entry = self._by_id.get(id(schema))
+        if entry is not None and entry[0] is schema:
+            return entry[1]
+
+        return self._compile(schema)
+
+    def validate(self, data, schema):
+        # type: (Any, Dict[Text, Any]) -> None
+        """ Validate *data* against *schema* using a compiled validator.
+
+        This is a drop-in replacement for ``jsonschema.validate()``.
+
+        :param Any data:
+            The data to validate.
+        :param Dict[str, Any] schema:
+            JSONSchema describing the required data structure.
+        :raises jsonschema.ValidationError:
+            If the validation fails.
+        """
+        error = self.best_error(data, schema)
+        if error is not None:
+            raise error
+
+    def best_error(self, data, schema):
+        # type: (Any, Dict[Text, Any]) -> Optional[Exception]
+        """ Return the most relevant validation error or **None**.
+
+        Same as `validate()` but returns the error instead of raising it.
+        """
+        return best_match(self.get(schema).iter_errors(data))
+
+    def item_errors(self, items, schema):
+        # type: (Any, Dict[Text, Any]) -> Dict[int, Exception]
+        """ Validate a list of items in a single pass.
+
+        *schema* should describe the whole list (``{'type': 'array', 'items':
+        ...}``) so its validator is compiled and cached once, no matter how
+        many items are validated.
+
+        :return Dict[int, jsonschema.ValidationError]:
+            The most relevant error for every invalid item, by item index.
+            Errors that are not related to any item (ie. when *items* is not
+            a list) are stored under **None**.
+        """
+        by_index = {}   # type: Dict[Any, List[Any]]
+        for error in self.get(schema).iter_errors(items):
+            index = error.path[0] if error.path else None
+            by_index.setdefault(index, []).append(error)
+
+        return {
+            index: best_match(errors) for index, errors in by_index.items()
+        }
+
+    def clear(self):
+        """ Remove all compiled validators from the registry. """
+        with self._lock:
+            self._by_id = {}
+            self._by_key = {}
+
+    def _compile(self, schema):
+        key = _canonical_key(schema)
+
+        with self._lock:
+            validator = self._by_key.get(key) if key is not None else None
+
+            if validator is None:
+                cls = validator_for(schema)
+                cls.check_schema(schema)
+                validator = cls(schema)
+
+            if len(self._by_id) >= self.max_size:
+                self._by_id = {}
+                self._by_key = {}
+
+            # We keep a reference to the schema so it's id won't get reused.
+            self._by_id[id(schema)] = (schema, validator)
+            if key is not None:
+                self._by_key[key] = validator
+
+            return validator
+
+
+def _canonical_key(schema):
+    # type: (Dict[Text, Any]) -> Optional[Text]
+    """ Return a canonical string representation of the schema.
+
+    Returns **None** if the schema can't be represented as JSON. Those schemas
+    will only be cached by identity.
+    """
+    try:
+        return json.dumps(schema, sort_keys=True, separators=(',', ':'))
+    except (TypeError, ValueError):
+        return None
+
+
+#: The registry used by restible internally.
+registry = ValidatorRegistry()
+
+
+def validate(data, schema):
+    # type: (Any, Dict[Text, Any]) -> None
+    """ Validate *data* against *schema* using the global registry. """
+    registry.validate(data, schema)
+
+
+def item_errors(items, schema):
+    # type: (Any, Dict[Text, Any]) -> Dict[int, Exception]
+    """ Validate a list of *items* using the global registry.
+
+    See `ValidatorRegistry.item_errors()`.
+    """
+    return registry.item_errors(items, schema)
+
+
+# Used only in type hint comments
+del Any, Dict, List, Optional, Text
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# Copyright 2017-2019 Mateusz Klos
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+""" Framework-free WSGI endpoint.
+
+Allows serving restible resources directly with any WSGI server (gunicorn,
+uwsgi, wsgiref, ...) without a web framework in between.
+
+Example::
+
+    from restible.wsgi import WsgiEndpoint
+
+    app = WsgiEndpoint.create_app(resources=[
+        ['/api/post', PostResource],
+        ['/api/user', UserResource],
+    ])
+
+"""
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Text
+
+# 3rd party imports
+import six
+
+# local imports
+from . import exc, http
+from .endpoint import RawResponse, RestEndpoint
+
+
+class WsgiEndpoint(http.PrefixMixin, RestEndpoint):
+    """ WSGI application serving a single resource.
+
+    :param str prefix:
+        URL prefix the resource is served at, ie. ``/api/post``. Can also be
+        defined as a class attribute.
+
+    All other arguments are the same as in `RestEndpoint`.
+    """
+    def __init__(self, resource=None, res_cls=None, protected=False,
+                 prefix=None):
+        super(WsgiEndpoint, self).__init__(resource, res_cls, protected)
+        self.init_prefix(prefix)
+
+    @classmethod
+    def create_app(cls, resources, batch_path=None, **kw):
+        # type: (List[List[Any]], Any) -> WsgiApp
+        """ Create a WSGI app serving all the given resources.
+
+        :param List[List[str, type]] resources:
+            List of ``[prefix, resource_class]`` pairs.
+        :param str batch_path:
+            Path for batch requests, see `WsgiApp`.
+        :param kw:
+            Extra keyword arguments passed to every endpoint constructor.
+        :return WsgiApp:
+            WSGI application.
+        """
+        return WsgiApp([
+            cls(res_cls=res_cls, prefix=prefix, **kw)
+            for prefix, res_cls in resources
+        ], batch_path=batch_path)
+
+    @classmethod
+    def extract_request_data(cls, request):
+        """ Decode the request body based on its ``Content-Type``. """
+        return cls.decode_request_data(request, request.body)
+
+    @classmethod
+    def request_from_environ(cls, environ):
+        # type: (Dict[Text, Any]) -> http.Request
+        """ Create `http.Request` from WSGI environ. """
+        headers = {}
+        for name, value in six.iteritems(environ):
+            if name.startswith('HTTP_'):
+                headers[http.header_name(name[5:])] = value
+            elif name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                headers[http.header_name(name)] = value
+
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = 0
+
+        body = environ['wsgi.input'].read(length) if length > 0 else b''
+
+        path = environ.get('PATH_INFO', '')
+        if six.PY3:
+            # PEP-3333: PATH_INFO is decoded as latin-1.
+            path = path.encode('latin-1').decode('utf-8', 'replace')
+
+        return http.Request(
+            method=environ['REQUEST_METHOD'].upper(),
+            path=path,
+            query_string=environ.get('QUERY_STRING', ''),
+            headers=headers,
+            body=body,
+        )
+
+    def __call__(self, environ, start_response):
+        # type: (Dict[Text, Any], Callable) -> Iterable[bytes]
+        """ WSGI entry point. """
+        request = self.request_from_environ(environ)
+        route = self.match_route(request.path)
+
+        if route is None:
+            return respond(
+                start_response, *http.error_response(404, "Not Found")
+            )
+
+        return self.handle(
+            environ, start_response, request,
+            partial(http.dispatch, self, request, route),
+        )
+
+    def handle(self, environ, start_response, request, call):
+        # type: (Dict[Text, Any], Callable, http.Request, Callable) -> Any
+        """ Negotiate the response format, call the handler and respond.
+
+        :param http.Request request:
+            The request being handled.
+        :param Callable call:
+            Called with no arguments to get the `RestResult`.
+        """
+        try:
+            negotiated = self.negotiate_response(request)
+        except exc.NotAcceptable as ex:
+            return respond(
+                start_response, *http.error_response(ex.status, ex.detail)
+            )
+
+        result = call()
+
+        if isinstance(result, RawResponse):
+            return result.response(environ, start_response)
+
+        status, headers, body = http.render_result(result, request, negotiated)
+        if self.compression is not None:
+            headers, body = self.compression.apply(
+                headers, body, request.headers.get('accept-encoding')
+            )
+
+        return respond(start_response, status, headers, body)
+
+
+class WsgiApp(object):
+    """ WSGI application serving multiple `WsgiEndpoint` instances.
+
+    :param List[WsgiEndpoint] endpoints:
+        Endpoints served by the app. Requests are routed based on the
+        endpoint prefix, the longest matching prefix wins.
+    :param str batch_path:
+        If given, POST requests to this path are batch requests that can
+        call any of the *endpoints* (see `restible.batch`). The batch request
+        itself is decoded and encoded by the first endpoint.
+    """
+    def __init__(self, endpoints, batch_path=None):
+        self.endpoints = http.sorted_by_prefix(endpoints)
+        self.batch_path = batch_path
+        self.by_name = {e.resource.name: e for e in endpoints}
+
+    def __call__(self, environ, start_response):
+        # type: (Dict[Text, Any], Callable) -> Iterable[bytes]
+        """ WSGI entry point. """
+        path = environ.get('PATH_INFO', '')
+        if self.batch_path is not None and path == self.batch_path:
+            return self.call_batch(environ, start_response)
+
+        endpoint = http.find_endpoint(self.endpoints, path)
+
+        if endpoint is None:
+            return respond(
+                start_response, *http.error_response(404, "Not Found")
+            )
+
+        return endpoint(environ, start_response)
+
+    def call_batch(self, environ, start_response):
+        # type: (Dict[Text, Any], Callable) -> Iterable[bytes]
+        """ Handle the batch request. """
+        endpoint = self.endpoints[0]
+        request = endpoint.request_from_environ(environ)
+
+        if request.method != 'POST':
+            return respond(start_response, *http.error_response(
+                405, "Batch requests must use POST"
+            ))
+
+        return endpoint.handle(
+            environ, start_response, request,
+            partial(endpoint.call_batch, request, None, self.by_name),
+        )
+
+
+def respond(start_response, status, headers, body):
+    # type: (Callable, int, List, Any) -> Iterable[bytes]
+    """ Start WSGI response and return the body iterable.
+
+    *body* can be either bytes or an iterator of chunks (streamed responses).
+    The WSGI server iterates over the chunks, so they are never all kept in
+    memory.
+    """
+    start_response(http.status_line(status), [
+        (str(name), str(value)) for name, value in headers
+    ])
+    if isinstance(body, bytes):
+        return [body]
+    return body
+
+
+# Used only in type hint comments
+del Any, Callable, Dict, Iterable, List, Text
@@ -11,6 +11,13 @@ from os.path import dirname, relpath
 if sys.version_info[:2] == (3, 3):
     collect_ignore = ['django']
 
+# asyncio support requires python 3.7+
+if sys.version_info < (3, 7):
+    collect_ignore = globals().get('collect_ignore', []) + [
+        'restible/aio',
+        'restible/asgi',
+    ]
+
 
 def pytest_itemcollected(item):
     """ Prettier test names. """
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import RestResource, api_action
+from restible.aio import AsyncRestEndpoint, current_user
+
+
+class FakeRequest(object):
+    def __init__(self, **kwargs):
+        self.rest_keys = kwargs.pop('rest_keys', {})
+        self.GET = kwargs.pop('query', {})
+        self.payload = kwargs.pop('payload', None)
+
+
+class FakeEndpoint(AsyncRestEndpoint):
+    @classmethod
+    def extract_request_data(cls, request):
+        return request.payload
+
+    async def authorize(self, request):
+        return 'user'
+
+
+class MixedResource(RestResource):
+    name = 'mixed'
+
+    async def rest_query(self, request, params, payload):
+        await asyncio.sleep(0)
+        return [{'thread': threading.current_thread().name}]
+
+    def rest_get(self, request, params, payload):
+        return {
+            'thread': threading.current_thread().name,
+            'user': current_user.get(),
+        }
+
+    async def rest_create(self, request, params, payload):
+        raise ValueError("Invalid payload")
+
+    @api_action(protected=False)
+    async def async_action(self, request, params, payload):
+        return {'user': current_user.get()}
+
+    @api_action(protected=False, schema={'type': 'object'})
+    def sync_action(self, request, params, payload):
+        return {'payload': payload}
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def test_awaits_coroutine_handlers_on_the_event_loop():
+    endpoint = FakeEndpoint(res_cls=MixedResource)
+
+    result = run(endpoint.call_rest_handler('GET', FakeRequest()))
+
+    assert result.status == 200
+    assert result.data == [{'thread': threading.current_thread().name}]
+
+
+def test_runs_sync_handlers_in_the_executor():
+    executor = ThreadPoolExecutor(1, thread_name_prefix='restible-test')
+    endpoint = FakeEndpoint(res_cls=MixedResource, executor=executor)
+    request = FakeRequest(rest_keys={'mixed_pk': 1})
+
+    result = run(endpoint.call_rest_handler('GET', request))
+
+    assert result.status == 200
+    assert result.data['thread'].startswith('restible-test')
+    assert result.data['user'] == 'user'
+
+
+def test_does_not_modify_the_request():
+    endpoint = FakeEndpoint(res_cls=MixedResource)
+    request = FakeRequest(rest_keys={'mixed_pk': 1})
+
+    run(endpoint.call_rest_handler('GET', request))
+
+    assert not hasattr(request, 'user')
+    assert current_user.get() is None
+
+
+def test_maps_exceptions_like_sync_endpoint():
+    endpoint = FakeEndpoint(res_cls=MixedResource)
+
+    result = run(endpoint.call_rest_handler('POST', FakeRequest(payload={})))
+
+    assert result.status == 400
+    assert result.data == {'detail': 'Invalid payload'}
+
+
+def test_returns_405_for_unsupported_verbs():
+    endpoint = FakeEndpoint(res_cls=MixedResource)
+    request = FakeRequest(rest_keys={'mixed_pk': 1})
+
+    result = run(endpoint.call_rest_handler('DELETE', request))
+
+    assert result.status == 405
+
+
+@pytest.mark.parametrize('name,payload,status,data', (
+    ('async_action', None, 200, {'user': 'user'}),
+    ('sync_action', {'a': 1}, 200, {'payload': {'a': 1}}),
+    ('sync_action', [], 400, None),
+    ('missing', None, 404, None),
+))
+def test_calls_actions(name, payload, status, data):
+    endpoint = FakeEndpoint(res_cls=MixedResource)
+    request = FakeRequest(payload=payload)
+
+    result = run(endpoint.call_action_handler('POST', request, name, False))
+
+    assert result.status == status
+    if data is not None:
+        assert result.data == data
+
+
+def test_handles_concurrent_requests():
+    class SlowResource(RestResource):
+        name = 'slow'
+
+        async def rest_query(self, request, params, payload):
+            await asyncio.sleep(0.05)
+            return []
+
+    endpoint = FakeEndpoint(res_cls=SlowResource)
+
+    async def call_many():
+        return await asyncio.gather(*[
+            endpoint.call_rest_handler('GET', FakeRequest())
+            for _ in range(100)
+        ])
+
+    loop = asyncio.new_event_loop()
+    start = loop.time()
+    results = loop.run_until_complete(call_many())
+
+    assert all(r.status == 200 for r in results)
+    assert loop.time() - start < 1
+
+
+def test_call_batch():
+    endpoint = FakeEndpoint(res_cls=MixedResource)
+
+    result = run(endpoint.call_batch(FakeRequest(), [
+        {'method': 'GET', 'pk': 1},
+        {'method': 'POST', 'pk': 1, 'action': 'async_action'},
+        {'method': 'POST', 'body': {}},
+    ]))
+
+    assert result.status == 200
+    assert [r['status'] for r in result.data] == [200, 200, 400]
+    assert result.data[1]['body'] == {'user': 'user'}
+
+
+def test_atomic_batch_supports_async_transactions():
+    log = []
+
+    class Transaction(object):
+        async def __aenter__(self):
+            log.append('begin')
+
+        async def __aexit__(self, exc_type, exc, tb):
+            log.append('rollback' if exc_type else 'commit')
+
+    class TransactionEndpoint(FakeEndpoint):
+        def batch_transaction(self, request):
+            return Transaction()
+
+    endpoint = TransactionEndpoint(res_cls=MixedResource)
+
+    result = run(endpoint.call_batch(FakeRequest(), {
+        'atomic': True,
+        'operations': [
+            {'method': 'POST', 'pk': 1, 'action': 'async_action'},
+            {'method': 'POST', 'body': {}},
+        ],
+    }))
+
+    assert [r['status'] for r in result.data] == [424, 400]
+    assert log == ['begin', 'rollback']
+
+
+def test_atomic_batch_runs_sync_transaction_in_one_thread():
+    log = []
+
+    class Transaction(object):
+        def __enter__(self):
+            log.append(('begin', threading.current_thread().name))
+
+        def __exit__(self, exc_type, exc, tb):
+            log.append(('commit', threading.current_thread().name))
+
+    class SyncResource(RestResource):
+        name = 'sync'
+
+        def rest_create(self, request, params, payload):
+            log.append(('create', threading.current_thread().name))
+            return payload
+
+    class TransactionEndpoint(FakeEndpoint):
+        def batch_transaction(self, request):
+            return Transaction()
+
+    endpoint = TransactionEndpoint(res_cls=SyncResource)
+
+    result = run(endpoint.call_batch(FakeRequest(), {
+        'atomic': True,
+        'operations': [
+            {'method': 'POST', 'body': {'title': 'a'}},
+            {'method': 'POST', 'body': {'title': 'b'}},
+        ],
+    }))
+
+    assert [r['status'] for r in result.data] == [201, 201]
+    assert [x[0] for x in log] == ['begin', 'create', 'create', 'commit']
+    assert len(set(x[1] for x in log)) == 1
+    assert log[0][1] != threading.current_thread().name
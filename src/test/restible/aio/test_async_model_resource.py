@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import asyncio
+
+# 3rd party imports
+from mock import patch
+
+# Project imports
+from restible import ModelResource
+from restible.aio import AsyncModelResource, AsyncRestEndpoint, current_user
+from restible.cache import CachePolicy
+
+
+class FakeRequest(object):
+    def __init__(self, **kwargs):
+        self.rest_keys = kwargs.pop('rest_keys', {})
+        self.GET = kwargs.pop('query', {})
+        self.payload = kwargs.pop('payload', None)
+
+
+class FakeEndpoint(AsyncRestEndpoint):
+    @classmethod
+    def extract_request_data(cls, request):
+        return request.payload
+
+
+class PostResource(AsyncModelResource):
+    name = 'post'
+    read_only = ['id']
+    schema = {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "title": {"type": "string"},
+        },
+        "required": ["title"],
+    }
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.db = {1: {'id': 1, 'title': 'Hello'}}
+
+    async def query_items(self, request, params, payload):
+        await asyncio.sleep(0)
+        return list(self.db.values())
+
+    async def get_item(self, request, params, payload):
+        return self.db.get(int(self.get_pk(request)))
+
+    async def create_item(self, request, params, payload):
+        item = dict(payload, id=len(self.db) + 1)
+        self.db[item['id']] = item
+        return item
+
+    def update_item(self, request, params, payload):
+        item = self.db.get(int(self.get_pk(request)))
+        if item is not None:
+            item.update(payload)
+        return item
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def test_supported_verbs_are_based_on_hooks():
+    assert PostResource.supported_verbs == frozenset([
+        'query', 'get', 'create', 'update', 'head'
+    ])
+
+
+def test_query():
+    endpoint = FakeEndpoint(res_cls=PostResource)
+
+    result = run(endpoint.call_rest_handler(
+        'GET', FakeRequest(query={'_fields': 'title'})
+    ))
+
+    assert result.status == 200
+    assert result.data == [{'title': 'Hello'}]
+
+
+def test_paginates_async_iterables():
+    class PagedResource(PostResource):
+        sort_key = 'id'
+        page_size = 2
+
+        async def query_items(self, request, params, payload):
+            for pk in (3, 1, 2):
+                yield {'id': pk, 'title': str(pk)}
+
+    endpoint = FakeEndpoint(res_cls=PagedResource)
+
+    result = run(endpoint.call_rest_handler('GET', FakeRequest()))
+
+    assert [x['id'] for x in result.data] == [1, 2]
+    assert 'rel="next"' in result.headers['Link']
+
+
+def test_head_and_count():
+    endpoint = FakeEndpoint(res_cls=PostResource)
+
+    head = run(endpoint.call_rest_handler('HEAD', FakeRequest()))
+    missing = run(endpoint.call_rest_handler(
+        'HEAD', FakeRequest(rest_keys={'post_pk': '2'})
+    ))
+    count = run(endpoint.call_rest_handler(
+        'GET', FakeRequest(query={'_count': '1'})
+    ))
+
+    assert head.status == 200
+    assert head.data is None
+    assert head.headers['X-Total-Count'] == '1'
+    assert missing.status == 404
+    assert count.data == {'count': 1}
+
+
+def test_passes_requested_fields_to_hooks():
+    class ProjectedResource(PostResource):
+        async def query_items(self, request, params, payload, fields=None):
+            self.fields = fields
+            return list(self.db.values())
+
+    endpoint = FakeEndpoint(res_cls=ProjectedResource)
+
+    result = run(endpoint.call_rest_handler(
+        'GET', FakeRequest(query={'_fields': 'title'})
+    ))
+
+    assert result.data == [{'title': 'Hello'}]
+    assert 'title' in endpoint.resource.fields
+    assert 'id' not in endpoint.resource.fields
+
+
+def test_get():
+    endpoint = FakeEndpoint(res_cls=PostResource)
+
+    found = run(endpoint.call_rest_handler(
+        'GET', FakeRequest(rest_keys={'post_pk': '1'})
+    ))
+    missing = run(endpoint.call_rest_handler(
+        'GET', FakeRequest(rest_keys={'post_pk': '2'})
+    ))
+
+    assert found.status == 200
+    assert found.data == {'id': 1, 'title': 'Hello'}
+    assert missing.status == 404
+
+
+def test_bulk_create():
+    endpoint = FakeEndpoint(res_cls=PostResource)
+
+    created = run(endpoint.call_rest_handler(
+        'POST', FakeRequest(payload=[{'title': 'Second'}, {'title': 'Third'}])
+    ))
+    invalid = run(endpoint.call_rest_handler(
+        'POST', FakeRequest(payload=[{'title': 'Fourth'}, {'id': 5}])
+    ))
+
+    assert created.status == 201
+    assert [x['id'] for x in created.data] == [2, 3]
+    assert invalid.status == 400
+    assert [x['index'] for x in invalid.data['errors']] == [1]
+
+
+def test_bulk_update_and_delete():
+    class BulkResource(PostResource):
+        async def update_items(self, request, params, items):
+            return [self.db[pk].update(values) or self.db[pk]
+                    for pk, values in items]
+
+        async def delete_items(self, request, params, pks):
+            for pk in pks:
+                del self.db[pk]
+
+    endpoint = FakeEndpoint(res_cls=BulkResource)
+
+    updated = run(endpoint.call_rest_handler(
+        'PUT', FakeRequest(payload=[{'id': 1, 'title': 'Changed'}])
+    ))
+    deleted = run(endpoint.call_rest_handler(
+        'DELETE', FakeRequest(payload=[1])
+    ))
+
+    assert updated.status == 200
+    assert updated.data == [{'id': 1, 'title': 'Changed'}]
+    assert deleted.status == 204
+    assert endpoint.resource.db == {}
+
+
+def test_create_validates_payload():
+    endpoint = FakeEndpoint(res_cls=PostResource)
+
+    created = run(endpoint.call_rest_handler(
+        'POST', FakeRequest(payload={'title': 'Second'})
+    ))
+    invalid = run(endpoint.call_rest_handler(
+        'POST', FakeRequest(payload={'id': 3})
+    ))
+
+    assert created.status == 201
+    assert created.data == {'id': 2, 'title': 'Second'}
+    assert invalid.status == 400
+
+
+def test_update_with_sync_hook():
+    endpoint = FakeEndpoint(res_cls=PostResource)
+
+    result = run(endpoint.call_rest_handler('PUT', FakeRequest(
+        rest_keys={'post_pk': '1'},
+        payload={'id': 5, 'title': 'Updated'},
+    )))
+
+    assert result.status == 200
+    assert result.data == {'id': 1, 'title': 'Updated'}
+
+
+def test_query_supports_async_iterables():
+    class StreamResource(AsyncModelResource):
+        name = 'stream'
+
+        async def query_items(self, request, params, payload):
+            async def items():
+                for i in range(3):
+                    yield {'id': i}
+            return items()
+
+    endpoint = FakeEndpoint(res_cls=StreamResource)
+
+    result = run(endpoint.call_rest_handler('GET', FakeRequest()))
+
+    assert result.data == [{'id': 0}, {'id': 1}, {'id': 2}]
+
+
+def test_async_item_version_returns_304_without_loading_the_item():
+    loaded = []
+
+    class VersionedResource(PostResource):
+        async def item_version(self, request, params):
+            return 3
+
+        async def get_item(self, request, params, payload):
+            loaded.append(True)
+            return {'id': 1}
+
+    endpoint = FakeEndpoint(res_cls=VersionedResource)
+    request = FakeRequest(rest_keys={'post_pk': 1})
+    request.headers = {'if-none-match': '"3"'}
+
+    result = run(endpoint.call_rest_handler('GET', request))
+
+    assert result.status == 304
+    assert result.headers == {'ETag': '"3"'}
+    assert loaded == []
+
+
+def test_caches_responses_per_user():
+    class CachedResource(PostResource):
+        name = 'post'
+        cache = CachePolicy(vary_user=True)
+
+        async def get_item(self, request, params, payload):
+            self.loaded += 1
+            return self.db.get(int(self.get_pk(request)))
+
+    class UserEndpoint(FakeEndpoint):
+        def authorize(self, request):
+            return getattr(request, 'user', None)
+
+    endpoint = UserEndpoint(res_cls=CachedResource)
+    endpoint.resource.loaded = 0
+
+    def get(user):
+        request = FakeRequest(rest_keys={'post_pk': '1'})
+        request.user = user
+        return run(endpoint.call_rest_handler('GET', request))
+
+    get('alice')
+    get('alice')
+    get('bob')
+    assert endpoint.resource.loaded == 2
+
+    run(endpoint.call_rest_handler('PUT', FakeRequest(
+        rest_keys={'post_pk': '1'}, payload={'title': 'Updated'},
+    )))
+    assert get('alice').data == {'id': 1, 'title': 'Updated'}
+    assert endpoint.resource.loaded == 3
+
+
+def test_sync_model_resource_caches_responses_per_user():
+    class SyncCachedResource(ModelResource):
+        name = 'post'
+        cache = CachePolicy(vary_user=True)
+
+        def get_item(self, request, params, payload):
+            return {'id': 1, 'seen_by': current_user.get()}
+
+    class UserEndpoint(FakeEndpoint):
+        async def authorize(self, request):
+            return request.auth_user
+
+    endpoint = UserEndpoint(res_cls=SyncCachedResource)
+    endpoint.resource.invalidate_cache()
+
+    def get(user):
+        request = FakeRequest(rest_keys={'post_pk': '1'})
+        request.auth_user = user
+        return run(endpoint.call_rest_handler('GET', request))
+
+    alice = get('alice')
+    bob = get('bob')
+
+    assert alice.data == {'id': 1, 'seen_by': 'alice'}
+    assert bob.data == {'id': 1, 'seen_by': 'bob'}
+    assert 'Age' in get('bob').headers
+
+
+def test_refreshes_stale_entries_in_background():
+    class CachedResource(PostResource):
+        cache = CachePolicy(ttl=10, stale_while_revalidate=20)
+
+    endpoint = FakeEndpoint(res_cls=CachedResource)
+    endpoint.resource.invalidate_cache()
+
+    async def get_at(timestamp):
+        with patch('restible.cache.time.time', return_value=timestamp):
+            return await endpoint.call_rest_handler(
+                'GET', FakeRequest(rest_keys={'post_pk': '1'})
+            )
+
+    async def main():
+        await get_at(1000)
+        endpoint.resource.db[1]['title'] = 'Updated'
+
+        stale = await get_at(1015)
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+        return stale, await get_at(1016)
+
+    stale, fresh = run(main())
+
+    assert stale.data['title'] == 'Hello'
+    assert stale.headers['Age'] == '15'
+    assert fresh.data['title'] == 'Updated'
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import asyncio
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import RestResource
+from restible.aio import AsyncRestEndpoint, AsyncSingleFlight
+
+
+class FakeRequest(object):
+    def __init__(self, pk='1', query=None):
+        self.rest_keys = {'post_pk': pk}
+        self.GET = query or {}
+
+
+class PostResource(RestResource):
+    name = 'post'
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.calls = 0
+
+    async def rest_get(self, request, params, payload):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {'id': request.rest_keys['post_pk']}
+
+
+class FakeEndpoint(AsyncRestEndpoint):
+    res_cls = PostResource
+    single_flight = AsyncSingleFlight()
+
+    @classmethod
+    def extract_request_data(cls, request):
+        return None
+
+
+def run(coro):
+    return asyncio.new_event_loop().run_until_complete(coro)
+
+
+def test_identical_reads_are_coalesced():
+    endpoint = FakeEndpoint()
+
+    async def main():
+        return await asyncio.gather(*(
+            endpoint.call_rest_handler('GET', FakeRequest())
+            for _ in range(5)
+        ))
+
+    results = run(main())
+
+    assert endpoint.resource.calls == 1
+    assert [r.data for r in results] == [{'id': '1'}] * 5
+
+
+def test_different_pks_are_not_coalesced():
+    endpoint = FakeEndpoint()
+
+    async def main():
+        return await asyncio.gather(
+            endpoint.call_rest_handler('GET', FakeRequest('1')),
+            endpoint.call_rest_handler('GET', FakeRequest('2')),
+        )
+
+    results = run(main())
+
+    assert endpoint.resource.calls == 2
+    assert [r.data for r in results] == [{'id': '1'}, {'id': '2'}]
+
+
+def test_error_is_shared():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("DB connection lost")
+
+    async def main():
+        return await asyncio.gather(
+            flight.do('key', fail), flight.do('key', fail),
+            return_exceptions=True,
+        )
+
+    results = run(main())
+
+    assert len(calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(flight) == 0
+
+
+def test_waiting_call_takes_over_if_the_first_one_is_cancelled():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do('key', load))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do('key', load))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        return await follower
+
+    assert run(main()) == (2, False)
+    assert len(flight) == 0
@@ -0,0 +1,3 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
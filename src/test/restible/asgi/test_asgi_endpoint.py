@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import asyncio
+import gzip
+import json
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import RestResource, api_action, codec, streaming
+from restible.aio import AsyncModelResource
+from restible.asgi import AsgiEndpoint
+
+
+class PostResource(RestResource):
+    name = 'post'
+
+    async def rest_query(self, request, params, payload):
+        return [{'id': 1, 'params': dict(params)}]
+
+    def rest_get(self, request, params, payload):
+        return {'id': self.get_pk(request)}
+
+    async def rest_create(self, request, params, payload):
+        return payload
+
+    @api_action(generic=True, protected=False)
+    async def publish_all(self, request, params, payload):
+        return {'published': 'all'}
+
+
+def call(app, method, path, query=b'', body=None, headers=None):
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query,
+        'headers': list(headers or []),
+    }
+    messages = []
+    if body is not None:
+        data = json.dumps(body).encode('utf-8')
+        scope['headers'].append((b'content-length', str(len(data)).encode()))
+        # Send the body in two chunks.
+        messages = [
+            {'type': 'http.request', 'body': data[:3], 'more_body': True},
+            {'type': 'http.request', 'body': data[3:]},
+        ]
+
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        return {'type': 'http.request', 'body': b''}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.new_event_loop().run_until_complete(app(scope, receive, send))
+
+    start = sent[0]
+    headers = {k.decode(): v.decode() for k, v in start['headers']}
+    assert not sent[-1].get('more_body', False)
+    return start['status'], headers, b''.join(m['body'] for m in sent[1:])
+
+
+@pytest.fixture
+def app():
+    return AsgiEndpoint.create_app(resources=[['/api/post', PostResource]])
+
+
+def test_query(app):
+    status, headers, content = call(app, 'GET', '/api/post', b'age=18')
+
+    assert status == 200
+    assert headers['content-type'] == 'application/json'
+    assert json.loads(content.decode('utf-8')) == [
+        {'id': 1, 'params': {'age': 18}}
+    ]
+
+
+def test_get(app):
+    status, _, content = call(app, 'GET', '/api/post/12')
+
+    assert status == 200
+    assert json.loads(content.decode('utf-8')) == {'id': '12'}
+
+
+def test_create_reads_chunked_body(app):
+    status, _, content = call(app, 'POST', '/api/post', body={'title': 'a'})
+
+    assert status == 201
+    assert json.loads(content.decode('utf-8')) == {'title': 'a'}
+
+
+def test_generic_action(app):
+    status, _, content = call(app, 'POST', '/api/post/publish_all')
+
+    assert status == 200
+    assert json.loads(content.decode('utf-8')) == {'published': 'all'}
+
+
+def test_unknown_path_returns_404(app):
+    status, _, _ = call(app, 'GET', '/api/other')
+
+    assert status == 404
+
+
+def test_handles_lifespan(app):
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.new_event_loop().run_until_complete(
+        app({'type': 'lifespan'}, receive, send)
+    )
+
+    assert [m['type'] for m in sent] == [
+        'lifespan.startup.complete',
+        'lifespan.shutdown.complete',
+    ]
+
+
+class StreamedResource(AsyncModelResource):
+    name = 'streamed'
+    streaming = True
+
+    async def query_items(self, request, params, payload):
+        for i in range(3):
+            yield {'id': i}
+
+
+class SyncStreamedResource(AsyncModelResource):
+    name = 'sync_streamed'
+    streaming = True
+
+    def query_items(self, request, params, payload):
+        return iter([{'id': 0}, {'id': 1}, {'id': 2}])
+
+
+@pytest.mark.parametrize('res_cls', (StreamedResource, SyncStreamedResource))
+def test_streams_query_results(res_cls):
+    endpoint = AsgiEndpoint(res_cls=res_cls, prefix='/items')
+
+    status, headers, content = call(endpoint, 'GET', '/items')
+
+    assert status == 200
+    assert headers['content-type'] == 'application/json'
+    assert 'content-length' not in headers
+    assert json.loads(content.decode('utf-8')) == [
+        {'id': 0}, {'id': 1}, {'id': 2}
+    ]
+
+
+class FailingStreamResource(AsyncModelResource):
+    name = 'failing'
+    streaming = True
+    row_size = 10
+
+    async def query_items(self, request, params, payload):
+        yield {'id': 0, 'data': 'x' * self.row_size}
+        raise RuntimeError("DB connection lost")
+
+
+def test_stream_failing_before_first_chunk_returns_500():
+    endpoint = AsgiEndpoint(res_cls=FailingStreamResource, prefix='/items')
+
+    status, _, _ = call(endpoint, 'GET', '/items')
+
+    assert status == 500
+
+
+def test_stream_failing_after_first_chunk_is_aborted():
+    class LargeRowsResource(FailingStreamResource):
+        row_size = streaming.CHUNK_SIZE
+
+    endpoint = AsgiEndpoint(res_cls=LargeRowsResource, prefix='/items')
+
+    with pytest.raises(RuntimeError):
+        call(endpoint, 'GET', '/items')
+
+
+@pytest.mark.parametrize('res_cls', (StreamedResource, SyncStreamedResource))
+def test_streams_ndjson_if_requested(res_cls):
+    endpoint = AsgiEndpoint(res_cls=res_cls, prefix='/items')
+
+    status, headers, content = call(
+        endpoint, 'GET', '/items',
+        headers=[(b'accept', b'application/x-ndjson')],
+    )
+
+    assert status == 200
+    assert headers['content-type'] == 'application/x-ndjson'
+    assert [json.loads(x) for x in content.decode('utf-8').splitlines()] == [
+        {'id': 0}, {'id': 1}, {'id': 2}
+    ]
+
+
+@pytest.mark.skipif(not codec.MsgpackCodec.available(), reason="needs msgpack")
+def test_streamed_results_with_binary_codec():
+    endpoint = AsgiEndpoint(res_cls=StreamedResource, prefix='/items')
+
+    status, headers, content = call(
+        endpoint, 'GET', '/items',
+        headers=[(b'accept', b'application/msgpack')],
+    )
+
+    assert status == 200
+    assert headers['content-type'] == 'application/msgpack'
+    assert headers['vary'] == 'Accept, Accept-Encoding'
+    assert codec.MsgpackCodec().loads(content) == [
+        {'id': 0}, {'id': 1}, {'id': 2}
+    ]
+
+
+@pytest.mark.parametrize('res_cls', (StreamedResource, SyncStreamedResource))
+def test_compresses_streamed_results(res_cls):
+    endpoint = AsgiEndpoint(res_cls=res_cls, prefix='/items')
+
+    status, headers, content = call(
+        endpoint, 'GET', '/items', headers=[(b'accept-encoding', b'gzip')]
+    )
+
+    assert status == 200
+    assert headers['content-encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(content).decode('utf-8')) == [
+        {'id': 0}, {'id': 1}, {'id': 2}
+    ]
+
+
+def test_batch_request():
+    app = AsgiEndpoint.create_app(
+        resources=[['/api/post', PostResource]], batch_path='/api/batch'
+    )
+
+    status, _, content = call(app, 'POST', '/api/batch', body={
+        'operations': [
+            {'method': 'GET', 'pk': 1},
+            {'method': 'GET', 'pk': 2},
+            {'method': 'POST', 'action': 'publish_all'},
+        ],
+    })
+
+    assert status == 200
+    assert [r['body'] for r in json.loads(content.decode('utf-8'))] == [
+        {'id': '1'}, {'id': '2'}, {'published': 'all'},
+    ]
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import threading
+import time
+from contextlib import contextmanager
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import batch, exc
+
+
+def ops(*methods):
+    return [batch.Operation(method, pk=str(i)) for i, method in enumerate(methods)]
+
+
+def test_parse_accepts_list_of_operations():
+    operations, atomic = batch.parse([
+        {'method': 'get', 'resource': 'post', 'pk': 1},
+        {'method': 'POST', 'body': {'title': 'a'}},
+    ], max_size=10)
+
+    assert atomic is False
+    assert operations == [
+        batch.Operation('GET', resource='post', pk='1'),
+        batch.Operation('POST', body={'title': 'a'}),
+    ]
+
+
+def test_parse_accepts_options():
+    operations, atomic = batch.parse({
+        'atomic': True,
+        'operations': [{'method': 'DELETE', 'pk': '1'}],
+    }, max_size=10)
+
+    assert atomic is True
+    assert operations == [batch.Operation('DELETE', pk='1')]
+
+
+@pytest.mark.parametrize('payload', (
+    None,
+    {'method': 'GET'},
+    [{'resource': 'post'}],
+    [{'method': 'GET', 'unknown': 1}],
+    [{'method': 'GET'}] * 11,
+))
+def test_parse_rejects_invalid_payload(payload):
+    with pytest.raises(exc.BadRequest):
+        batch.parse(payload, max_size=10)
+
+
+def test_run_returns_results_in_order():
+    results = batch.run(
+        ops('GET', 'POST', 'GET', 'GET'),
+        lambda op: batch.make_result(200, {}, op.pk),
+        workers=4,
+    )
+
+    assert [r['body'] for r in results] == ['0', '1', '2', '3']
+
+
+def test_run_executes_reads_in_parallel():
+    barrier = threading.Event()
+    started = []
+
+    def call(operation):
+        started.append(operation.pk)
+        if len(started) == 3:
+            barrier.set()
+        # Would time out if the reads were executed one by one.
+        assert barrier.wait(5)
+        return batch.make_result(200, {}, None)
+
+    batch.run(ops('GET', 'GET', 'GET'), call, workers=3)
+
+    assert sorted(started) == ['0', '1', '2']
+
+
+def test_writes_wait_for_previous_operations():
+    log = []
+
+    def call(operation):
+        if operation.is_read:
+            time.sleep(0.01)
+        log.append(operation.pk)
+        return batch.make_result(200, {}, None)
+
+    batch.run(ops('GET', 'GET', 'PUT', 'GET'), call, workers=2)
+
+    assert sorted(log[:2]) == ['0', '1']
+    assert log[2:] == ['2', '3']
+
+
+def test_atomic_batch_is_rolled_back_on_first_error():
+    state = {}
+    calls = []
+
+    @contextmanager
+    def transaction():
+        try:
+            yield
+            state['committed'] = True
+        except Exception:
+            state['rolled_back'] = True
+            raise
+
+    def call(operation):
+        calls.append(operation.pk)
+        status = 400 if operation.pk == '1' else 200
+        return batch.make_result(status, {}, None)
+
+    results = batch.run_atomic(ops('POST', 'POST', 'POST'), call, transaction())
+
+    assert state == {'rolled_back': True}
+    assert calls == ['0', '1']
+    assert [r['status'] for r in results] == [424, 400, 424]
+
+
+def test_atomic_batch_is_committed():
+    state = {}
+
+    @contextmanager
+    def transaction():
+        yield
+        state['committed'] = True
+
+    results = batch.run_atomic(
+        ops('POST', 'PUT'),
+        lambda op: batch.make_result(200, {}, op.pk),
+        transaction(),
+    )
+
+    assert state == {'committed': True}
+    assert [r['body'] for r in results] == ['0', '1']
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# Project imports
+from restible.cache import BloomFilter
+
+
+def test_has_no_false_negatives():
+    bloom = BloomFilter.from_keys(range(1000))
+
+    assert all(i in bloom for i in range(1000))
+
+
+def test_false_positive_rate_is_close_to_target():
+    bloom = BloomFilter.from_keys(range(1000), error_rate=0.01)
+
+    false_positives = sum(1 for i in range(1000, 11000) if i in bloom)
+
+    assert false_positives < 300
+
+
+def test_keys_are_compared_as_text():
+    bloom = BloomFilter.from_keys([1, ('a', 2)])
+
+    assert '1' in bloom
+    assert ['a', '2'] in bloom
+
+
+def test_empty_filter():
+    bloom = BloomFilter.from_keys([])
+
+    assert 'missing' not in bloom
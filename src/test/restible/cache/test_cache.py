@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+from mock import patch
+
+# Project imports
+from restible import cache
+
+
+def test_lru_evicts_least_recently_used():
+    lru = cache.LruCache(max_entries=2)
+    lru.set('a', 1)
+    lru.set('b', 2)
+
+    assert lru.get('a') == 1
+    lru.set('c', 3)
+
+    assert 'a' in lru
+    assert 'b' not in lru
+    assert 'c' in lru
+    assert len(lru) == 2
+
+
+@patch('restible.cache.now')
+def test_lru_entries_expire(p_now):
+    lru = cache.LruCache(max_entries=10)
+
+    p_now.return_value = 100
+    lru.set('a', 1, ttl=10)
+
+    p_now.return_value = 109
+    assert lru.get('a') == 1
+
+    p_now.return_value = 110
+    assert lru.get('a', 'default') == 'default'
+    assert len(lru) == 0
+
+
+def test_lru_counts_hits_and_misses():
+    lru = cache.LruCache(max_entries=10)
+    lru.set('a', 1)
+
+    lru.get('a')
+    lru.get('a')
+    lru.get('b')
+
+    assert lru.hits == 2
+    assert lru.misses == 1
+
+
+def test_key_does_not_depend_on_params_order():
+    response_cache = cache.ResponseCache(cache.CachePolicy())
+
+    key1 = response_cache.make_key('collection', None, {'a': 1, 'b': 2})
+    key2 = response_cache.make_key('collection', None, {'b': 2, 'a': 1})
+
+    assert key1 == key2
+
+
+def test_key_normalizes_fields():
+    response_cache = cache.ResponseCache(cache.CachePolicy())
+
+    key1 = response_cache.make_key('item', '1', {'_fields': 'id,title'})
+    key2 = response_cache.make_key('item', '1', {'_fields': 'title, id'})
+
+    assert key1 == key2
+
+
+def test_key_ignores_user_unless_vary_user_is_set():
+    shared = cache.ResponseCache(cache.CachePolicy())
+    per_user = cache.ResponseCache(cache.CachePolicy(vary_user=True))
+
+    assert (
+        shared.make_key('item', '1', {}, user=1) ==
+        shared.make_key('item', '1', {}, user=2)
+    )
+    assert (
+        per_user.make_key('item', '1', {}, user=1) !=
+        per_user.make_key('item', '1', {}, user=2)
+    )
+
+
+def test_key_supports_multiple_pks():
+    response_cache = cache.ResponseCache(cache.CachePolicy())
+
+    key = response_cache.make_key('item', ['1', '2'], {})
+
+    assert hash(key)
+
+
+def test_invalidate_drops_all_entries():
+    response_cache = cache.ResponseCache(cache.CachePolicy())
+    key = response_cache.make_key('item', '1', {})
+    response_cache.set(key, {'id': 1}, response_cache.generation)
+
+    response_cache.invalidate()
+
+    assert response_cache.get(key) is cache.MISSING
+
+
+def test_does_not_store_data_loaded_before_invalidation():
+    response_cache = cache.ResponseCache(cache.CachePolicy())
+    key = response_cache.make_key('item', '1', {})
+    generation = response_cache.generation
+
+    response_cache.invalidate()
+    response_cache.set(key, {'id': 1}, generation)
+
+    assert response_cache.get(key) is cache.MISSING
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import datetime
+import os
+
+# 3rd party imports
+import pytest
+from mock import patch
+
+# Project imports
+from restible import cache
+
+
+@pytest.fixture
+def path(tmpdir):
+    return str(tmpdir.join('cache.sqlite'))
+
+
+def test_stores_values(path):
+    backend = cache.SqliteCacheBackend(path)
+    value = {'id': 1, 'created_at': datetime.datetime(2019, 3, 4)}
+
+    backend.set('post', ('item', 1), value, 30, 0)
+
+    assert backend.get('post', ('item', 1)) == value
+    assert backend.get('post', ('item', 2)) is cache.MISSING
+    assert backend.get('user', ('item', 1)) is cache.MISSING
+
+
+def test_entries_expire(path):
+    backend = cache.SqliteCacheBackend(path)
+
+    with patch('restible.cache.time.time', return_value=100):
+        backend.set('post', 'key', 'value', 10, 0)
+
+    with patch('restible.cache.time.time', return_value=109):
+        assert backend.get('post', 'key') == 'value'
+
+    with patch('restible.cache.time.time', return_value=110):
+        assert backend.get('post', 'key') is cache.MISSING
+
+
+def test_evicts_oldest_entries(path):
+    backend = cache.SqliteCacheBackend(path, max_entries=2)
+
+    for i in range(3):
+        with patch('restible.cache.time.time', return_value=100 + i):
+            backend.set('post', i, i, 30, 0)
+
+    with patch('restible.cache.time.time', return_value=105):
+        assert backend.get('post', 0) is cache.MISSING
+        assert backend.get('post', 1) == 1
+        assert backend.get('post', 2) == 2
+
+
+def test_invalidate_only_affects_the_namespace(path):
+    backend = cache.SqliteCacheBackend(path)
+    backend.set('post', 'key', 'post', 30, 0)
+    backend.set('user', 'key', 'user', 30, 0)
+
+    backend.invalidate('post')
+
+    assert backend.generation('post') == 1
+    assert backend.generation('user') == 0
+    assert backend.get('post', 'key') is cache.MISSING
+    assert backend.get('user', 'key') == 'user'
+
+
+def test_does_not_store_data_loaded_before_invalidation(path):
+    backend = cache.SqliteCacheBackend(path)
+    generation = backend.generation('post')
+
+    backend.invalidate('post')
+    backend.set('post', 'key', 'stale', 30, generation)
+
+    assert backend.get('post', 'key') is cache.MISSING
+
+
+def test_instances_share_the_cache(path):
+    worker1 = cache.SqliteCacheBackend(path)
+    worker2 = cache.SqliteCacheBackend(path)
+
+    worker1.set('post', 'key', 'value', 30, 0)
+    assert worker2.get('post', 'key') == 'value'
+
+    worker2.invalidate('post')
+    assert worker1.get('post', 'key') is cache.MISSING
+    assert worker1.generation('post') == 1
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="Requires fork()")
+def test_invalidation_is_visible_across_processes(path):
+    backend = cache.SqliteCacheBackend(path)
+    backend.set('post', 'key', 'value', 30, 0)
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            backend.invalidate('post')
+        finally:
+            os._exit(0)     # pylint: disable=protected-access
+
+    os.waitpid(pid, 0)
+
+    assert backend.get('post', 'key') is cache.MISSING
+
+
+def test_response_cache_uses_the_policy_backend(path):
+    backend = cache.SqliteCacheBackend(path)
+    response_cache = cache.ResponseCache(
+        cache.CachePolicy(backend=backend), 'post'
+    )
+    key = response_cache.make_key('item', '1', {})
+
+    response_cache.set(key, {'id': 1}, response_cache.generation)
+
+    assert backend.get('post', key).data == {'id': 1}
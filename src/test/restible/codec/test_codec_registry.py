@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import datetime
+import decimal
+import uuid
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import codec
+
+
+class TextCodec(codec.Codec):
+    name = 'text'
+    media_type = 'text/plain'
+
+    def dumps(self, value):
+        return str(value).encode('utf-8')
+
+    def loads(self, data):
+        return data.decode('utf-8')
+
+
+@pytest.fixture
+def registry():
+    result = codec.CodecRegistry()
+    result.register(codec.CurrentJsonCodec(), [codec.JSON, codec.NDJSON])
+    result.register(TextCodec())
+    return result
+
+
+@pytest.mark.parametrize('accept,expected', (
+    (None, codec.JSON),
+    ('', codec.JSON),
+    ('*/*', codec.JSON),
+    ('application/*', codec.JSON),
+    ('text/*', 'text/plain'),
+    ('text/plain', 'text/plain'),
+    ('text/plain;q=0.5, application/json', codec.JSON),
+    ('application/json;q=0.5, text/plain;q=0.9', 'text/plain'),
+    ('application/x-ndjson', codec.NDJSON),
+    ('image/png, text/plain;q=0.1', 'text/plain'),
+))
+def test_negotiate(registry, accept, expected):
+    media_type, _ = registry.negotiate(accept)
+
+    assert media_type == expected
+
+
+@pytest.mark.parametrize('accept', (
+    'image/png',
+    'text/plain;q=0',
+    'image/*',
+))
+def test_negotiate_returns_None_if_nothing_is_acceptable(registry, accept):
+    assert registry.negotiate(accept) is None
+
+
+def test_negotiate_result_is_cached(registry):
+    assert registry.negotiate('text/plain') is registry.negotiate('text/plain')
+
+
+def test_register_clears_the_negotiation_cache(registry):
+    assert registry.negotiate('image/png') is None
+
+    registry.register(TextCodec(), ['image/png'])
+
+    assert registry.negotiate('image/png')[0] == 'image/png'
+
+
+@pytest.mark.parametrize('content_type,expected', (
+    (None, codec.CurrentJsonCodec),
+    ('application/json', codec.CurrentJsonCodec),
+    ('application/json; charset=utf-8', codec.CurrentJsonCodec),
+    ('Text/Plain', TextCodec),
+))
+def test_for_content_type(registry, content_type, expected):
+    assert isinstance(registry.for_content_type(content_type), expected)
+
+
+def test_for_content_type_returns_None_if_not_supported(registry):
+    assert registry.for_content_type('image/png') is None
+
+
+def test_unregister(registry):
+    registry.unregister('text/plain')
+
+    assert registry.get('text/plain') is None
+    assert 'text/plain' not in registry.media_types
+
+
+BINARY_CODECS = [
+    c() for c in (codec.MsgpackCodec, codec.CborCodec) if c.available()
+]
+
+
+@pytest.mark.parametrize('binary_codec', BINARY_CODECS, ids=lambda c: c.name)
+def test_binary_codec_roundtrip(binary_codec):
+    value = {'name': 'zażółć', 'tags': ['a', 'b'], 'count': 3, 'ok': None}
+
+    assert binary_codec.loads(binary_codec.dumps(value)) == value
+
+
+@pytest.mark.parametrize('binary_codec', BINARY_CODECS, ids=lambda c: c.name)
+def test_binary_codec_encodes_non_native_types(binary_codec):
+    value = {
+        'datetime': datetime.datetime(2019, 3, 4, 12, 30, 15),
+        'decimal': decimal.Decimal('10.50'),
+        'uuid': uuid.UUID(int=1),
+    }
+
+    decoded = binary_codec.loads(binary_codec.dumps(value))
+
+    assert set(decoded) == set(value)
+
+
+@pytest.mark.parametrize('binary_codec', BINARY_CODECS, ids=lambda c: c.name)
+def test_binary_codec_raises_ValueError_for_invalid_data(binary_codec):
+    with pytest.raises(ValueError):
+        binary_codec.loads(b'\xc1\xff\xff')
+
+
+def test_default_registry_has_all_available_codecs():
+    media_types = codec.default_registry().media_types
+
+    assert codec.JSON in media_types
+    assert (codec.MSGPACK in media_types) == codec.MsgpackCodec.available()
+    assert (codec.CBOR in media_types) == codec.CborCodec.available()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import datetime
+import decimal
+import json
+import uuid
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import codec
+
+
+CODECS = [c() for c in codec.JSON_CODECS if c.available()]
+
+
+@pytest.fixture(params=CODECS, ids=lambda c: c.name)
+def json_codec(request):
+    return request.param
+
+
+def test_roundtrip(json_codec):
+    value = {'name': 'zażółć', 'tags': ['a', 'b'], 'count': 3, 'ok': True}
+
+    encoded = json_codec.dumps(value)
+
+    assert isinstance(encoded, bytes)
+    assert json_codec.loads(encoded) == value
+    assert json.loads(encoded.decode('utf-8')) == value
+
+
+def test_encodes_non_json_types(json_codec):
+    value = {
+        'datetime': datetime.datetime(2019, 3, 4, 12, 30, 15),
+        'date': datetime.date(2019, 3, 4),
+        'time': datetime.time(12, 30),
+        'decimal': decimal.Decimal('10.50'),
+        'uuid': uuid.UUID(int=1),
+    }
+
+    assert json_codec.loads(json_codec.dumps(value)) == {
+        'datetime': '2019-03-04T12:30:15',
+        'date': '2019-03-04',
+        'time': '12:30:00',
+        'decimal': '10.50',
+        'uuid': '00000000-0000-0000-0000-000000000001',
+    }
+
+
+def test_raises_TypeError_for_unsupported_types(json_codec):
+    with pytest.raises(TypeError):
+        json_codec.dumps({'value': object()})
+
+
+def test_raises_ValueError_for_invalid_json(json_codec):
+    with pytest.raises(ValueError):
+        json_codec.loads(b'{"invalid": ')
+
+
+def test_picks_the_fastest_available_codec():
+    available = [c for c in codec.JSON_CODECS if c.available()]
+
+    assert isinstance(codec.best_json_codec(), available[0])
+
+
+def test_can_change_the_codec():
+    prev = codec.use_json_codec('json')
+    try:
+        assert isinstance(codec.json_codec, codec.StdlibJsonCodec)
+        assert codec.dumps({'a': 1}) == b'{"a":1}'
+    finally:
+        codec.use_json_codec(prev)
+
+    assert codec.json_codec is prev
+
+
+def test_raises_ValueError_for_unavailable_codec():
+    with pytest.raises(ValueError):
+        codec.use_json_codec('not-a-codec')
+
+
+@pytest.mark.skipif(not codec.OrjsonCodec.available(), reason="needs orjson")
+def test_orjson_falls_back_to_stdlib_for_big_integers():
+    json_codec = codec.OrjsonCodec()
+
+    assert json_codec.loads(json_codec.dumps({'big': 2 ** 70})) == {
+        'big': 2 ** 70
+    }
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import gzip
+import io
+import zlib
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible.compression import Compression, add_vary
+
+
+BODY = b'{"items": [' + b','.join([b'{"id": 1}'] * 500) + b']}'
+
+
+@pytest.mark.parametrize('accept_encoding,expected', (
+    (None, None),
+    ('', None),
+    ('gzip', 'gzip'),
+    ('deflate', 'deflate'),
+    ('deflate, gzip', 'gzip'),
+    ('gzip;q=0.5, deflate', 'deflate'),
+    ('gzip;q=0, deflate;q=0', None),
+    ('*', 'gzip'),
+    ('br', None),
+    ('identity', None),
+))
+def test_negotiate(accept_encoding, expected):
+    assert Compression().negotiate(accept_encoding) == expected
+
+
+def test_compresses_gzip():
+    headers, body = Compression().apply(
+        [('Content-Length', str(len(BODY)))], BODY, 'gzip'
+    )
+
+    assert gzip.GzipFile(fileobj=io.BytesIO(body)).read() == BODY
+    assert dict(headers) == {
+        'Content-Encoding': 'gzip',
+        'Content-Length': str(len(body)),
+        'Vary': 'Accept-Encoding',
+    }
+
+
+def test_compressed_response_has_weak_etag():
+    headers, _ = Compression().apply([('ETag', '"abc"')], BODY, 'gzip')
+
+    assert dict(headers)['ETag'] == 'W/"abc"'
+
+
+def test_compresses_deflate():
+    _, body = Compression().apply([], BODY, 'deflate')
+
+    assert zlib.decompress(body) == BODY
+
+
+def test_does_not_compress_small_responses():
+    headers, body = Compression(min_size=len(BODY) + 1).apply([], BODY, 'gzip')
+
+    assert body == BODY
+    assert 'Content-Encoding' not in dict(headers)
+
+
+def test_does_not_compress_already_encoded_responses():
+    headers = [('Content-Encoding', 'br')]
+
+    new_headers, body = Compression().apply(headers, BODY, 'gzip')
+
+    assert body == BODY
+    assert new_headers == headers
+
+
+def test_adds_vary_even_if_not_compressed():
+    headers, _ = Compression().apply([], BODY, None)
+
+    assert dict(headers) == {'Vary': 'Accept-Encoding'}
+
+
+def test_streams_are_compressed_incrementally():
+    produced = []
+
+    def chunks():
+        for i in range(3):
+            produced.append(i)
+            yield BODY
+
+    headers, body = Compression().apply([], chunks(), 'gzip')
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    first = next(body)
+    assert produced == [0]
+    assert decompressor.decompress(first) == BODY
+
+    rest = b''.join(body)
+    assert decompressor.decompress(rest) == BODY * 2
+    assert 'Content-Length' not in dict(headers)
+
+
+def gzip_compress(data):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+@pytest.mark.parametrize('encoding,compress', (
+    ('gzip', gzip_compress),
+    ('deflate', zlib.compress),
+))
+def test_decompress(encoding, compress):
+    assert Compression().decompress(compress(BODY), encoding) == BODY
+
+
+def test_decompress_rejects_too_large_bodies():
+    compression = Compression(max_request_size=100)
+
+    with pytest.raises(ValueError):
+        compression.decompress(zlib.compress(BODY), 'deflate')
+
+
+def test_decompress_rejects_invalid_data():
+    with pytest.raises(ValueError):
+        Compression().decompress(b'not compressed', 'gzip')
+
+
+def test_decompress_raises_KeyError_for_unknown_encoding():
+    with pytest.raises(KeyError):
+        Compression().decompress(b'', 'br')
+
+
+def test_add_vary_extends_existing_header():
+    headers = add_vary([('Vary', 'Accept')], 'Accept-Encoding')
+
+    assert headers == [('Vary', 'Accept, Accept-Encoding')]
+    assert add_vary(headers, 'accept-encoding') == headers
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import copy
+from contextlib import contextmanager
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import ModelResource, RestEndpoint, RestResource, api_action
+from restible.cache import CachePolicy
+
+
+class FakeRequest(object):
+    def __init__(self, data=None):
+        self.data = data
+        self.headers = {'authorization': 'token'}
+        self.session = 'session'
+
+
+class PostResource(RestResource):
+    name = 'post'
+
+    def rest_query(self, request, params, payload):
+        return iter([{'params': dict(params)}])
+
+    def rest_get(self, request, params, payload):
+        return {'id': self.get_pk(request), 'session': request.session}
+
+    def rest_create(self, request, params, payload):
+        if not payload:
+            return 400, {'detail': 'Empty'}
+        return payload
+
+    @api_action(protected=False)
+    def publish(self, request, params, payload):
+        return {'published': self.get_pk(request)}
+
+
+class UserResource(RestResource):
+    name = 'user'
+    route_params = [{'name': 'user_id'}]
+
+    def rest_get(self, request, params, payload):
+        return {'user': self.get_pk(request)}
+
+
+class FakeEndpoint(RestEndpoint):
+    transactions = []
+
+    def authorize(self, request):
+        return request.headers.get('authorization')
+
+    def batch_transaction(self, request):
+        @contextmanager
+        def transaction():
+            try:
+                yield
+                self.transactions.append('commit')
+            except Exception:
+                self.transactions.append('rollback')
+                raise
+        return transaction()
+
+    @classmethod
+    def extract_request_data(cls, request):
+        return request.data
+
+
+@pytest.fixture
+def endpoints():
+    FakeEndpoint.transactions = []
+    return {
+        'post': FakeEndpoint(res_cls=PostResource),
+        'user': FakeEndpoint(res_cls=UserResource),
+    }
+
+
+def call_batch(endpoints, payload):
+    return endpoints['post'].call_batch(FakeRequest(payload), None, endpoints)
+
+
+def test_executes_all_operations(endpoints):
+    result = call_batch(endpoints, [
+        {'method': 'GET', 'pk': 1},
+        {'method': 'GET', 'resource': 'user', 'pk': 2},
+        {'method': 'GET', 'params': {'age': '18'}},
+        {'method': 'POST', 'body': {'title': 'a'}},
+        {'method': 'POST', 'pk': 3, 'action': 'publish'},
+    ])
+
+    assert result.status == 200
+    assert [(r['status'], r['body']) for r in result.data] == [
+        (200, {'id': '1', 'session': 'session'}),
+        (200, {'user': '2'}),
+        (200, [{'params': {'age': 18}}]),
+        (201, {'title': 'a'}),
+        (200, {'published': '3'}),
+    ]
+
+
+def test_accepts_typed_params(endpoints):
+    result = call_batch(endpoints, [
+        {'method': 'GET', 'params': {
+            'author_id': 3, 'score': 1.5, 'draft': False, 'tag': None,
+        }},
+    ])
+
+    assert result.data[0]['status'] == 200
+    assert result.data[0]['body'] == [{'params': {
+        'author_id': 3, 'score': 1.5, 'draft': False, 'tag': None,
+    }}]
+
+
+def test_operation_errors_are_returned_per_operation(endpoints):
+    result = call_batch(endpoints, [
+        {'method': 'GET', 'resource': 'comment'},
+        {'method': 'DELETE', 'pk': 1},
+        {'method': 'GET', 'pk': 1},
+    ])
+
+    assert result.status == 200
+    assert [r['status'] for r in result.data] == [404, 405, 200]
+
+
+def test_invalid_batch_returns_400(endpoints):
+    result = call_batch(endpoints, {'operations': 'all'})
+
+    assert result.status == 400
+
+
+def test_too_many_operations(endpoints):
+    result = call_batch(endpoints, [{'method': 'GET', 'pk': 1}] * 51)
+
+    assert result.status == 400
+
+
+def test_atomic_batch_is_committed(endpoints):
+    result = call_batch(endpoints, {'atomic': True, 'operations': [
+        {'method': 'POST', 'body': {'title': 'a'}},
+        {'method': 'POST', 'body': {'title': 'b'}},
+    ]})
+
+    assert [r['status'] for r in result.data] == [201, 201]
+    assert FakeEndpoint.transactions == ['commit']
+
+
+def test_atomic_batch_is_rolled_back(endpoints):
+    result = call_batch(endpoints, {'atomic': True, 'operations': [
+        {'method': 'POST', 'body': {'title': 'a'}},
+        {'method': 'POST', 'body': {}},
+        {'method': 'POST', 'body': {'title': 'c'}},
+    ]})
+
+    assert [r['status'] for r in result.data] == [424, 400, 424]
+    assert FakeEndpoint.transactions == ['rollback']
+
+
+def test_atomic_batch_requires_transaction_support():
+    endpoint = RestEndpoint(res_cls=PostResource)
+
+    result = endpoint.call_batch(FakeRequest(), {'atomic': True, 'operations': [
+        {'method': 'POST', 'body': {'title': 'a'}},
+    ]})
+
+    assert result.status == 400
+
+
+class CachedPostResource(ModelResource):
+    name = 'cached_post'
+    cache = CachePolicy(ttl=30)
+    db = {}
+
+    def get_item(self, request, params, payload):
+        return self.db.get(self.get_pk(request))
+
+    def update_item(self, request, params, payload):
+        item = self.db.get(self.get_pk(request))
+        item.update(payload)
+        return item
+
+    def create_item(self, request, params, payload):
+        raise ModelResource.AlreadyExists()
+
+
+class RollbackEndpoint(RestEndpoint):
+    res_cls = CachedPostResource
+
+    def batch_transaction(self, request):
+        @contextmanager
+        def transaction():
+            snapshot = copy.deepcopy(CachedPostResource.db)
+            try:
+                yield
+            except Exception:
+                CachedPostResource.db = snapshot
+                raise
+        return transaction()
+
+    @classmethod
+    def extract_request_data(cls, request):
+        return request.data
+
+
+def test_rolled_back_batch_does_not_leave_uncommitted_data_in_cache():
+    CachedPostResource.db = {'1': {'id': '1', 'title': 'orig'}}
+    endpoint = RollbackEndpoint()
+    endpoint.resource.invalidate_cache()
+
+    result = endpoint.call_batch(FakeRequest(), {'atomic': True, 'operations': [
+        {'method': 'PUT', 'pk': '1', 'body': {'title': 'uncommitted'}},
+        {'method': 'GET', 'pk': '1'},
+        {'method': 'POST', 'body': {'title': 'fails'}},
+    ]})
+    assert [r['status'] for r in result.data] == [424, 424, 400]
+
+    request = FakeRequest()
+    request.rest_keys = {'cached_post_pk': '1'}
+    request.GET = {}
+    after = endpoint.call_rest_handler('GET', request)
+
+    assert after.data == {'id': '1', 'title': 'orig'}
+
+
+class CommitLogEndpoint(RollbackEndpoint):
+    log = []
+
+    def batch_transaction(self, request):
+        @contextmanager
+        def transaction():
+            try:
+                yield
+            except Exception:
+                self.log.append('rollback')
+                raise
+            self.log.append('commit')
+        return transaction()
+
+
+@pytest.mark.parametrize('operations,expected', (
+    (
+        [{'method': 'PUT', 'pk': '1', 'body': {'title': 'new'}}],
+        ['commit', 'invalidate update'],
+    ),
+    (
+        [
+            {'method': 'PUT', 'pk': '1', 'body': {'title': 'new'}},
+            {'method': 'POST', 'body': {'title': 'fails'}},
+        ],
+        ['rollback', 'invalidate None'],
+    ),
+))
+def test_atomic_batch_invalidates_cache_after_commit(operations, expected):
+    CachedPostResource.db = {'1': {'id': '1', 'title': 'orig'}}
+    endpoint = CommitLogEndpoint()
+    endpoint.log = log = []
+    endpoint.resource.invalidate_cache = lambda verb=None: log.append(
+        'invalidate {}'.format(verb)
+    )
+
+    endpoint.call_batch(FakeRequest(), {
+        'atomic': True, 'operations': operations,
+    })
+
+    assert log == expected
@@ -70,6 +70,28 @@ class ReadOnlyResource(RestResource):
         }
 
 
+class FullResource(RestResource):
+    name = 'full'
+
+    def rest_query(self, request, params, payload):
+        return []
+
+    def rest_get(self, request, params, payload):
+        return {}
+
+    def rest_create(self, request, params, payload):
+        return {}
+
+    def rest_update(self, request, params, payload):
+        return {}
+
+    def rest_delete(self, request, params, payload):
+        return {}
+
+    def rest_head(self, request, params, payload):
+        return None
+
+
 #####################
 #       Tests       #
 #####################
@@ -159,11 +181,11 @@ def test_returns_everything_if_the_handler_returns_full_result():
         assert result.data == _get.return_value[2]
 
 
-@patch.object(ReadOnlyResource, 'rest_head', Mock(
+@patch.object(FullResource, 'rest_head', Mock(
     side_effect=RuntimeError('Test handling exceptions in resource handlers')
 ))
 def test_returns_500_if_unhandled_exception_occurs_in_the_handler():
-    endpoint = FakeEndpoint(res_cls=ReadOnlyResource)
+    endpoint = FakeEndpoint(res_cls=FullResource)
 
     result = endpoint.call_rest_handler('HEAD', FakeRequest())
 
@@ -171,16 +193,16 @@ def test_returns_500_if_unhandled_exception_occurs_in_the_handler():
 
 
 def test_handler_is_called_with_request_as_first_argument():
-    endpoint = FakeEndpoint(res_cls=ReadOnlyResource)
+    endpoint = FakeEndpoint(res_cls=FullResource)
 
     rest_verb = 'rest_create'
     http_method = 'POST'
     pk = None
 
-    with patch.object(ReadOnlyResource, rest_verb) as _create:
+    with patch.object(FullResource, rest_verb) as _create:
         _create.return_value = {}
 
-        request = FakeRequest(data={}, rest_keys={'read_only_pk': pk})
+        request = FakeRequest(data={}, rest_keys={'full_pk': pk})
         endpoint.call_rest_handler(http_method, request)
 
         _create.assert_called_once()
@@ -195,17 +217,137 @@ def test_handler_is_called_with_request_as_first_argument():
     ('rest_delete', 'DELETE', 1234),
 ))
 def test_attaches_keys_to_the_request(rest_method, http_method, pk):
-    endpoint = FakeEndpoint(res_cls=ReadOnlyResource)
+    endpoint = FakeEndpoint(res_cls=FullResource)
 
-    with patch.object(ReadOnlyResource, rest_method) as _rest_method_fn:
+    with patch.object(FullResource, rest_method) as _rest_method_fn:
         _rest_method_fn.return_value = {}
 
-        request = FakeRequest(rest_keys={'read_only_pk': pk}, data={})
+        request = FakeRequest(rest_keys={'full_pk': pk}, data={})
 
         endpoint.call_rest_handler(http_method, request)
 
         _rest_method_fn.assert_called_once()
         req = _rest_method_fn.call_args[0][0]
         assert hasattr(req, 'rest_keys')
-        assert 'read_only_pk' in req.rest_keys
-        assert req.rest_keys['read_only_pk'] == pk
+        assert 'full_pk' in req.rest_keys
+        assert req.rest_keys['full_pk'] == pk
+
+
+@pytest.mark.parametrize('http_method,pk,allow', (
+    ('POST', None, 'GET'),
+    ('DELETE', 1234, 'GET'),
+    ('OPTIONS', 1234, 'GET'),
+))
+def test_405_response_has_allow_header(http_method, pk, allow):
+    endpoint = FakeEndpoint(res_cls=ReadOnlyResource)
+    request = FakeRequest(rest_keys={'read_only_pk': pk})
+
+    result = endpoint.call_rest_handler(http_method, request)
+
+    assert result.status == 405
+    assert result.headers == {'Allow': allow}
+
+
+def test_does_not_call_handlers_for_unsupported_verbs():
+    endpoint = FakeEndpoint(res_cls=ReadOnlyResource)
+    request = FakeRequest(rest_keys={'read_only_pk': 1234})
+
+    with patch.object(ReadOnlyResource, 'rest_delete') as p_rest_delete:
+        result = endpoint.call_rest_handler('DELETE', request)
+
+    assert result.status == 405
+    p_rest_delete.assert_not_called()
+
+
+def test_unsupported_method_does_not_touch_the_request():
+    endpoint = FakeEndpoint(res_cls=ReadOnlyResource)
+    request = FakeRequest(rest_keys={'read_only_pk': None})
+
+    with patch.object(FakeEndpoint, 'authorize') as p_authorize:
+        with patch.object(FakeEndpoint, 'extract_request_data') as p_data:
+            result = endpoint.call_rest_handler('POST', request)
+
+    assert result.status == 405
+    p_authorize.assert_not_called()
+    p_data.assert_not_called()
+
+
+def test_uses_ok_status_for_the_verb():
+    endpoint = FakeEndpoint(res_cls=FullResource)
+
+    created = endpoint.call_rest_handler('POST', FakeRequest())
+    deleted = endpoint.call_rest_handler(
+        'DELETE', FakeRequest(rest_keys={'full_pk': 1})
+    )
+
+    assert created.status == 201
+    assert deleted.status == 204
+
+
+def test_supports_custom_methods_in_determine_rest_verb():
+    class CustomEndpoint(FakeEndpoint):
+        @classmethod
+        def determine_rest_verb(cls, http_method, pk):
+            if http_method == 'PURGE':
+                return 'delete'
+            return super(CustomEndpoint, cls).determine_rest_verb(
+                http_method, pk
+            )
+
+    endpoint = CustomEndpoint(res_cls=FullResource)
+
+    result = endpoint.call_rest_handler(
+        'PURGE', FakeRequest(rest_keys={'full_pk': 1})
+    )
+
+    assert result.status == 204
+
+
+def test_does_not_store_unknown_methods_in_verb_table():
+    endpoint = FakeEndpoint(res_cls=FullResource)
+    table_size = len(endpoint._verb_table)
+
+    results = [
+        endpoint.call_rest_handler('X-METHOD-{}'.format(i), FakeRequest())
+        for i in range(10)
+    ]
+
+    assert {r.status for r in results} == {405}
+    assert len(endpoint._verb_table) == table_size
+
+
+def test_does_not_decode_payload_for_get_unless_accessed():
+    endpoint = FakeEndpoint(res_cls=FullResource)
+
+    with patch.object(FakeEndpoint, 'extract_request_data') as p_data:
+        with patch.object(FullResource, 'rest_get') as p_rest_get:
+            p_rest_get.return_value = {}
+            endpoint.call_rest_handler(
+                'GET', FakeRequest(rest_keys={'full_pk': 1})
+            )
+
+    p_rest_get.assert_called_once()
+    p_data.assert_not_called()
+
+
+def test_params_are_parsed_on_access():
+    endpoint = FakeEndpoint(res_cls=FullResource)
+    request = FakeRequest(query={'age': '18', 'name': 'John'})
+
+    with patch.object(FullResource, 'rest_query') as p_rest_query:
+        p_rest_query.return_value = []
+        endpoint.call_rest_handler('GET', request)
+
+    params = p_rest_query.call_args[0][1]
+    assert params == {'age': 18, 'name': 'John'}
+
+
+def test_decodes_payload_for_post():
+    endpoint = FakeEndpoint(res_cls=FullResource)
+    request = FakeRequest(payload={'name': 'John'})
+
+    with patch.object(FullResource, 'rest_create') as p_rest_create:
+        p_rest_create.return_value = {}
+        endpoint.call_rest_handler('POST', request)
+
+    assert p_rest_create.call_args[0][2] == {'name': 'John'}
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import RestEndpoint, RestResource
+
+
+class FakeRequest(object):
+    def __init__(self, pk=None, headers=None):
+        self.rest_keys = {'post_pk': pk} if pk else {}
+        self.headers = headers or {}
+        self.GET = {}
+
+
+class PostResource(RestResource):
+    name = 'post'
+
+    def rest_query(self, request, params, payload):
+        return [{'id': 1, 'title': 'a'}]
+
+    def rest_get(self, request, params, payload):
+        return {'id': 1, 'title': 'a'}
+
+    def rest_head(self, request, params, payload):
+        return self.rest_get(request, params, payload)
+
+    def rest_create(self, request, params, payload):
+        return {'id': 2}
+
+
+class FakeEndpoint(RestEndpoint):
+    res_cls = PostResource
+    use_etags = True
+
+    @classmethod
+    def extract_request_data(cls, request):
+        return None
+
+
+@pytest.mark.parametrize('method,pk', (
+    ('GET', None),
+    ('GET', '1'),
+    ('HEAD', '1'),
+))
+def test_adds_etag(method, pk):
+    result = FakeEndpoint().call_rest_handler(method, FakeRequest(pk))
+
+    assert result.status == 200
+    assert result.headers['ETag'].startswith('"')
+
+
+def test_etag_is_stable_for_equal_data():
+    endpoint = FakeEndpoint()
+
+    first = endpoint.call_rest_handler('GET', FakeRequest('1'))
+    second = endpoint.call_rest_handler('GET', FakeRequest('1'))
+    query = endpoint.call_rest_handler('GET', FakeRequest())
+
+    assert first.headers['ETag'] == second.headers['ETag']
+    assert first.headers['ETag'] != query.headers['ETag']
+
+
+@pytest.mark.parametrize('if_none_match', (
+    '{etag}',
+    'W/{etag}',
+    '"other", {etag}',
+    '*',
+))
+def test_returns_304_if_etag_matches(if_none_match):
+    endpoint = FakeEndpoint()
+    tag = endpoint.call_rest_handler('GET', FakeRequest('1')).headers['ETag']
+
+    result = endpoint.call_rest_handler('GET', FakeRequest('1', headers={
+        'if-none-match': if_none_match.format(etag=tag),
+    }))
+
+    assert result.status == 304
+    assert result.data is None
+    assert result.headers['ETag'] == tag
+
+
+def test_returns_200_if_etag_does_not_match():
+    result = FakeEndpoint().call_rest_handler('GET', FakeRequest('1', headers={
+        'if-none-match': '"stale"',
+    }))
+
+    assert result.status == 200
+    assert result.data == {'id': 1, 'title': 'a'}
+
+
+def test_does_not_tag_other_methods():
+    result = FakeEndpoint().call_rest_handler('POST', FakeRequest())
+
+    assert result.status == 201
+    assert 'ETag' not in result.headers
+
+
+def test_disabled_by_default():
+    class Endpoint(FakeEndpoint):
+        use_etags = False
+
+    result = Endpoint().call_rest_handler('GET', FakeRequest('1'))
+
+    assert 'ETag' not in result.headers
+
+
+def test_handler_etag_is_used_as_is():
+    class Resource(PostResource):
+        def rest_get(self, request, params, payload):
+            return 200, {'ETag': '"v1"'}, {'id': 1}
+
+    endpoint = FakeEndpoint(res_cls=Resource)
+
+    assert endpoint.call_rest_handler('GET', FakeRequest('1', headers={
+        'if-none-match': '"v1"',
+    })).status == 304
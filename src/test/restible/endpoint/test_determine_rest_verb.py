@@ -14,9 +14,9 @@ from restible import RestEndpoint
     ('POST', 1234, None),
     ('GET', None, 'query'),
     ('GET', 1234, 'get'),
-    ('PUT', None, None),
+    ('PUT', None, 'bulk_update'),
     ('PUT', 1234, 'update'),
-    ('DELETE', None, None),
+    ('DELETE', None, 'bulk_delete'),
     ('DELETE', 1234, 'delete'),
     ('HEAD', None, 'head'),
     ('HEAD', 1234, 'head'),
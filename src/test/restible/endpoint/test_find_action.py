@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+from mock import patch
+
+# Project imports
+from restible import RestEndpoint, RestResource, api_action
+
+
+class FakeEndpoint(RestEndpoint):
+    @classmethod
+    def extract_request_data(cls, request):
+        return getattr(request, 'payload', None)
+
+
+class FakeRequest(object):
+    def __init__(self, **kwargs):
+        self.rest_keys = kwargs.get('rest_keys', {})
+        self.GET = kwargs.pop('query', {})
+        self.payload = kwargs.pop('payload', None)
+
+
+class ActionsResource(RestResource):
+    name = 'actions'
+
+    @property
+    def broken(self):
+        raise RuntimeError("Properties should not be evaluated")
+
+    @api_action(generic=True, protected=False)
+    def publish(self, request, params, payload):
+        return {'generic': True}
+
+    @api_action(name='publish', protected=False, methods=['post', 'put'])
+    def publish_one(self, request, params, payload):
+        return {'generic': False}
+
+    @api_action(protected=False, methods=['get'])
+    def stats(self, request, params, payload):
+        return {'stats': params}
+
+
+@pytest.mark.parametrize('name,generic,method,attr_name', (
+    ('publish', True, 'post', 'publish'),
+    ('publish', False, 'post', 'publish_one'),
+    ('publish', False, 'PUT', 'publish_one'),
+    ('stats', False, 'get', 'stats'),
+))
+def test_finds_action_by_name_kind_and_method(name, generic, method, attr_name):
+    endpoint = FakeEndpoint(res_cls=ActionsResource)
+
+    action = endpoint.find_action(name, generic, method)
+
+    assert action == getattr(endpoint.resource, attr_name)
+
+
+@pytest.mark.parametrize('name,generic,method', (
+    ('publish', True, 'put'),
+    ('stats', False, 'post'),
+    ('stats', True, 'get'),
+    ('missing', False, 'post'),
+))
+def test_returns_None_if_there_is_no_matching_action(name, generic, method):
+    endpoint = FakeEndpoint(res_cls=ActionsResource)
+
+    assert endpoint.find_action(name, generic, method) is None
+
+
+def test_does_not_scan_resource_members_on_every_call():
+    endpoint = FakeEndpoint(res_cls=ActionsResource)
+
+    with patch('restible.resource.inspect.getmembers') as p_getmembers:
+        endpoint.find_action('publish', True, 'post')
+        endpoint.call_action_handler('POST', FakeRequest(), 'publish', True)
+
+    p_getmembers.assert_not_called()
+
+
+def test_call_action_handler_uses_the_index():
+    endpoint = FakeEndpoint(res_cls=ActionsResource)
+
+    generic = endpoint.call_action_handler('POST', FakeRequest(), 'publish', True)
+    detail = endpoint.call_action_handler('PUT', FakeRequest(), 'publish', False)
+    missing = endpoint.call_action_handler('GET', FakeRequest(), 'publish', True)
+
+    assert generic.status == 200
+    assert generic.data == {'generic': True}
+    assert detail.status == 200
+    assert detail.data == {'generic': False}
+    assert missing.status == 404
+
+
+def test_rest_actions_returns_bound_actions():
+    res = ActionsResource()
+
+    actions = res.rest_actions()
+
+    assert sorted(api_action.get_meta(a).action.__name__ for a in actions) == [
+        'publish', 'publish_one', 'stats'
+    ]
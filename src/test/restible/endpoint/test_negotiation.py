@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import RestEndpoint, RestResource, codec, exc
+
+
+class FakeRequest(object):
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+
+
+class FakeResource(RestResource):
+    name = 'fake'
+
+
+class FakeEndpoint(RestEndpoint):
+    res_cls = FakeResource
+
+
+def test_decodes_request_body_with_the_content_type_codec():
+    request = FakeRequest({'content-type': 'application/json; charset=utf-8'})
+
+    data = FakeEndpoint.decode_request_data(request, b'{"a": 1}')
+
+    assert data == {'a': 1}
+
+
+def test_request_without_content_type_is_decoded_as_json():
+    assert FakeEndpoint.decode_request_data(FakeRequest(), b'[1]') == [1]
+
+
+def test_empty_body_is_decoded_as_None():
+    assert FakeEndpoint.decode_request_data(FakeRequest(), b'') is None
+
+
+def test_unsupported_content_type_raises_UnsupportedMediaType():
+    request = FakeRequest({'content-type': 'image/png'})
+
+    with pytest.raises(exc.UnsupportedMediaType):
+        FakeEndpoint.decode_request_data(request, b'...')
+
+
+def test_invalid_body_raises_BadRequest():
+    with pytest.raises(exc.BadRequest):
+        FakeEndpoint.decode_request_data(FakeRequest(), b'{"a": ')
+
+
+def test_negotiates_response_codec():
+    endpoint = FakeEndpoint()
+
+    media_type, response_codec = endpoint.negotiate_response(
+        FakeRequest({'accept': 'text/html, application/json;q=0.9'})
+    )
+
+    assert media_type == 'application/json'
+    assert isinstance(response_codec, codec.JsonCodec)
+
+
+def test_raises_NotAcceptable_if_no_codec_matches():
+    endpoint = FakeEndpoint()
+
+    with pytest.raises(exc.NotAcceptable):
+        endpoint.negotiate_response(FakeRequest({'accept': 'text/html'}))
+
+
+def test_codecs_can_be_customized_per_endpoint():
+    class TextCodec(codec.Codec):
+        media_type = 'text/plain'
+
+        def loads(self, data):
+            return data.decode('utf-8')
+
+    class TextEndpoint(FakeEndpoint):
+        codecs = codec.CodecRegistry(default_type='text/plain')
+
+    TextEndpoint.codecs.register(TextCodec())
+
+    assert TextEndpoint.decode_request_data(FakeRequest(), b'abc') == 'abc'
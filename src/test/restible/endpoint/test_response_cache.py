@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+from mock import Mock
+
+# Project imports
+from restible import ModelResource, RestEndpoint, api_action
+from restible.cache import CachePolicy
+
+
+class FakeUser(object):
+    def __init__(self, pk):
+        self.pk = pk
+
+
+class FakeRequest(object):
+    def __init__(self, pk=None, query=None):
+        self.rest_keys = {'post_pk': pk} if pk else {}
+        self.headers = {}
+        self.GET = query or {}
+        self.user = None
+
+
+class PostResource(ModelResource):
+    name = 'post'
+    cache = CachePolicy(ttl=30, max_entries=100)
+    schema = {'type': 'object'}
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.loaded = Mock()
+
+    def get_item(self, request, params, payload):
+        self.loaded('item', request.rest_keys['post_pk'])
+        return {'id': request.rest_keys['post_pk']}
+
+    def query_items(self, request, params, payload):
+        self.loaded('collection', params)
+        return [{'id': 1}]
+
+    def create_item(self, request, params, payload):
+        return {'id': 2}
+
+    def update_item(self, request, params, payload):
+        return None if request.rest_keys['post_pk'] == '404' else {'id': 1}
+
+    def delete_item(self, request, params, payload):
+        pass
+
+    @api_action(protected=False)
+    def publish(self, request, params, payload):
+        return {}
+
+    @api_action(generic=True, protected=False)
+    def notify(self, request, params, payload):
+        return {}
+
+
+class PrivatePostResource(PostResource):
+    name = 'private_post'
+    cache = CachePolicy(vary_user=True)
+
+
+class FakeEndpoint(RestEndpoint):
+    res_cls = PostResource
+
+    def __init__(self, user=None):
+        super(FakeEndpoint, self).__init__()
+        self.user = user
+
+    def authorize(self, request):
+        return self.user
+
+    @classmethod
+    def extract_request_data(cls, request):
+        return {}
+
+
+@pytest.fixture
+def endpoint():
+    endpoint = FakeEndpoint()
+    endpoint.resource.invalidate_cache()
+    return endpoint
+
+
+def test_repeated_get_is_served_from_cache(endpoint):
+    first = endpoint.call_rest_handler('GET', FakeRequest('1'))
+    second = endpoint.call_rest_handler('GET', FakeRequest('1'))
+
+    assert first.data == second.data == {'id': '1'}
+    assert endpoint.resource.loaded.call_count == 1
+
+
+def test_items_are_cached_separately(endpoint):
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+    result = endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    assert result.data == {'id': '2'}
+    assert endpoint.resource.loaded.call_count == 2
+
+
+def test_query_key_includes_filters(endpoint):
+    endpoint.call_rest_handler('GET', FakeRequest(query={'title': 'a'}))
+    endpoint.call_rest_handler('GET', FakeRequest(query={'title': 'a'}))
+    endpoint.call_rest_handler('GET', FakeRequest(query={'title': 'b'}))
+
+    assert endpoint.resource.loaded.call_count == 2
+
+
+@pytest.mark.parametrize('method,pk', (
+    ('POST', None),
+    ('PUT', '1'),
+    ('DELETE', '1'),
+))
+def test_successful_write_invalidates_cache(endpoint, method, pk):
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+
+    result = endpoint.call_rest_handler(method, FakeRequest(pk))
+    assert result.status < 400
+
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+    assert endpoint.resource.loaded.call_count == 2
+
+
+def test_failed_write_does_not_invalidate_cache(endpoint):
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+
+    result = endpoint.call_rest_handler('PUT', FakeRequest('404'))
+    assert result.status == 404
+
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+    assert endpoint.resource.loaded.call_count == 1
+
+
+def test_non_generic_action_invalidates_cache(endpoint):
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+
+    endpoint.call_action_handler('POST', FakeRequest('1'), 'publish', False)
+
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+    assert endpoint.resource.loaded.call_count == 2
+
+
+def test_generic_action_does_not_invalidate_cache(endpoint):
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+
+    endpoint.call_action_handler('POST', FakeRequest(), 'notify', True)
+
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+    assert endpoint.resource.loaded.call_count == 1
+
+
+def test_cache_is_shared_between_instances(endpoint):
+    other = FakeEndpoint()
+    other.resource.loaded = endpoint.resource.loaded
+
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+    other.call_rest_handler('GET', FakeRequest('1'))
+
+    assert endpoint.resource.loaded.call_count == 1
+
+
+def test_can_vary_by_user():
+    alice = FakeEndpoint(user=FakeUser(1))
+    alice.resource = PrivatePostResource()
+    alice.resource.invalidate_cache()
+    bob = FakeEndpoint(user=FakeUser(2))
+    bob.resource = alice.resource
+
+    alice.call_rest_handler('GET', FakeRequest('1'))
+    alice.call_rest_handler('GET', FakeRequest('1'))
+    bob.call_rest_handler('GET', FakeRequest('1'))
+
+    assert alice.resource.loaded.call_count == 2
+
+
+def test_does_not_cache_without_policy():
+    resource = PostResource()
+    resource._response_cache = None
+
+    resource.rest_get(FakeRequest('1'), {}, None)
+    resource.rest_get(FakeRequest('1'), {}, None)
+
+    assert resource.loaded.call_count == 2
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import threading
+import time
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import RestEndpoint, RestResource
+from restible.singleflight import SingleFlight
+
+
+class FakeRequest(object):
+    def __init__(self, pk=None, query=None, user=None):
+        self.rest_keys = {'post_pk': pk} if pk else {}
+        self.headers = {}
+        self.GET = query or {}
+        self.auth_user = user
+
+
+class PostResource(RestResource):
+    name = 'post'
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.stream = False
+
+    def rest_get(self, request, params, payload):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.stream:
+            return iter([{'id': 1}])
+        return {'id': request.rest_keys['post_pk']}
+
+    def rest_update(self, request, params, payload):
+        return self.rest_get(request, params, payload)
+
+
+class FakeEndpoint(RestEndpoint):
+    res_cls = PostResource
+    single_flight = SingleFlight()
+
+    def authorize(self, request):
+        return request.auth_user
+
+    @classmethod
+    def extract_request_data(cls, request):
+        return {}
+
+
+def call_concurrently(endpoint, calls):
+    results = [None] * len(calls)
+
+    def request(i, method, req):
+        results[i] = endpoint.call_rest_handler(method, req)
+
+    threads = [
+        threading.Thread(target=request, args=(i, method, req))
+        for i, (method, req) in enumerate(calls)
+    ]
+    threads[0].start()
+    endpoint.resource.started.wait(5)
+
+    for thread in threads[1:]:
+        thread.start()
+
+    time.sleep(0.05)
+    endpoint.resource.release.set()
+
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+@pytest.fixture
+def endpoint():
+    return FakeEndpoint()
+
+
+def test_identical_reads_are_coalesced(endpoint):
+    results = call_concurrently(endpoint, [
+        ('GET', FakeRequest('1')) for _ in range(4)
+    ])
+
+    assert endpoint.resource.calls == 1
+    assert [r.data for r in results] == [{'id': '1'}] * 4
+    assert len(set(id(r.headers) for r in results)) == 4
+
+
+def test_different_params_are_not_coalesced(endpoint):
+    call_concurrently(endpoint, [
+        ('GET', FakeRequest('1', query={'_fields': 'id'})),
+        ('GET', FakeRequest('1', query={'_fields': 'title'})),
+    ])
+
+    assert endpoint.resource.calls == 2
+
+
+def test_equivalent_fields_are_coalesced(endpoint):
+    call_concurrently(endpoint, [
+        ('GET', FakeRequest('1', query={'_fields': 'id,title'})),
+        ('GET', FakeRequest('1', query={'_fields': 'title, id'})),
+    ])
+
+    assert endpoint.resource.calls == 1
+
+
+def test_different_users_are_not_coalesced(endpoint):
+    call_concurrently(endpoint, [
+        ('GET', FakeRequest('1', user='alice')),
+        ('GET', FakeRequest('1', user='bob')),
+    ])
+
+    assert endpoint.resource.calls == 2
+
+
+def test_writes_are_not_coalesced(endpoint):
+    call_concurrently(endpoint, [
+        ('PUT', FakeRequest('1')),
+        ('PUT', FakeRequest('1')),
+    ])
+
+    assert endpoint.resource.calls == 2
+
+
+def test_streams_are_not_shared(endpoint):
+    endpoint.resource.stream = True
+
+    results = call_concurrently(endpoint, [
+        ('GET', FakeRequest('1')),
+        ('GET', FakeRequest('1')),
+    ])
+
+    assert endpoint.resource.calls == 2
+    assert [list(r.data) for r in results] == [[{'id': 1}]] * 2
+
+
+def test_disabled_by_default():
+    assert RestEndpoint.single_flight is None
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import datetime
+
+# 3rd party imports
+import pytest
+from mock import Mock
+
+# Project imports
+from restible import ModelResource, RestEndpoint
+
+
+class FakeRequest(object):
+    def __init__(self, pk=None, headers=None):
+        self.rest_keys = {'post_pk': pk} if pk else {}
+        self.headers = headers or {}
+        self.GET = {}
+
+
+class PostResource(ModelResource):
+    name = 'post'
+    version = 7
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.loaded = Mock()
+
+    def get_item(self, request, params, payload):
+        self.loaded('item')
+        return {'id': 1}
+
+    def query_items(self, request, params, payload):
+        self.loaded('collection')
+        return [{'id': 1}]
+
+    def item_version(self, request, params):
+        return self.version
+
+    def collection_version(self, request, params):
+        return datetime.datetime(2019, 3, 4, 12, 30)
+
+
+class FakeEndpoint(RestEndpoint):
+    res_cls = PostResource
+
+    @classmethod
+    def extract_request_data(cls, request):
+        return None
+
+
+def test_adds_etag_from_item_version():
+    result = FakeEndpoint().call_rest_handler('GET', FakeRequest('1'))
+
+    assert result.status == 200
+    assert result.headers['ETag'] == '"7"'
+
+
+def test_returns_304_without_loading_the_item():
+    endpoint = FakeEndpoint()
+
+    result = endpoint.call_rest_handler('GET', FakeRequest('1', headers={
+        'if-none-match': '"7"',
+    }))
+
+    assert result.status == 304
+    assert result.headers == {'ETag': '"7"'}
+    endpoint.resource.loaded.assert_not_called()
+
+
+def test_loads_the_item_if_version_changed():
+    endpoint = FakeEndpoint()
+
+    result = endpoint.call_rest_handler('GET', FakeRequest('1', headers={
+        'if-none-match': '"6"',
+    }))
+
+    assert result.status == 200
+    endpoint.resource.loaded.assert_called_once_with('item')
+
+
+def test_adds_last_modified_from_collection_version():
+    result = FakeEndpoint().call_rest_handler('GET', FakeRequest())
+
+    assert result.status == 200
+    assert result.headers['Last-Modified'] == 'Mon, 04 Mar 2019 12:30:00 GMT'
+
+
+@pytest.mark.parametrize('if_modified_since,status', (
+    ('Mon, 04 Mar 2019 12:30:00 GMT', 304),
+    ('Tue, 05 Mar 2019 08:00:00 GMT', 304),
+    ('Mon, 04 Mar 2019 12:29:59 GMT', 200),
+    ('not a date', 200),
+))
+def test_if_modified_since(if_modified_since, status):
+    endpoint = FakeEndpoint()
+
+    result = endpoint.call_rest_handler('GET', FakeRequest(headers={
+        'if-modified-since': if_modified_since,
+    }))
+
+    assert result.status == status
+    assert endpoint.resource.loaded.called == (status == 200)
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    result = FakeEndpoint().call_rest_handler('GET', FakeRequest(headers={
+        'if-none-match': '"other"',
+        'if-modified-since': 'Tue, 05 Mar 2019 08:00:00 GMT',
+    }))
+
+    assert result.status == 200
+
+
+def test_none_version_is_ignored():
+    class Resource(PostResource):
+        version = None
+
+    endpoint = FakeEndpoint(res_cls=Resource)
+
+    result = endpoint.call_rest_handler('GET', FakeRequest('1', headers={
+        'if-none-match': '*',
+    }))
+
+    assert result.status == 200
+    assert 'ETag' not in result.headers
+
+
+def test_hooks_are_not_used_if_not_implemented():
+    class Resource(ModelResource):
+        name = 'post'
+
+        def get_item(self, request, params, payload):
+            return {'id': 1}
+
+    endpoint = FakeEndpoint(res_cls=Resource)
+
+    assert endpoint.version_hook('GET', True) is None
+    assert endpoint.call_rest_handler('GET', FakeRequest('1')).headers == {}
+
+
+def test_hooks_are_not_used_for_writes():
+    endpoint = FakeEndpoint()
+
+    assert endpoint.version_hook('PUT', True) is None
+    assert endpoint.version_hook('DELETE', True) is None
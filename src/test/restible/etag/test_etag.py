@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import datetime
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import etag
+
+
+def test_key_order_does_not_change_the_etag():
+    first = etag.compute({'a': 1, 'b': [1, 2], 'c': {'x': 1, 'y': 2}})
+    second = etag.compute({'c': {'y': 2, 'x': 1}, 'b': [1, 2], 'a': 1})
+
+    assert first == second
+
+
+def test_different_data_has_different_etag():
+    assert etag.compute({'a': 1}) != etag.compute({'a': 2})
+
+
+def test_supports_non_json_types():
+    assert etag.compute({'at': datetime.date(2019, 1, 1)})
+
+
+@pytest.mark.parametrize('header,expected', (
+    ('"a"', ['"a"']),
+    ('"a", W/"b"', ['"a"', '"b"']),
+    ('*', ['*']),
+    ('', []),
+))
+def test_parse_list(header, expected):
+    assert etag.parse_list(header) == expected
+
+
+@pytest.mark.parametrize('tag,header,expected', (
+    ('"a"', None, False),
+    ('"a"', '"a"', True),
+    ('"a"', 'W/"a"', True),
+    ('W/"a"', '"a"', True),
+    ('"a"', '"b", "c"', False),
+    ('"a"', '*', True),
+))
+def test_not_modified(tag, header, expected):
+    assert etag.not_modified(tag, header) is expected
+
+
+@pytest.mark.parametrize('version,expected', (
+    (None, {}),
+    (12, {'ETag': '"12"'}),
+    ('abc', {'ETag': '"abc"'}),
+    (
+        datetime.datetime(2019, 1, 2, 3, 4, 5),
+        {'Last-Modified': 'Wed, 02 Jan 2019 03:04:05 GMT'},
+    ),
+))
+def test_version_headers(version, expected):
+    assert etag.version_headers(version) == expected
+
+
+def test_parse_http_date():
+    assert etag.parse_http_date('Wed, 02 Jan 2019 03:04:05 GMT') == 1546398245
+    assert etag.parse_http_date('yesterday') is None
+
+
+@pytest.mark.parametrize('tag,expected', (
+    ('"abc"', 'W/"abc"'),
+    ('W/"abc"', 'W/"abc"'),
+))
+def test_weaken(tag, expected):
+    assert etag.weaken(tag) == expected
+
+
+def test_weaken_headers_only_changes_etag():
+    headers = etag.weaken_headers([('ETag', '"1"'), ('Vary', 'Accept')])
+
+    assert headers == [('ETag', 'W/"1"'), ('Vary', 'Accept')]
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+from mock import Mock
+
+# local imports
+from restible import ModelResource, RestEndpoint
+from restible.cache import CachePolicy
+
+
+class FakeRequest(object):
+    def __init__(self, pk=None):
+        self.rest_keys = {'post_pk': pk} if pk else {}
+        self.headers = {}
+        self.GET = {}
+
+
+class PostResource(ModelResource):
+    name = 'post'
+    read_only = ['created_at']
+    schema = {
+        "type": "object",
+        "properties": {
+            "title": {"type": "string"},
+            "created_at": {"type": "string"},
+        },
+        "required": ["title"],
+        "additionalProperties": False
+    }
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.db = {1: {'id': 1, 'title': 'first'}}
+
+    def create_item(self, request, params, payload):
+        item = dict(payload, id=len(self.db) + 1)
+        self.db[item['id']] = item
+        return item
+
+    def update_items(self, request, params, items):
+        updated = []
+        for pk, values in items:
+            item = self.db.get(pk)
+            if item is not None:
+                item.update(values)
+            updated.append(item)
+        return updated
+
+    def delete_items(self, request, params, pks):
+        for pk in pks:
+            self.db.pop(pk, None)
+
+
+class CachedPostResource(PostResource):
+    cache = CachePolicy()
+
+    def get_item(self, request, params, payload):
+        return self.db.get(int(self.get_pk(request)))
+
+
+class FakeEndpoint(RestEndpoint):
+    res_cls = PostResource
+
+    def __init__(self, payload):
+        super(FakeEndpoint, self).__init__()
+        self.payload = payload
+
+    def extract_request_data(self, request):
+        return self.payload
+
+
+class CachedEndpoint(FakeEndpoint):
+    res_cls = CachedPostResource
+
+
+def test_supports_bulk_verbs_only_if_implemented():
+    class CreateOnly(ModelResource):
+        name = 'create_only'
+
+        def create_item(self, request, params, payload):
+            pass
+
+    assert 'bulk_update' in PostResource.supported_verbs
+    assert 'bulk_delete' in PostResource.supported_verbs
+    assert 'bulk_update' not in CreateOnly.supported_verbs
+    assert 'bulk_delete' not in CreateOnly.supported_verbs
+
+
+def test_create_list_calls_create_items():
+    res = PostResource()
+    res.create_items = Mock(return_value=[{'id': 2}, {'id': 3}])
+
+    result = res.rest_create(None, {}, [{'title': 'a'}, {'title': 'b'}])
+
+    assert result == [{'id': 2}, {'id': 3}]
+    res.create_items.assert_called_once_with(
+        None, {}, [{'title': 'a'}, {'title': 'b'}]
+    )
+
+
+def test_create_items_defaults_to_create_item():
+    res = PostResource()
+
+    result = res.rest_create(None, {}, [{'title': 'a'}, {'title': 'b'}])
+
+    assert [x['title'] for x in result] == ['a', 'b']
+    assert len(res.db) == 3
+
+
+def test_create_reports_errors_per_item():
+    res = PostResource()
+    res.create_items = Mock()
+
+    status, data = res.rest_create(None, {}, [
+        {'title': 'valid'},
+        {'title': 1},
+        {'title': 'valid'},
+        {'missing': 'title'},
+    ])
+
+    assert status == 400
+    assert [x['index'] for x in data['errors']] == [1, 3]
+    res.create_items.assert_not_called()
+
+
+def test_update_passes_pks_and_strips_read_only_fields():
+    res = PostResource()
+    res.update_items = Mock(return_value=[{'id': 1}])
+
+    status, data = res.rest_bulk_update(None, {}, [
+        {'id': 1, 'title': 'new', 'created_at': 'now'},
+    ])
+
+    assert status == 200
+    assert data == [{'id': 1}]
+    res.update_items.assert_called_once_with(
+        None, {}, [(1, {'title': 'new'})]
+    )
+
+
+def test_update_requires_pk():
+    res = PostResource()
+
+    status, data = res.rest_bulk_update(None, {}, [
+        {'id': 1, 'title': 'new'},
+        {'title': 'new'},
+    ])
+
+    assert status == 400
+    assert [x['index'] for x in data['errors']] == [1]
+
+
+def test_update_reports_missing_items():
+    res = PostResource()
+
+    status, data = res.rest_bulk_update(None, {}, [
+        {'id': 5, 'title': 'new'},
+        {'id': 1, 'title': 'new'},
+    ])
+
+    assert status == 207
+    assert data['items'] == [None, {'id': 1, 'title': 'new'}]
+    assert data['errors'] == [{'index': 0, 'detail': 'Not Found'}]
+
+
+def test_update_returns_404_if_no_item_was_found():
+    res = PostResource()
+
+    status, data = res.rest_bulk_update(None, {}, [{'id': 5, 'title': 'new'}])
+
+    assert status == 404
+    assert data['errors'] == [{'index': 0, 'detail': 'Not Found'}]
+
+
+def test_partial_update_invalidates_cache():
+    endpoint = CachedEndpoint(None)
+    endpoint.resource.invalidate_cache()
+    endpoint.call_rest_handler('GET', FakeRequest('1'))
+
+    endpoint.payload = [{'id': 5, 'title': 'new'}, {'id': 1, 'title': 'new'}]
+    updated = endpoint.call_rest_handler('PUT', FakeRequest())
+    endpoint.payload = None
+    result = endpoint.call_rest_handler('GET', FakeRequest('1'))
+
+    assert updated.status == 207
+    assert result.data == {'id': 1, 'title': 'new'}
+
+
+def test_delete_requires_list_of_pks():
+    res = PostResource()
+
+    status, data = res.rest_bulk_delete(None, {}, {'id': 1})
+
+    assert status == 400
+    assert 'errors' not in data
+
+
+@pytest.mark.parametrize('method,payload,status', (
+    ('POST', [{'title': 'a'}, {'title': 'b'}], 201),
+    ('PUT', [{'id': 1, 'title': 'changed'}], 200),
+    ('DELETE', [1], 204),
+))
+def test_endpoint_routes_bulk_requests(method, payload, status):
+    endpoint = FakeEndpoint(payload)
+
+    result = endpoint.call_rest_handler(method, FakeRequest())
+
+    assert result.status == status
+    if method == 'PUT':
+        assert endpoint.resource.db[1]['title'] == 'changed'
+    elif method == 'DELETE':
+        assert endpoint.resource.db == {}
+    else:
+        assert len(endpoint.resource.db) == 3
+
+
+def test_endpoint_allows_bulk_methods_on_collection():
+    endpoint = FakeEndpoint(None)
+
+    assert set(endpoint.allowed_methods(False)) >= {'POST', 'PUT', 'DELETE'}
+
+
+class UniqueResource(CachedPostResource):
+    cache = CachePolicy(negative_ttl=60)
+    schema = {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "title": {"type": "string"},
+        },
+    }
+
+    def create_item(self, request, params, payload):
+        if payload['id'] in self.db:
+            raise ModelResource.AlreadyExists()
+        self.db[payload['id']] = payload
+        return payload
+
+
+class UniqueEndpoint(FakeEndpoint):
+    res_cls = UniqueResource
+
+
+def test_failed_bulk_create_invalidates_cache_for_created_items():
+    endpoint = UniqueEndpoint(None)
+    endpoint.resource.invalidate_cache()
+    missing = endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    endpoint.payload = [{'id': 2, 'title': 'new'}, {'id': 1, 'title': 'dup'}]
+    created = endpoint.call_rest_handler('POST', FakeRequest())
+    endpoint.payload = None
+    result = endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    assert missing.status == 404
+    assert created.status == 400
+    assert result.status == 200
+    assert result.data == {'id': 2, 'title': 'new'}
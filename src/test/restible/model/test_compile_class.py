@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+from mock import Mock, patch
+from serafin import Fieldspec
+
+# local imports
+from restible import ModelResource
+
+
+class FakeModel(object):
+    @property
+    def computed(self):
+        return 1
+
+
+class FakeRes(ModelResource):
+    name = 'fake_res'
+    model = FakeModel
+    read_only = ['id']
+    spec = 'id,name'
+    schema = {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "name": {"type": "string"},
+        },
+        "required": ["name"],
+    }
+
+
+def test_update_schema_has_no_required_fields():
+    assert 'required' not in FakeRes._update_schema
+    assert 'required' in FakeRes.schema
+    assert FakeRes._update_schema['properties'] == FakeRes.schema['properties']
+
+
+def test_read_only_fields_include_public_props():
+    assert FakeRes._read_only_fields == frozenset(['id', 'computed'])
+
+
+def test_base_spec_is_parsed_once():
+    assert isinstance(FakeRes._base_spec, Fieldspec)
+    assert 'name' in FakeRes._base_spec
+    assert 'other' not in FakeRes._base_spec
+
+
+def test_rest_handlers_do_not_parse_the_base_spec():
+    res = FakeRes()
+    res.get_item = Mock(return_value={'id': 1, 'name': 'John'})
+
+    with patch('restible.model.Fieldspec') as p_fieldspec:
+        result = res.rest_get(None, {}, {})
+
+    p_fieldspec.assert_not_called()
+    assert result == (200, {'id': 1, 'name': 'John'})
+
+
+def test_restricting_fields_does_not_modify_the_base_spec():
+    res = FakeRes()
+    res.get_item = Mock(return_value={'id': 1, 'name': 'John'})
+
+    assert res.rest_get(None, {'_fields': 'id'}, {}) == (200, {'id': 1})
+    assert res.rest_get(None, {}, {}) == (200, {'id': 1, 'name': 'John'})
+
+
+def test_is_compiled_separately_for_each_subclass():
+    class SubRes(FakeRes):
+        name = 'sub_res'
+        read_only = ['name']
+
+    assert SubRes._read_only_fields == frozenset(['name', 'computed'])
+    assert FakeRes._read_only_fields == frozenset(['id', 'computed'])
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+from serafin import Fieldspec
+
+# Project imports
+from restible import ModelResource
+
+
+class FakeRequest(object):
+    def __init__(self, pk=None):
+        self.rest_keys = {'post_pk': pk} if pk else {}
+
+
+class PostResource(ModelResource):
+    name = 'post'
+    spec = Fieldspec('id,title,body')
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.requested = []
+
+    def query_items(self, request, params, payload, fields=None):
+        self.requested.append(fields)
+        return [{'id': 1, 'title': 'a', 'body': 'long'}]
+
+    def get_item(self, request, params, payload, fields=None):
+        self.requested.append(fields)
+        return {'id': 1, 'title': 'a', 'body': 'long'}
+
+
+class PagedResource(PostResource):
+    name = 'paged_post'
+    sort_key = 'id'
+
+    def query_page(self, request, params, payload, page, fields=None):
+        return self.query_items(request, params, payload, fields=fields)
+
+
+class LegacyResource(ModelResource):
+    name = 'legacy_post'
+
+    def query_items(self, request, params, payload):
+        return [{'id': 1}]
+
+    def get_item(self, request, params, payload):
+        return {'id': 1}
+
+
+def test_passes_requested_fields_to_query_items():
+    resource = PostResource()
+
+    status, data = resource.rest_query(FakeRequest(), {'_fields': 'id'}, None)
+
+    assert data == [{'id': 1}]
+    assert 'id' in resource.requested[0]
+    assert 'body' not in resource.requested[0]
+
+
+def test_passes_requested_fields_to_get_item():
+    resource = PostResource()
+
+    resource.rest_get(FakeRequest('1'), {'_fields': 'title'}, None)
+
+    assert 'title' in resource.requested[0]
+    assert 'body' not in resource.requested[0]
+
+
+def test_passes_full_spec_if_no_fields_requested():
+    resource = PostResource()
+
+    resource.rest_get(FakeRequest('1'), {}, None)
+
+    assert resource.requested == [resource._base_spec]
+
+
+def test_passes_requested_fields_to_query_page():
+    resource = PagedResource()
+
+    resource.rest_query(FakeRequest(), {'_fields': 'id'}, None)
+
+    assert 'body' not in resource.requested[0]
+
+
+def test_hooks_without_fields_argument_are_called_as_before():
+    resource = LegacyResource()
+
+    assert resource.rest_query(FakeRequest(), {'_fields': 'id'}, None) == (
+        200, [{'id': 1}]
+    )
+    assert resource.rest_get(FakeRequest('1'), {}, None) == (200, {'id': 1})
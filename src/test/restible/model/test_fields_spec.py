@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+from serafin import Fieldspec
+
+# Project imports
+from restible import ModelResource
+from restible import model
+
+
+class PostResource(ModelResource):
+    name = 'post'
+    spec = Fieldspec('id,title,author(id,name)')
+
+
+class UserResource(ModelResource):
+    name = 'user'
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    model.fieldspec_cache.clear()
+    model.fieldspec_cache.hits = model.fieldspec_cache.misses = 0
+
+
+def test_restricts_the_resource_spec():
+    spec = PostResource()._fields_spec('author(name),title')
+
+    data = PostResource().serialize(
+        {'id': 1, 'title': 'a', 'author': {'id': 2, 'name': 'b'}}, spec
+    )
+
+    assert data == {'title': 'a', 'author': {'name': 'b'}}
+
+
+def test_reuses_parsed_specs():
+    resource = PostResource()
+
+    first = resource._fields_spec('id,title')
+    second = resource._fields_spec('title, id')
+
+    assert first is second
+    assert model.fieldspec_cache.hits == 1
+    assert model.fieldspec_cache.misses == 1
+
+
+def test_specs_are_cached_per_resource_class():
+    post_spec = PostResource()._fields_spec('id')
+    user_spec = UserResource()._fields_spec('id')
+
+    assert post_spec is not user_spec
+    assert len(model.fieldspec_cache) == 2
+
+
+def test_does_not_cache_all_fields():
+    resource = PostResource()
+
+    assert resource._fields_spec('*') is resource._base_spec
+    assert len(model.fieldspec_cache) == 0
+
+
+def test_does_not_cache_invalid_specs():
+    with pytest.raises(ValueError):
+        PostResource()._fields_spec('id(')
+
+    assert len(model.fieldspec_cache) == 0
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+from mock import patch
+
+# Project imports
+from restible import ModelResource, RestEndpoint
+from restible.cache import CachePolicy
+
+
+class FakeRequest(object):
+    def __init__(self, pk=None):
+        self.rest_keys = {'post_pk': pk} if pk else {}
+        self.headers = {}
+        self.GET = {}
+
+
+class PostResource(ModelResource):
+    name = 'post'
+    cache = CachePolicy(ttl=30, negative_ttl=60)
+    schema = {'type': 'object'}
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.db = {'1': {'id': '1'}}
+        self.queries = 0
+
+    def get_item(self, request, params, payload):
+        self.queries += 1
+        return self.db.get(self.get_pk(request))
+
+    def create_item(self, request, params, payload):
+        self.db['2'] = {'id': '2'}
+        return self.db['2']
+
+    def delete_item(self, request, params, payload):
+        self.db.pop(self.get_pk(request), None)
+
+
+class KnownPksResource(PostResource):
+    cache = CachePolicy(ttl=30)
+
+    def __init__(self):
+        super(KnownPksResource, self).__init__()
+        self.pk_loads = 0
+
+    def known_pks(self):
+        self.pk_loads += 1
+        return list(self.db)
+
+
+class FakeEndpoint(RestEndpoint):
+    res_cls = PostResource
+
+    @classmethod
+    def extract_request_data(cls, request):
+        return {}
+
+
+def make_endpoint(res_cls):
+    endpoint = FakeEndpoint(res_cls=res_cls)
+    endpoint.resource.invalidate_cache()
+    return endpoint
+
+
+@pytest.fixture
+def endpoint():
+    return make_endpoint(PostResource)
+
+
+def test_repeated_404_does_not_query_the_backend(endpoint):
+    results = [
+        endpoint.call_rest_handler('GET', FakeRequest('2')) for _ in range(3)
+    ]
+
+    assert [r.status for r in results] == [404, 404, 404]
+    assert endpoint.resource.queries == 1
+
+
+def test_create_invalidates_missing_items(endpoint):
+    endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    endpoint.call_rest_handler('POST', FakeRequest())
+    result = endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    assert result.status == 200
+    assert result.data == {'id': '2'}
+
+
+def test_delete_keeps_missing_items(endpoint):
+    endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    endpoint.call_rest_handler('DELETE', FakeRequest('1'))
+    endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    assert endpoint.resource.queries == 1
+
+
+def test_disabled_without_negative_ttl():
+    endpoint = make_endpoint(KnownPksResource)
+    endpoint.resource.known_pks = lambda: ['1', '2']
+
+    endpoint.call_rest_handler('GET', FakeRequest('2'))
+    endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    assert endpoint.resource.queries == 2
+
+
+def test_unknown_pks_are_rejected_without_querying():
+    endpoint = make_endpoint(KnownPksResource)
+
+    result = endpoint.call_rest_handler('GET', FakeRequest('2'))
+    endpoint.call_rest_handler('GET', FakeRequest('3'))
+
+    assert result.status == 404
+    assert endpoint.resource.queries == 0
+    assert endpoint.resource.pk_loads == 1
+
+
+def test_known_pks_are_reloaded_after_create():
+    endpoint = make_endpoint(KnownPksResource)
+    endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    endpoint.call_rest_handler('POST', FakeRequest())
+    result = endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    assert result.status == 200
+    assert endpoint.resource.pk_loads == 2
+
+
+@patch('restible.cache.now')
+def test_known_pks_expire_after_ttl(p_now):
+    endpoint = make_endpoint(KnownPksResource)
+    p_now.return_value = 100
+    endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    # Created without invalidating the cache, ie. by another process.
+    endpoint.resource.db['2'] = {'id': '2'}
+    p_now.return_value = 129
+    cached = endpoint.call_rest_handler('GET', FakeRequest('2'))
+    p_now.return_value = 130
+    reloaded = endpoint.call_rest_handler('GET', FakeRequest('2'))
+
+    assert cached.status == 404
+    assert reloaded.status == 200
+    assert endpoint.resource.pk_loads == 2
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import re
+
+# 3rd party imports
+from mock import Mock
+
+# Project imports
+from restible import ModelResource, RestEndpoint
+from restible.cache import CachePolicy
+from restible.pagination import encode_cursor
+from restible.url_params import parse
+
+
+class FakeRequest(object):
+    def __init__(self, query=None):
+        self.rest_keys = {}
+        self.headers = {}
+        self.GET = query or {}
+        self.user = None
+
+
+class PostResource(ModelResource):
+    name = 'post'
+    sort_key = 'id'
+    page_size = 2
+    max_page_size = 3
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.db = [{'id': i, 'author': i % 2} for i in range(7, 0, -1)]
+
+    def query_items(self, request, params, payload):
+        return [x for x in self.db if x['author'] == params.get('author', 1)]
+
+
+class SeekingResource(PostResource):
+    name = 'seeking_post'
+
+    def query_page(self, request, params, payload, page):
+        after = page.after[0] if page.after else 0
+        items = sorted(self.db, key=lambda x: x['id'])
+        return [x for x in items if x['id'] > after][:page.limit + 1]
+
+
+class CachedResource(PostResource):
+    name = 'cached_post'
+    cache = CachePolicy()
+
+
+class FakeEndpoint(RestEndpoint):
+    res_cls = PostResource
+
+    @classmethod
+    def extract_request_data(cls, request):
+        return {}
+
+
+def next_query(result):
+    match = re.match(r'<\?(.*)>; rel="next"', result.headers['Link'])
+    return dict(x.split('=') for x in match.group(1).split('&'))
+
+
+def test_returns_first_page_with_link_to_the_next_one():
+    endpoint = FakeEndpoint()
+
+    result = endpoint.call_rest_handler('GET', FakeRequest())
+
+    assert result.status == 200
+    assert result.data == [{'id': 1, 'author': 1}, {'id': 3, 'author': 1}]
+    assert next_query(result)['_limit'] == '2'
+
+
+def test_walks_all_pages_keeping_filters():
+    endpoint = FakeEndpoint()
+    query = {'author': '0'}
+    seen = []
+
+    while True:
+        result = endpoint.call_rest_handler('GET', FakeRequest(query))
+        seen.extend(x['id'] for x in result.data)
+        if 'Link' not in result.headers:
+            break
+        query = next_query(result)
+
+    assert seen == [2, 4, 6]
+    assert query['author'] == '0'
+
+
+def test_caps_page_size():
+    endpoint = FakeEndpoint()
+
+    result = endpoint.call_rest_handler('GET', FakeRequest({'_limit': '10'}))
+
+    assert len(result.data) == 3
+
+
+def test_returns_400_for_invalid_cursor():
+    endpoint = FakeEndpoint()
+
+    result = endpoint.call_rest_handler(
+        'GET', FakeRequest({'_cursor': 'invalid'})
+    )
+
+    assert result.status == 400
+
+
+def test_returns_400_for_cursor_of_different_type():
+    endpoint = FakeEndpoint()
+
+    result = endpoint.call_rest_handler(
+        'GET', FakeRequest({'_cursor': encode_cursor(['abc'])})
+    )
+
+    assert result.status == 400
+
+
+def test_uses_query_page_if_implemented():
+    resource = SeekingResource()
+    resource.query_items = Mock()
+    params = parse({'_limit': '3'})
+
+    status, headers, data = resource.rest_query(None, params, None)
+    status, headers, data = resource.rest_query(
+        None, parse(next_query(Mock(headers=headers))), None
+    )
+
+    assert status == 200
+    assert [x['id'] for x in data] == [4, 5, 6]
+    assert 'Link' in headers
+    resource.query_items.assert_not_called()
+
+
+def test_cached_pages_keep_the_link_header():
+    endpoint = FakeEndpoint(res_cls=CachedResource)
+    endpoint.resource.invalidate_cache()
+
+    first = endpoint.call_rest_handler('GET', FakeRequest())
+    second = endpoint.call_rest_handler('GET', FakeRequest())
+
+    assert 'Age' in second.headers
+    assert second.headers['Link'] == first.headers['Link']
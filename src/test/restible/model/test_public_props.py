@@ -27,10 +27,14 @@ class FakeRes(ModelResource):
 @patch('restible.model.iter_public_props')
 def test_iter_public_props_called_only_once(p_iter_public_props):
     # type: (Mock) -> None
-    res = FakeRes()
+    class OtherFakeRes(ModelResource):
+        name = 'other_fake_res'
+        model = FakeModel
+
+    p_iter_public_props.assert_called_once()
 
-    _ = res.public_props
-    _ = res.public_props
+    _ = OtherFakeRes().public_props
+    _ = OtherFakeRes().public_props
 
     p_iter_public_props.assert_called_once()
 
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+from mock import Mock
+
+# Project imports
+from restible import ModelResource, RestEndpoint
+
+
+class FakeRequest(object):
+    def __init__(self, pk=None, query=None):
+        self.rest_keys = {'post_pk': pk} if pk else {}
+        self.headers = {}
+        self.GET = query or {}
+        self.user = None
+
+
+class PostResource(ModelResource):
+    name = 'post'
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.db = {1: {'id': 1, 'author': 1}, 2: {'id': 2, 'author': 2}}
+        self.serialize = Mock(side_effect=self.serialize)
+
+    def query_items(self, request, params, payload):
+        return [
+            x for x in self.db.values()
+            if 'author' not in params or x['author'] == params['author']
+        ]
+
+    def get_item(self, request, params, payload):
+        return self.db.get(int(self.get_pk(request)))
+
+    def collection_version(self, request, params):
+        return 7
+
+
+class CountingResource(PostResource):
+    name = 'counting_post'
+
+    def count_items(self, request, params, payload):
+        return 1000
+
+    def item_exists(self, request, params, payload):
+        return True
+
+
+class FakeEndpoint(RestEndpoint):
+    res_cls = PostResource
+
+    @classmethod
+    def extract_request_data(cls, request):
+        return {}
+
+
+def test_head_returns_collection_count_without_serializing():
+    endpoint = FakeEndpoint()
+
+    result = endpoint.call_rest_handler('HEAD', FakeRequest())
+
+    assert result.status == 200
+    assert result.data is None
+    assert result.headers['X-Total-Count'] == '2'
+    assert 'ETag' in result.headers
+    endpoint.resource.serialize.assert_not_called()
+
+
+def test_head_count_ignores_non_filter_params():
+    endpoint = FakeEndpoint()
+
+    result = endpoint.call_rest_handler('HEAD', FakeRequest(query={
+        'author': '1', '_fields': 'id', '_limit': '1', '_count': '1',
+    }))
+
+    assert result.headers['X-Total-Count'] == '1'
+
+
+def test_head_checks_if_item_exists():
+    endpoint = FakeEndpoint()
+
+    found = endpoint.call_rest_handler('HEAD', FakeRequest('1'))
+    missing = endpoint.call_rest_handler('HEAD', FakeRequest('3'))
+
+    assert found.status == 200
+    assert missing.status == 404
+    assert found.data is None
+    endpoint.resource.serialize.assert_not_called()
+
+
+def test_head_uses_hooks_if_implemented():
+    endpoint = FakeEndpoint(res_cls=CountingResource)
+    endpoint.resource.query_items = Mock()
+    endpoint.resource.get_item = Mock()
+
+    collection = endpoint.call_rest_handler('HEAD', FakeRequest())
+    item = endpoint.call_rest_handler('HEAD', FakeRequest('5'))
+
+    assert collection.headers['X-Total-Count'] == '1000'
+    assert item.status == 200
+    endpoint.resource.query_items.assert_not_called()
+    endpoint.resource.get_item.assert_not_called()
+
+
+def test_get_with_count_returns_only_the_count():
+    endpoint = FakeEndpoint()
+
+    result = endpoint.call_rest_handler(
+        'GET', FakeRequest(query={'_count': '1', 'author': '2'})
+    )
+
+    assert result.status == 200
+    assert result.data == {'count': 1}
+    assert result.headers['X-Total-Count'] == '1'
+    endpoint.resource.serialize.assert_not_called()
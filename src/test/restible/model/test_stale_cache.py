@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+from mock import patch
+
+# Project imports
+from restible import ModelResource
+from restible.cache import CachePolicy
+
+
+class FakeRequest(object):
+    def __init__(self, pk='1'):
+        self.rest_keys = {'post_pk': pk}
+
+
+class PostResource(ModelResource):
+    name = 'post'
+    cache = CachePolicy(ttl=10, stale_while_revalidate=20, stale_if_error=60)
+
+    def __init__(self):
+        super(PostResource, self).__init__()
+        self.version = 1
+        self.error = None
+        self.refreshes = []
+
+    def get_item(self, request, params, payload):
+        if self.error is not None:
+            raise self.error
+        return {'id': 1, 'version': self.version}
+
+    def revalidate_in_background(self, refresh):
+        self.refreshes.append(refresh)
+
+
+@pytest.fixture
+def resource():
+    resource = PostResource()
+    resource.invalidate_cache()
+    return resource
+
+
+def get_at(resource, timestamp):
+    with patch('restible.cache.time.time', return_value=timestamp):
+        return resource.rest_get(FakeRequest(), {}, None)
+
+
+def test_adds_cache_headers(resource):
+    status, headers, data = get_at(resource, 1000)
+    assert headers == {
+        'Cache-Control':
+            'max-age=10, stale-while-revalidate=20, stale-if-error=60',
+    }
+
+    status, headers, data = get_at(resource, 1004)
+    assert status == 200
+    assert headers['Age'] == '4'
+    assert data == {'id': 1, 'version': 1}
+
+
+def test_serves_stale_data_while_revalidating(resource):
+    get_at(resource, 1000)
+    resource.version = 2
+
+    _, headers, data = get_at(resource, 1015)
+
+    assert data == {'id': 1, 'version': 1}
+    assert headers['Age'] == '15'
+    assert len(resource.refreshes) == 1
+
+    with patch('restible.cache.time.time', return_value=1016):
+        resource.refreshes[0]()
+
+    _, headers, data = get_at(resource, 1017)
+    assert data == {'id': 1, 'version': 2}
+    assert headers['Age'] == '1'
+
+
+def test_refreshes_each_entry_once(resource):
+    get_at(resource, 1000)
+
+    get_at(resource, 1015)
+    get_at(resource, 1016)
+
+    assert len(resource.refreshes) == 1
+
+
+def test_loads_synchronously_after_revalidate_window(resource):
+    get_at(resource, 1000)
+    resource.version = 2
+
+    _, _, data = get_at(resource, 1031)
+
+    assert data == {'id': 1, 'version': 2}
+    assert resource.refreshes == []
+
+
+def test_serves_stale_data_on_error(resource):
+    get_at(resource, 1000)
+    resource.error = RuntimeError("DB connection lost")
+
+    status, headers, data = get_at(resource, 1050)
+
+    assert status == 200
+    assert data == {'id': 1, 'version': 1}
+    assert headers['Age'] == '50'
+
+
+def test_raises_after_stale_if_error_window(resource):
+    get_at(resource, 1000)
+    resource.error = RuntimeError("DB connection lost")
+
+    with pytest.raises(RuntimeError):
+        get_at(resource, 1071)
+
+
+def test_failed_refresh_keeps_stale_entry(resource):
+    get_at(resource, 1000)
+    get_at(resource, 1015)
+    resource.error = RuntimeError("DB connection lost")
+
+    resource.refreshes[0]()
+
+    _, _, data = get_at(resource, 1020)
+    assert data == {'id': 1, 'version': 1}
+    assert len(resource.refreshes) == 2
+
+
+def test_private_cache_control_if_varied_by_user():
+    policy = CachePolicy(ttl=5, vary_user=True)
+
+    assert policy.cache_control == 'private, max-age=5'
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import datetime
+import uuid
+from decimal import Decimal
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import exc, pagination
+
+
+def test_cursor_roundtrip():
+    cursor = pagination.encode_cursor(('2019-03-04', 15))
+
+    assert '=' not in cursor
+    assert pagination.decode_cursor(cursor) == ('2019-03-04', 15)
+
+
+@pytest.mark.parametrize('cursor', ['not a cursor', 'e30', 15])
+def test_rejects_invalid_cursors(cursor):
+    with pytest.raises(exc.BadRequest):
+        pagination.decode_cursor(cursor)
+
+
+def test_from_params_pops_pagination_params():
+    params = {'_limit': 10, '_cursor': pagination.encode_cursor([3]), 'a': 1}
+
+    page = pagination.from_params(params, ('id',), 50, 100)
+
+    assert page == pagination.Page(('id',), 10, (3,))
+    assert params == {'a': 1}
+
+
+def test_from_params_uses_default_page_size():
+    page = pagination.from_params({}, ('id',), 50, 100)
+
+    assert page.limit == 50
+    assert page.after is None
+
+
+def test_from_params_caps_page_size():
+    page = pagination.from_params({'_limit': 1000}, ('id',), 50, 100)
+
+    assert page.limit == 100
+
+
+@pytest.mark.parametrize('params', [
+    {'_limit': 0},
+    {'_limit': 'all'},
+    {'_cursor': pagination.encode_cursor([1, 2])},
+])
+def test_from_params_rejects_invalid_params(params):
+    with pytest.raises(exc.BadRequest):
+        pagination.from_params(params, ('id',), 50, 100)
+
+
+def test_apply_selects_items_after_cursor():
+    items = [{'id': i} for i in (5, 3, 1, 4, 2)]
+    page = pagination.Page(('id',), 2, (2,))
+
+    assert page.apply(items) == [{'id': 3}, {'id': 4}, {'id': 5}]
+
+
+def test_apply_supports_uuid_and_decimal_sort_keys():
+    items = [
+        {'price': Decimal(p), 'id': uuid.UUID(int=i)}
+        for i, p in enumerate(('10.5', '9', '10.5', '2.25'))
+    ]
+    page = pagination.Page(('price', 'id'), 1)
+
+    first, cursor = page.split(page.apply(items))
+    page = pagination.Page(('price', 'id'), 2, pagination.decode_cursor(cursor))
+    rest = page.apply(items)
+
+    assert first == [items[3]]
+    assert rest == [items[1], items[0], items[2]]
+
+
+def test_apply_rejects_cursor_of_different_type():
+    page = pagination.Page(('id',), 2, ('abc',))
+
+    with pytest.raises(exc.BadRequest):
+        page.apply([{'id': 1}, {'id': 2}])
+
+
+def test_split_returns_cursor_of_the_last_item():
+    page = pagination.Page(('day', 'id'), 2)
+    items = [
+        {'day': datetime.date(2019, 3, i), 'id': i} for i in range(1, 4)
+    ]
+
+    page_items, cursor = page.split(items)
+
+    assert page_items == items[:2]
+    assert pagination.decode_cursor(cursor) == ('2019-03-02', 2)
+
+
+def test_encode_cursor_supports_uuid_and_decimal():
+    cursor = pagination.encode_cursor((uuid.UUID(int=1), Decimal('1.5')))
+
+    values = pagination.decode_cursor(cursor)
+
+    assert values == (str(uuid.UUID(int=1)), Decimal('1.5'))
+    assert isinstance(values[1], Decimal)
+
+
+def test_decimal_cursor_keeps_precision():
+    prices = ['1.00000000000000000001', '1.00000000000000000002', '1']
+    items = [{'price': Decimal(p)} for p in prices]
+    page = pagination.Page(('price',), 1)
+    seen = []
+
+    while True:
+        page_items, cursor = page.split(page.apply(items))
+        seen.extend(str(x['price']) for x in page_items)
+        if cursor is None:
+            break
+        page = pagination.Page(
+            ('price',), 1, pagination.decode_cursor(cursor)
+        )
+
+    assert seen == ['1', prices[0], prices[1]]
+
+
+def test_none_values_are_sorted_last():
+    items = [{'day': d, 'id': i} for i, d in enumerate((None, 2, None, 1))]
+    page = pagination.Page(('day', 'id'), 2)
+
+    first, cursor = page.split(page.apply(items))
+    page = pagination.Page(('day', 'id'), 2, pagination.decode_cursor(cursor))
+
+    assert [x['id'] for x in first] == [3, 1]
+    assert [x['id'] for x in page.apply(items)] == [0, 2]
+
+
+def test_rejects_invalid_decimal_in_cursor():
+    with pytest.raises(exc.BadRequest):
+        pagination.decode_cursor('W3siZGVjaW1hbCI6IngifV0')   # [{"decimal":"x"}]
+
+
+def test_split_returns_no_cursor_on_last_page():
+    page = pagination.Page(('id',), 2)
+
+    assert page.split([{'id': 1}, {'id': 2}]) == ([{'id': 1}, {'id': 2}], None)
+
+
+def test_next_link_keeps_filters():
+    link = pagination.next_link(
+        {'title': 'a b', '_cursor': 'old', '_limit': 5}, 'new', 10
+    )
+
+    assert link == '<?_cursor=new&_limit=10&title=a+b>; rel="next"'
@@ -19,3 +19,8 @@ def test_coerces_to_the_right_type(value, expected_type):
     result = from_string(value)
 
     assert isinstance(result, expected_type)
+
+
+@pytest.mark.parametrize('value', (3, 1.5, True, None, [1]))
+def test_returns_non_string_values_as_is(value):
+    assert from_string(value) is value
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+from mock import Mock, patch
+
+# local imports
+from restible import url_params
+
+
+def test_does_not_load_the_query_string_until_accessed():
+    loader = Mock(return_value={'age': '18'})
+
+    params = url_params.LazyParams(loader)
+    loader.assert_not_called()
+
+    assert params['age'] == 18
+    assert params.get('name') is None
+    loader.assert_called_once()
+
+
+def test_converts_only_the_accessed_values():
+    params = url_params.LazyParams(lambda: {'a': '1', 'b': '2', 'c': '3'})
+
+    wrapped = Mock(wraps=url_params.from_string)
+
+    with patch('restible.url_params.from_string', wrapped) as p_from_string:
+        assert params['a'] == 1
+        assert params['a'] == 1
+
+    p_from_string.assert_called_once_with('1')
+
+
+def test_behaves_like_parse_result():
+    qs = {'name': 'John', 'age': '18', 'weight': '72.5', 'born': '2000-01-01'}
+
+    params = url_params.LazyParams(lambda: qs)
+
+    assert params == url_params.parse(qs)
+    assert len(params) == 4
+    assert sorted(params) == ['age', 'born', 'name', 'weight']
+
+
+def test_can_be_modified():
+    params = url_params.LazyParams(lambda: {'_fields': 'id', 'age': '18'})
+
+    assert params.pop('_fields', '*') == 'id'
+    params['name'] = 'John'
+    del params['age']
+
+    assert dict(params) == {'name': 'John'}
+    assert 'age' not in params
+
+    with pytest.raises(KeyError):
+        del params['age']
+
+
+def test_copy_returns_a_dict():
+    params = url_params.LazyParams(lambda: {'age': '18'})
+
+    assert params.copy() == {'age': 18}
+    assert type(params.copy()) is dict
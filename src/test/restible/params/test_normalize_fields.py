@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+
+# project imports
+from restible import url_params
+from restible.url_params import canonical_params, normalize_fields
+
+
+@pytest.mark.parametrize('fields,expected', (
+    ('title,id', 'id,title'),
+    (' id , title,id', 'id,title'),
+    ('author(name,id),id', 'author(id,name),id'),
+    ('a(b(d,c)),e', 'a(b(c,d)),e'),
+    ('*,-title', '*,-title'),
+    ('a(x),a(y)', 'a(x),a(y)'),
+))
+def test_normalizes_fields(fields, expected):
+    assert normalize_fields(fields) == expected
+
+
+def test_memoizes_results_up_to_the_limit(monkeypatch):
+    monkeypatch.setattr(url_params, 'NORMALIZED_FIELDS_MAX', 2)
+    url_params._normalized_fields.clear()
+
+    normalize_fields('b,a')
+    normalize_fields('b,a')
+    normalize_fields('c,a')
+    assert url_params._normalized_fields == {'b,a': 'a,b', 'c,a': 'a,c'}
+
+    assert normalize_fields('d,a') == 'a,d'
+    assert url_params._normalized_fields == {'d,a': 'a,d'}
+
+
+def test_canonical_params_normalizes_only_fields():
+    params = {'_fields': 'title, id', 'title': 'b, a'}
+
+    assert canonical_params(params) == {'_fields': 'id,title', 'title': 'b, a'}
+    assert params['_fields'] == 'title, id'
+
+
+def test_canonical_params_accepts_none():
+    assert canonical_params(None) == {}
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import ModelResource, RestEndpoint, RestResource
+
+
+class ReadOnlyResource(RestResource):
+    name = 'read_only'
+
+    def rest_query(self, request, params, payload):
+        raise RuntimeError("Handlers should not be called")
+
+    def rest_get(self, request, params, payload):
+        raise RuntimeError("Handlers should not be called")
+
+
+class ReadOnlyModel(ModelResource):
+    name = 'read_only_model'
+
+    def get_item(self, request, params, payload):
+        raise RuntimeError("Hooks should not be called")
+
+
+class DeclaredResource(ReadOnlyResource):
+    name = 'declared'
+    supported_verbs = ['get']
+
+
+class InheritsDeclaredResource(DeclaredResource):
+    name = 'inherits_declared'
+
+    def rest_create(self, request, params, payload):
+        return {}
+
+
+def test_detects_overridden_rest_handlers():
+    assert ReadOnlyResource.supported_verbs == frozenset(['query', 'get'])
+
+
+def test_model_resource_verbs_are_based_on_implemented_hooks():
+    assert ReadOnlyModel.supported_verbs == frozenset(['get', 'head'])
+
+
+def test_model_resource_overriding_rest_handler_supports_the_verb():
+    class Res(ModelResource):
+        name = 'res'
+
+        def rest_delete(self, request, params, payload):
+            return 204, {}
+
+    assert Res.supported_verbs == frozenset(['delete'])
+
+
+def test_can_be_declared_explicitly():
+    assert DeclaredResource.supported_verbs == frozenset(['get'])
+    assert InheritsDeclaredResource.supported_verbs == frozenset(['get'])
+
+
+@pytest.mark.parametrize('verb,expected', (
+    ('query', True),
+    ('get', True),
+    ('create', False),
+    ('update', False),
+    ('delete', False),
+    ('options', False),
+    ('invalid', False),
+))
+def test_implements_does_not_call_handlers(verb, expected):
+    assert ReadOnlyResource().implements(verb) is expected
+
+
+def test_endpoint_allowed_methods():
+    endpoint = RestEndpoint(res_cls=ReadOnlyModel)
+
+    assert endpoint.allowed_methods(has_pk=False) == ['HEAD']
+    assert endpoint.allowed_methods(has_pk=True) == ['GET', 'HEAD']
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import threading
+import time
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible.singleflight import SingleFlight
+
+
+class SlowLoader(object):
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.result = result
+        self.error = error
+
+    def __call__(self):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def run_concurrently(flight, loader, count):
+    results = []
+
+    def request():
+        try:
+            results.append(flight.do('key', loader))
+        except Exception as ex:
+            results.append(ex)
+
+    threads = [threading.Thread(target=request) for _ in range(count)]
+    threads[0].start()
+    loader.started.wait(5)
+
+    for thread in threads[1:]:
+        thread.start()
+
+    time.sleep(0.05)    # Let the other threads start waiting.
+    loader.release.set()
+
+    for thread in threads:
+        thread.join()
+
+    return results
+
+
+def test_identical_concurrent_calls_share_the_result():
+    loader = SlowLoader(result={'id': 1})
+
+    results = run_concurrently(SingleFlight(), loader, 5)
+
+    assert loader.calls == 1
+    assert sorted(shared for _, shared in results) == [
+        False, True, True, True, True
+    ]
+    assert all(result is loader.result for result, _ in results)
+
+
+def test_error_is_raised_in_all_waiting_calls():
+    loader = SlowLoader(error=RuntimeError("DB connection lost"))
+
+    results = run_concurrently(SingleFlight(), loader, 3)
+
+    assert loader.calls == 1
+    assert all(result is loader.error for result in results)
+
+
+def test_calls_are_not_coalesced_after_the_first_one_finishes():
+    flight = SingleFlight()
+
+    assert flight.do('key', lambda: 1) == (1, False)
+    assert flight.do('key', lambda: 2) == (2, False)
+    assert len(flight) == 0
+
+
+def test_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+
+    assert flight.do('a', lambda: 1) == (1, False)
+    assert flight.do('b', lambda: 2) == (2, False)
+
+
+def test_error_is_raised():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("DB connection lost")
+
+    with pytest.raises(RuntimeError):
+        flight.do('key', fail)
+
+    assert len(flight) == 0
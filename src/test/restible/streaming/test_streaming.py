@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import json
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import ModelResource, streaming
+from restible.endpoint import RestResult
+
+
+def test_json_array_is_valid_json():
+    items = ({'id': i} for i in range(100))
+
+    content = b''.join(streaming.iter_json_array(items, chunk_size=50))
+
+    assert json.loads(content.decode('utf-8')) == [
+        {'id': i} for i in range(100)
+    ]
+
+
+def test_empty_json_array():
+    assert b''.join(streaming.iter_json_array(iter([]))) == b'[]'
+
+
+def test_ndjson_has_one_item_per_line():
+    content = b''.join(streaming.iter_ndjson(iter([{'id': 1}, {'id': 2}])))
+
+    assert [json.loads(x) for x in content.decode('utf-8').splitlines()] == [
+        {'id': 1}, {'id': 2}
+    ]
+
+
+def test_empty_ndjson():
+    assert b''.join(streaming.iter_ndjson(iter([]))) == b''
+
+
+def test_items_are_consumed_lazily():
+    consumed = []
+
+    def gen():
+        for i in range(10):
+            consumed.append(i)
+            yield {'id': i}
+
+    chunks = streaming.iter_json_array(gen(), chunk_size=1)
+
+    next(chunks)
+    assert consumed == []
+
+    next(chunks)
+    assert consumed == [0]
+
+
+def test_chunks_are_at_least_chunk_size():
+    chunks = list(streaming.iter_ndjson(
+        ({'id': i} for i in range(100)), chunk_size=100
+    ))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 100 for chunk in chunks[:-1])
+
+
+def test_error_is_raised_after_the_sent_chunks():
+    def gen():
+        yield {'id': 1}
+        raise RuntimeError("DB connection lost")
+
+    chunks = streaming.iter_ndjson(gen(), chunk_size=1)
+
+    assert json.loads(next(chunks).decode('utf-8')) == {'id': 1}
+    with pytest.raises(RuntimeError):
+        list(chunks)
+
+
+@pytest.mark.parametrize('data,expected', (
+    ([1, 2], False),
+    ({'a': 1}, False),
+    (None, False),
+    (iter([1, 2]), True),
+    ((x for x in [1, 2]), True),
+))
+def test_result_is_stream(data, expected):
+    assert RestResult(200, {}, data).is_stream is expected
+
+
+class StreamedResource(ModelResource):
+    name = 'streamed'
+    streaming = True
+
+    def query_items(self, request, params, payload):
+        for i in range(3):
+            yield {'id': i, 'name': 'item {}'.format(i)}
+
+
+def test_model_resource_serializes_items_lazily():
+    resource = StreamedResource()
+
+    status, data = resource.rest_query(None, {'_fields': 'id'}, None)
+
+    assert status == 200
+    assert not isinstance(data, list)
+    assert list(data) == [{'id': 0}, {'id': 1}, {'id': 2}]
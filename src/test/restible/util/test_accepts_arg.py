@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import util
+
+
+class Res(object):
+    def named(self, request, fields=None):
+        pass
+
+    def kwargs(self, request, **kwargs):
+        pass
+
+    def other(self, request, params):
+        pass
+
+
+@pytest.mark.parametrize('func,expected', (
+    (Res.named, True),
+    (Res().named, True),
+    (Res.kwargs, False),
+    (Res.other, False),
+    (len, False),
+))
+def test_accepts_arg(func, expected):
+    assert util.accepts_arg(func, 'fields') is expected
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+from mock import Mock
+
+# local imports
+from restible import util
+
+
+def test_does_not_call_loader_until_accessed():
+    loader = Mock(return_value={'name': 'John'})
+
+    data = util.LazyDict(loader)
+    loader.assert_not_called()
+    assert not data.loaded
+
+    assert data['name'] == 'John'
+    assert dict(data) == {'name': 'John'}
+    assert data.loaded
+    loader.assert_called_once()
+
+
+def test_None_is_treated_as_empty_dict():
+    data = util.LazyDict(lambda: None)
+
+    assert data.value is None
+    assert len(data) == 0
+    assert not data
+    assert data.get('name') is None
+
+
+def test_value_returns_the_data_as_loaded():
+    payload = [1, 2, 3]
+
+    assert util.LazyDict(lambda: payload).value is payload
+
+
+def test_can_be_modified():
+    data = util.LazyDict(lambda: {'name': 'John'})
+
+    data['age'] = 18
+    del data['name']
+
+    assert data.copy() == {'age': 18}
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# 3rd party imports
+import jsonschema
+import pytest
+from mock import patch
+
+# local imports
+from restible import validation
+
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+    },
+    "required": ["name"],
+}
+DRAFT4_SCHEMA = dict(SCHEMA, **{
+    '$schema': 'http://json-schema.org/draft-04/schema#',
+})
+
+
+def test_compiles_each_schema_only_once():
+    registry = validation.ValidatorRegistry()
+
+    with patch.object(
+            jsonschema.Draft4Validator,
+            'check_schema',
+            wraps=jsonschema.Draft4Validator.check_schema
+    ) as p_check_schema:
+        registry.validate({'name': 'John'}, DRAFT4_SCHEMA)
+        registry.validate({'name': 'Dave'}, DRAFT4_SCHEMA)
+
+        p_check_schema.assert_called_once()
+
+
+def test_equal_schemas_share_the_validator():
+    registry = validation.ValidatorRegistry()
+
+    v1 = registry.get(dict(SCHEMA))
+    v2 = registry.get(dict(SCHEMA))
+
+    assert v1 is v2
+    assert len(registry) == 1
+
+
+def test_raises_ValidationError_if_data_is_invalid():
+    registry = validation.ValidatorRegistry()
+
+    with pytest.raises(jsonschema.ValidationError):
+        registry.validate({'name': 123}, SCHEMA)
+
+    with pytest.raises(jsonschema.ValidationError):
+        registry.validate({}, SCHEMA)
+
+
+def test_raises_SchemaError_if_schema_is_invalid():
+    registry = validation.ValidatorRegistry()
+
+    with pytest.raises(jsonschema.SchemaError):
+        registry.validate({}, {'type': 'not-a-type'})
+
+
+def test_is_cleared_when_max_size_is_reached():
+    registry = validation.ValidatorRegistry(max_size=2)
+
+    registry.get({'type': 'string'})
+    registry.get({'type': 'number'})
+    registry.get({'type': 'object'})
+
+    assert len(registry) == 1
+
+
+def test_clear_removes_compiled_validators():
+    registry = validation.ValidatorRegistry()
+    registry.get(SCHEMA)
+
+    registry.clear()
+
+    assert len(registry) == 0
@@ -0,0 +1,429 @@
+# -*- coding: utf-8 -*-
+# pylint: disable=missing-docstring
+from __future__ import absolute_import, unicode_literals
+
+# stdlib imports
+import gzip
+import io
+import json
+import zlib
+from wsgiref.handlers import SimpleHandler
+from wsgiref.util import setup_testing_defaults
+
+# 3rd party imports
+import pytest
+
+# Project imports
+from restible import codec
+from restible import ModelResource, RawResponse, RestResource, api_action
+from restible.compression import Compression
+from restible.wsgi import WsgiEndpoint
+
+
+class PostResource(RestResource):
+    name = 'post'
+
+    def rest_query(self, request, params, payload):
+        return [{'id': 1, 'params': dict(params)}]
+
+    def rest_get(self, request, params, payload):
+        return {'id': self.get_pk(request)}
+
+    def rest_create(self, request, params, payload):
+        return payload
+
+    @api_action(generic=True, protected=False)
+    def publish_all(self, request, params, payload):
+        return {'published': 'all'}
+
+    @api_action(protected=False)
+    def publish(self, request, params, payload):
+        return {'published': self.get_pk(request)}
+
+    @api_action(protected=False, methods=['get'])
+    def raw(self, request, params, payload):
+        def app(environ, start_response):
+            start_response(str('200 OK'), [(str('Content-Type'), str('text/plain'))])
+            return [b'raw']
+        return RawResponse(app)
+
+
+class UserResource(RestResource):
+    name = 'user'
+    route_params = [{'name': 'user_id'}]
+
+    def rest_get(self, request, params, payload):
+        return {'user': self.get_pk(request)}
+
+
+def call(app, method, path, query='', body=None, accept=None,
+         content_type='application/json', headers=None):
+    environ = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+    }
+    if accept is not None:
+        environ['HTTP_ACCEPT'] = accept
+    for name, value in (headers or {}).items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = value
+    if body is not None:
+        if isinstance(body, bytes):
+            data = body
+        else:
+            data = json.dumps(body).encode('utf-8')
+        environ['CONTENT_LENGTH'] = str(len(data))
+        environ['CONTENT_TYPE'] = content_type
+        environ['wsgi.input'] = io.BytesIO(data)
+    setup_testing_defaults(environ)
+
+    response = {}
+
+    def start_response(status, headers):
+        response['status'] = int(status.split()[0])
+        response['headers'] = dict(headers)
+
+    content = b''.join(app(environ, start_response))
+    return response['status'], response['headers'], content
+
+
+@pytest.fixture
+def app():
+    return WsgiEndpoint.create_app(resources=[
+        ['/api/post', PostResource],
+        ['/api/user', UserResource],
+    ])
+
+
+def test_query(app):
+    status, headers, content = call(app, 'GET', '/api/post', 'age=18')
+
+    assert status == 200
+    assert headers['Content-Type'] == 'application/json'
+    assert headers['Content-Length'] == str(len(content))
+    assert json.loads(content.decode('utf-8')) == [
+        {'id': 1, 'params': {'age': 18}}
+    ]
+
+
+def test_get_sets_rest_keys(app):
+    _, _, post = call(app, 'GET', '/api/post/123')
+    _, _, user = call(app, 'GET', '/api/user/321')
+
+    assert json.loads(post.decode('utf-8')) == {'id': '123'}
+    assert json.loads(user.decode('utf-8')) == {'user': '321'}
+
+
+def test_create_decodes_json_body(app):
+    status, _, content = call(app, 'POST', '/api/post', body={'title': 'a'})
+
+    assert status == 201
+    assert json.loads(content.decode('utf-8')) == {'title': 'a'}
+
+
+def test_not_supported_method_returns_405(app):
+    status, headers, content = call(app, 'DELETE', '/api/post/1')
+
+    assert status == 405
+    assert headers['Allow'] == 'GET'
+    assert content == b''
+
+
+@pytest.mark.parametrize('method,path,expected', (
+    ('POST', '/api/post/publish_all', {'published': 'all'}),
+    ('POST', '/api/post/12/publish', {'published': '12'}),
+))
+def test_actions(app, method, path, expected):
+    status, _, content = call(app, method, path)
+
+    assert status == 200
+    assert json.loads(content.decode('utf-8')) == expected
+
+
+def test_raw_response_is_a_wsgi_app(app):
+    status, headers, content = call(app, 'GET', '/api/post/1/raw')
+
+    assert status == 200
+    assert headers['Content-Type'] == 'text/plain'
+    assert content == b'raw'
+
+
+@pytest.mark.parametrize('path', (
+    '/api/other',
+    '/api/posts',
+    '/api/post/1/publish/extra',
+))
+def test_returns_404_for_unknown_paths(app, path):
+    status, _, _ = call(app, 'GET', path)
+
+    assert status == 404
+
+
+def test_head_has_no_body():
+    class Res(RestResource):
+        name = 'res'
+
+        def rest_head(self, request, params, payload):
+            return {'a': 1}
+
+    endpoint = WsgiEndpoint(res_cls=Res, prefix='/res')
+
+    status, headers, content = call(endpoint, 'HEAD', '/res')
+
+    assert status == 200
+    assert content == b''
+
+
+class StreamedResource(ModelResource):
+    name = 'streamed'
+    streaming = True
+
+    def query_items(self, request, params, payload):
+        for i in range(3):
+            yield {'id': i}
+
+    def rest_head(self, request, params, payload):
+        return self.rest_query(request, params, payload)
+
+
+def test_streams_query_results():
+    endpoint = WsgiEndpoint(res_cls=StreamedResource, prefix='/items')
+
+    status, headers, content = call(endpoint, 'GET', '/items')
+
+    assert status == 200
+    assert headers['Content-Type'] == 'application/json'
+    assert 'Content-Length' not in headers
+    assert json.loads(content.decode('utf-8')) == [
+        {'id': 0}, {'id': 1}, {'id': 2}
+    ]
+
+
+def test_failing_stream_is_not_a_clean_200():
+    class FailingResource(StreamedResource):
+        def query_items(self, request, params, payload):
+            yield {'id': 0}
+            raise RuntimeError("DB connection lost")
+
+    endpoint = WsgiEndpoint(res_cls=FailingResource, prefix='/items')
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/items'}
+    setup_testing_defaults(environ)
+    out, err = io.BytesIO(), io.StringIO()
+
+    SimpleHandler(io.BytesIO(), out, err, environ).run(endpoint)
+
+    assert out.getvalue().startswith(b'HTTP/1.0 500 ')
+    assert 'DB connection lost' in err.getvalue()
+
+
+@pytest.mark.parametrize('accept,content_type', (
+    ('application/x-ndjson', 'application/x-ndjson'),
+    ('application/ndjson; q=1, application/json; q=0.5', 'application/ndjson'),
+))
+def test_returns_ndjson_if_requested(app, accept, content_type):
+    status, headers, content = call(app, 'GET', '/api/post', accept=accept)
+
+    assert status == 200
+    assert headers['Content-Type'] == content_type
+    assert content.endswith(b'\n')
+    assert json.loads(content.decode('utf-8')) == {'id': 1, 'params': {}}
+
+
+def test_streamed_head_has_no_body():
+    endpoint = WsgiEndpoint(res_cls=StreamedResource, prefix='/items')
+
+    status, _, content = call(endpoint, 'HEAD', '/items')
+
+    assert status == 200
+    assert content == b''
+
+
+def test_model_head_returns_count():
+    class Res(ModelResource):
+        name = 'res'
+
+        def query_items(self, request, params, payload):
+            return [{'id': i} for i in range(3)]
+
+    endpoint = WsgiEndpoint(res_cls=Res, prefix='/items')
+
+    status, headers, content = call(endpoint, 'HEAD', '/items')
+
+    assert status == 200
+    assert headers['X-Total-Count'] == '3'
+    assert 'Content-Length' not in headers
+    assert content == b''
+
+
+@pytest.mark.skipif(not codec.MsgpackCodec.available(), reason="needs msgpack")
+def test_msgpack_request_and_response(app):
+    msgpack_codec = codec.MsgpackCodec()
+
+    status, headers, content = call(
+        app, 'POST', '/api/post',
+        body=msgpack_codec.dumps({'title': 'a'}),
+        content_type='application/msgpack',
+        accept='application/msgpack',
+    )
+
+    assert status == 201
+    assert headers['Content-Type'] == 'application/msgpack'
+    assert msgpack_codec.loads(content) == {'title': 'a'}
+
+
+@pytest.mark.skipif(not codec.CborCodec.available(), reason="needs cbor2")
+def test_cbor_response(app):
+    status, headers, content = call(
+        app, 'GET', '/api/post', accept='application/cbor'
+    )
+
+    assert status == 200
+    assert headers['Content-Type'] == 'application/cbor'
+    assert codec.CborCodec().loads(content) == [{'id': 1, 'params': {}}]
+
+
+def test_unsupported_content_type_returns_415(app):
+    status, _, _ = call(
+        app, 'POST', '/api/post', body=b'title=a', content_type='image/png'
+    )
+
+    assert status == 415
+
+
+def test_invalid_body_returns_400(app):
+    status, _, _ = call(app, 'POST', '/api/post', body=b'{"title": ')
+
+    assert status == 400
+
+
+def test_not_acceptable_returns_406(app):
+    status, _, content = call(app, 'GET', '/api/post', accept='image/png')
+
+    assert status == 406
+    assert 'application/json' in json.loads(content.decode('utf-8'))['detail']
+
+
+def test_response_varies_by_accept(app):
+    _, headers, _ = call(app, 'GET', '/api/post')
+
+    assert headers['Vary'] == 'Accept'
+
+
+class BigResource(RestResource):
+    name = 'big'
+
+    def rest_query(self, request, params, payload):
+        return [{'id': i, 'title': 'Post #{}'.format(i)} for i in range(200)]
+
+    def rest_create(self, request, params, payload):
+        return {'count': len(payload)}
+
+
+def test_compresses_large_responses():
+    endpoint = WsgiEndpoint(res_cls=BigResource, prefix='/big')
+
+    status, headers, content = call(
+        endpoint, 'GET', '/big', headers={'Accept-Encoding': 'gzip'}
+    )
+
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert headers['Content-Length'] == str(len(content))
+    assert headers['Vary'] == 'Accept, Accept-Encoding'
+    data = json.loads(gzip.GzipFile(fileobj=io.BytesIO(content)).read())
+    assert len(data) == 200
+
+
+def test_does_not_compress_if_disabled():
+    endpoint = WsgiEndpoint(res_cls=BigResource, prefix='/big')
+    endpoint.compression = None
+
+    _, headers, content = call(
+        endpoint, 'GET', '/big', headers={'Accept-Encoding': 'gzip'}
+    )
+
+    assert 'Content-Encoding' not in headers
+    assert len(json.loads(content.decode('utf-8'))) == 200
+
+
+def test_compresses_streamed_responses():
+    endpoint = WsgiEndpoint(res_cls=StreamedResource, prefix='/items')
+    endpoint.compression = Compression(min_size=10 ** 6)
+
+    _, headers, content = call(
+        endpoint, 'GET', '/items', headers={'Accept-Encoding': 'deflate'}
+    )
+
+    assert headers['Content-Encoding'] == 'deflate'
+    assert json.loads(zlib.decompress(content).decode('utf-8')) == [
+        {'id': 0}, {'id': 1}, {'id': 2}
+    ]
+
+
+def test_accepts_gzip_request_body():
+    endpoint = WsgiEndpoint(res_cls=BigResource, prefix='/big')
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    data = json.dumps([{'id': i} for i in range(50)]).encode('utf-8')
+
+    status, _, content = call(
+        endpoint, 'POST', '/big',
+        body=compressor.compress(data) + compressor.flush(),
+        headers={'Content-Encoding': 'gzip'},
+    )
+
+    assert status == 201
+    assert json.loads(content.decode('utf-8')) == {'count': 50}
+
+
+def test_unsupported_content_encoding_returns_415():
+    endpoint = WsgiEndpoint(res_cls=BigResource, prefix='/big')
+
+    status, _, _ = call(
+        endpoint, 'POST', '/big', body=b'...', headers={'Content-Encoding': 'br'}
+    )
+
+    assert status == 415
+
+
+def test_conditional_get_returns_304():
+    endpoint = WsgiEndpoint(res_cls=PostResource, prefix='/api/post')
+    endpoint.use_etags = True
+
+    _, headers, _ = call(endpoint, 'GET', '/api/post/1')
+    status, headers_304, content = call(
+        endpoint, 'GET', '/api/post/1',
+        headers={'If-None-Match': headers['ETag']},
+    )
+
+    assert status == 304
+    assert headers['ETag'].startswith('W/"')
+    assert headers_304['ETag'] == headers['ETag']
+    assert content == b''
+
+
+def test_batch_request():
+    app = WsgiEndpoint.create_app(resources=[
+        ['/api/post', PostResource],
+        ['/api/user', UserResource],
+    ], batch_path='/api/batch')
+
+    status, _, content = call(app, 'POST', '/api/batch', body=[
+        {'method': 'GET', 'resource': 'post', 'pk': 1},
+        {'method': 'GET', 'resource': 'user', 'pk': 2},
+        {'method': 'POST', 'resource': 'post', 'pk': 3, 'action': 'publish'},
+    ])
+
+    assert status == 200
+    assert [r['body'] for r in json.loads(content.decode('utf-8'))] == [
+        {'id': '1'}, {'user': '2'}, {'published': '3'},
+    ]
+
+
+def test_batch_requires_post():
+    app = WsgiEndpoint.create_app(
+        resources=[['/api/post', PostResource]], batch_path='/api/batch'
+    )
+
+    status, _, _ = call(app, 'GET', '/api/batch')
+
+    assert status == 405